@@ -1,8 +1,12 @@
-import pyzx as zx
-from qiskit import QuantumCircuit, qasm2
+from qiskit import QuantumCircuit
 import networkx as nx
 import numpy as np
 import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "solutions"))
+from zx_cache import reduce_qasm_file
 
 # P9: Grand Summit
 TARGET_QASM = "challenge/P9_grand_summit.qasm"
@@ -14,11 +18,7 @@ def analyze_cut():
     try:
         qc = QuantumCircuit.from_qasm_file(TARGET_QASM)
         # Simplify first to get true connectivity
-        qasm_str = qasm2.dumps(qc)
-        g = zx.Circuit.from_qasm(qasm_str).to_graph()
-        zx.full_reduce(g) # Remove trivial connections
-        circ_reduced = zx.extract_circuit(g)
-        qc_zx = QuantumCircuit.from_qasm_str(circ_reduced.to_qasm())
+        qc_zx = reduce_qasm_file(TARGET_QASM, strategy="full_reduce") # Remove trivial connections
         n = qc_zx.num_qubits
         
         # Build Interaction Graph
@@ -1,40 +1,23 @@
 import argparse
+import os
+import sys
 from qiskit import QuantumCircuit, transpile
 from qiskit.converters import circuit_to_dag
 import matplotlib.pyplot as plt
 import numpy as np
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "solutions"))
+from lightcone import lightcones
+
 def get_lightcone_size(qc, qubit_index):
     """
     Computes the size (number of qubits, number of gates) of the causal cone 
     for a specific qubit at the end of the circuit.
-    This is a backward traversal.
+    Prefer lightcones(qc).sizes() when all qubits are needed: it gets every
+    cone from a single reverse pass.
     """
-    # dag = circuit_to_dag(qc) # Not needed for simple list traversal
-    
-    # We want the lightcone for the output of 'qubit_index'
-    # Start with the specific qubit as the dependency target
-    target_bit = qc.qubits[qubit_index]
-    depend_on = {target_bit}
-    
-    # Get ops in reverse
-    ops = list(qc.data)
-    ops.reverse()
-    
-    op_count = 0
-    
-    for instruction in ops:
-        if instruction.operation.name == 'barrier':
-            continue
-            
-        # Check if gate involves any qubit we care about
-        gate_qubits = set(instruction.qubits)
-        if not gate_qubits.isdisjoint(depend_on):
-            # This gate affects our lightcone
-            depend_on.update(gate_qubits)
-            op_count += 1
-            
-    return len(depend_on), op_count
+    lc = lightcones(qc)
+    return len(lc.qubits(qubit_index)), len(lc.gates(qubit_index))
 
 def analyze_lightcones(qasm_path):
     print(f"--- Analyzing Lightcones for {qasm_path} ---")
@@ -51,14 +34,14 @@ def analyze_lightcones(qasm_path):
     num_qubits = qc.num_qubits
     print(f"Total Qubits: {num_qubits}")
     
-    cone_sizes = [] # (n_qubits, n_gates)
+    # One reverse pass gives every qubit's cone
+    cone_sizes, cone_gates = lightcones(qc).sizes()
     
     print("\nQubit | Cone Qubits | Cone Gates")
     print("--------------------------------")
     
     for i in range(num_qubits):
-        nq, ng = get_lightcone_size(qc, i)
-        cone_sizes.append(nq)
+        nq, ng = cone_sizes[i], cone_gates[i]
         print(f"  {i:2d}  |     {nq:2d}      |    {ng:4d}")
         
     avg_cone = np.mean(cone_sizes)
@@ -1,19 +1,17 @@
-from qiskit import QuantumCircuit
+import os
+import sys
 import networkx as nx
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "solutions"))
+from gate_table import GateTable
+
 def analyze():
-    qc = QuantumCircuit.from_qasm_file("challenge/P9_grand_summit.qasm")
-    n = qc.num_qubits
+    gt = GateTable.from_qasm_file("challenge/P9_grand_summit.qasm")
+    n = gt.num_qubits
     
     G = nx.Graph()
     G.add_nodes_from(range(n))
-    
-    for instruction in qc.data:
-        qargs = instruction.qubits
-        if len(qargs) == 2:
-            u = qc.find_bit(qargs[0]).index
-            v = qc.find_bit(qargs[1]).index
-            G.add_edge(u, v)
+    G.add_edges_from(map(tuple, gt.edges().tolist()))
             
     print(f"Total Qubits: {n}")
     print(f"Total Edges: {G.number_of_edges()}")
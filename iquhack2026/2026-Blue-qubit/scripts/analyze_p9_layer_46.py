@@ -1,38 +1,33 @@
-from qiskit import QuantumCircuit
+import os
+import sys
+
 import numpy as np
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "solutions"))
+from layered import LayeredCircuit
+from mps import chain_order
+from pinch import rank_bounds
+
 def analyze_layer_46():
-    qc = QuantumCircuit.from_qasm_file("challenge/P9_grand_summit.qasm")
-    n = qc.num_qubits
-    
-    qubit_time = [0] * n
-    layer_insts = []
-    
-    for instruction in qc.data:
-        qargs = [qc.find_bit(q).index for q in instruction.qubits]
-        start_time = max(qubit_time[i] for i in qargs)
-        duration = 1
-        for i in qargs:
-            qubit_time[i] = start_time + duration
-        layer_insts.append((start_time, instruction))
-    
+    lc = LayeredCircuit.from_qasm_file("challenge/P9_grand_summit.qasm")
+
     print("Layer 46 U3 Parameters:")
-    for t, inst in layer_insts:
-        if t == 46 and inst.name == 'u3':
-            qs = [qc.find_bit(q).index for q in inst.qubits]
-            params = inst.params
-            print(f"Q{qs[0]}: {np.round(params, 4)}")
-            
-            # Check for rationality
-            is_rat = True
-            for p in params:
-                 ratio = p / (np.pi/2) 
-                 if abs(ratio - round(ratio)) > 1e-4:
-                     is_rat = False
-            if not is_rat:
-                print(f"  -> IRRATIONAL")
-            else:
-                print(f"  -> Rational")
+    for q, params in sorted(lc.u3_param_map(46).items()):
+        print(f"Q{q}: {np.round(params, 4)}")
+        # Check for rationality
+        ratio = params / (np.pi / 2)
+        if np.all(np.abs(ratio - np.round(ratio)) <= 1e-4):
+            print(f"  -> Rational")
+        else:
+            print(f"  -> IRRATIONAL")
+
+    # Is the pivot a place to cut the circuit in time? Schmidt-rank bound of
+    # each half across the chain, against one forward pass.
+    forward, backward = rank_bounds(lc, chain_order(lc.table, "spectral"))
+    print(f"\nOne forward pass: chi <= 2^{forward[-1].max()}")
+    for cut in (46, 47):
+        print(f"Cut before layer {cut}: forward chi <= 2^{forward[cut].max()}, "
+              f"backward chi <= 2^{backward[cut].max()}")
 
 if __name__ == "__main__":
     analyze_layer_46()
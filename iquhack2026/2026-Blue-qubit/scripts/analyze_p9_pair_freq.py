@@ -1,30 +1,25 @@
 from collections import Counter
-import re
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "solutions"))
+from gate_table import GateTable
 
 def analyze_freq():
-    with open("challenge/P9_grand_summit.qasm", "r") as f:
-        lines = f.readlines()
-        
-    pairs = []
-    for line in lines:
-        if line.startswith("cz"):
-            match = re.search(r"q\[(\d+)\],q\[(\d+)\]", line)
-            if match:
-                u, v = sorted([int(match.group(1)), int(match.group(2))])
-                pairs.append((u, v))
-                
-    counts = Counter(pairs)
-    freq_dist = Counter(counts.values())
+    gt = GateTable.from_qasm_file("challenge/P9_grand_summit.qasm")
+    pairs, freqs = np.unique(gt.edges(), axis=0, return_counts=True)
+    freq_dist = Counter(freqs.tolist())
     
-    print(f"Total Unique Pairs: {len(counts)}")
+    print(f"Total Unique Pairs: {len(pairs)}")
     print("Frequency Distribution:")
     for freq, count in sorted(freq_dist.items()):
         print(f"  {freq} times: {count} pairs")
         
     # Show some most common
     print("\nMost common pairs:")
-    for pair, freq in counts.most_common(10):
-        print(f"  {pair}: {freq} times")
+    for k in np.argsort(-freqs, kind="stable")[:10]:
+        print(f"  {tuple(pairs[k].tolist())}: {freqs[k]} times")
 
 if __name__ == "__main__":
     analyze_freq()
@@ -1,39 +1,25 @@
-import re
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "solutions"))
+from layered import LayeredCircuit
+from periodicity import detect_circuit
 
 def check_mirror_symmetry():
-    with open("challenge/P9_grand_summit.qasm", "r") as f:
-        lines = f.readlines()
-        
-    pairs = []
-    for line in lines:
-        if line.startswith("cz"):
-            match = re.search(r"q\[(\d+)\],q\[(\d+)\]", line)
-            if match:
-                u, v = sorted([int(match.group(1)), int(match.group(2))])
-                pairs.append((u, v))
-                
-    n_qubits = 56
-    mirrored_pairs = []
-    for u, v in pairs:
-        mu, mv = sorted([n_qubits - 1 - u, n_qubits - 1 - v])
-        mirrored_pairs.append((mu, mv))
-        
-    n = len(pairs)
-    symmetry_score = 0
-    for i in range(n):
-        if pairs[i] == mirrored_pairs[i]:
-            symmetry_score += 1
-            
-    print(f"Total CZ Gates: {n}")
-    print(f"Mirror Symmetry Matches: {symmetry_score} ({symmetry_score/n:.2%})")
-    
-    # Check if the sequence itself is mirrored (first gate matches mirror of last gate?)
-    rev_mirrored = mirrored_pairs[::-1]
-    rev_symmetry = 0
-    for i in range(n):
-        if pairs[i] == rev_mirrored[i]:
-            rev_symmetry += 1
-    print(f"Reverse Mirror Symmetry Matches: {rev_symmetry} ({rev_symmetry/n:.2%})")
+    lc = LayeredCircuit.from_qasm_file("challenge/P9_grand_summit.qasm")
+    n = lc.num_qubits
+    edge_sets = lc.edge_sets()
+
+    # Spatial mirror q -> n - 1 - q, layer by layer.
+    total = sum(len(e) for e in edge_sets)
+    same = sum(len(e & {tuple(sorted((n - 1 - u, n - 1 - v))) for u, v in e}) for e in edge_sets)
+    print(f"Total 2-qubit gates: {total}")
+    print(f"Spatial mirror matches: {same} ({same / total:.2%})")
+
+    # Temporal mirror (layer t vs layer 2c - t) over every pivot c at once.
+    for feats in (("edges",), ("angles",)):
+        pivot, score = detect_circuit(lc, feats).top_pivots(1)[0]
+        print(f"Best temporal mirror pivot by {feats[0]}: {pivot:g} (mean cosine {score:+.2f})")
 
 if __name__ == "__main__":
     check_mirror_symmetry()
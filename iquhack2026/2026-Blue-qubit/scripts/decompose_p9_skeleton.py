@@ -1,17 +1,17 @@
-import pyzx as zx
-from qiskit import QuantumCircuit, transpile, qasm2
+from qiskit import QuantumCircuit, transpile
 from qiskit.quantum_info import Operator
 import numpy as np
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "solutions"))
+from zx_cache import reduce_qasm_file
 
 def decompose_skeleton():
     path = "challenge/P9_grand_summit.qasm"
     
     # 1. PyZX Reduction
-    qc_orig = QuantumCircuit.from_qasm_file(path)
-    g = zx.Circuit.from_qasm(qasm2.dumps(qc_orig)).to_graph()
-    zx.full_reduce(g)
-    circ_reduced = zx.extract_circuit(g)
-    qc_zx = QuantumCircuit.from_qasm_str(circ_reduced.to_qasm())
+    qc_zx = reduce_qasm_file(path, strategy="full_reduce")
     qc_trans = transpile(qc_zx, basis_gates=['u3', 'cx'], optimization_level=3)
     
     # 2. Extract Skeleton (Layers 30-60)
@@ -1,4 +1,10 @@
 from qiskit import QuantumCircuit
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "solutions"))
+from layered import LayeredCircuit
+from mpo import scan_cuts
 
 def find_cz_midpoint():
     qc = QuantumCircuit.from_qasm_file("challenge/P9_grand_summit.qasm")
@@ -21,5 +27,13 @@ def find_cz_midpoint():
     print(f"Total CZ: {len(cz_layers)}")
     print(f"Geometric Midpoint (index {mid_idx}): Layer {mid_layer}")
 
+    # Middle-MPO: grow the identity outwards from every cut, lowest operator bond wins
+    radius, max_bond = 6, 16
+    best = scan_cuts(LayeredCircuit.from_qasm_file("challenge/P9_grand_summit.qasm"),
+                     radius=radius, max_bond=max_bond)[:3]
+    for p in best:
+        print(f"Middle-MPO cut {p.cut} (between layers {p.cut - 1} and {p.cut}): "
+              f"score {p.score(radius, max_bond):.2f}, bonds {p.bonds}")
+
 if __name__ == "__main__":
     find_cz_midpoint()
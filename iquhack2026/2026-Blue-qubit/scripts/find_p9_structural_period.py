@@ -1,39 +1,20 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "solutions"))
+from layered import LayeredCircuit
+from periodicity import detect_circuit
+
 def find_pair_periodicity():
-    with open("challenge/P9_grand_summit.qasm", "r") as f:
-        lines = f.readlines()
-        
-    pairs = []
-    for line in lines:
-        if line.startswith("cz"):
-            # Extract q[i],q[j]
-            import re
-            match = re.search(r"q\[(\d+)\],q\[(\d+)\]", line)
-            if match:
-                u, v = sorted([int(match.group(1)), int(match.group(2))])
-                pairs.append((u, v))
-                
-    n = len(pairs)
-    print(f"Total CZ Pairs: {n}")
-    
-    # Check for repeating patterns in pairs
-    for period in range(10, n // 2):
-        matches = 0
-        for i in range(period):
-            if pairs[i] == pairs[i + period]:
-                matches += 1
-        
-        if matches / period > 0.95:
-            print(f"Structural Period Found: {period} (Pair Overlap: {matches/period:.2f})")
-            # Check 3rd step
-            if 3 * period <= n:
-                m3 = 0
-                for i in range(period):
-                    if pairs[i] == pairs[i + 2*period]:
-                        m3 += 1
-                print(f"  Third Step Structural Overlap: {m3/period:.2f}")
-            break
+    lc = LayeredCircuit.from_qasm_file("challenge/P9_grand_summit.qasm")
+    # Feature-hashed CZ edge sets per layer: the autocorrelation at period p
+    # is the mean cosine between the edge sets of layers t and t + p.
+    det = detect_circuit(lc, ("edges",))
+    period, score = det.top_periods(1)[0]
+    if score > 0.95:
+        print(f"Structural Period Found: {period} (Edge Overlap: {score:.2f})")
     else:
-         print("No repeating structural interaction pattern found.")
+        print(f"No repeating structural interaction pattern found (best period {period}, overlap {score:.2f}).")
 
 if __name__ == "__main__":
     find_pair_periodicity()
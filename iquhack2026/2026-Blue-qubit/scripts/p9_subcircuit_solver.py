@@ -1,47 +1,31 @@
-from qiskit import QuantumCircuit, transpile, qasm2
-from qiskit_aer import AerSimulator
-import pyzx as zx
+import os
+import sys
 
-def solve_for_qubit(target_idx):
-    qc = QuantumCircuit.from_qasm_file("challenge/P9_grand_summit.qasm")
-    
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "solutions"))
+from cone_solver import SV_QUBITS, cone_marginals
+from lightcone import lightcones
+from zx_cache import reduce_qasm_file
+
+def solve_for_qubit(target_idx, bond_dim=64):
     # 1. PyZX Reduction
-    qasm_str = qasm2.dumps(qc)
-    g = zx.Circuit.from_qasm(qasm_str).to_graph()
-    zx.full_reduce(g)
-    circ_reduced = zx.extract_circuit(g)
-    qc_reduced = QuantumCircuit.from_qasm_str(circ_reduced.to_qasm())
-    
-    # 2. Extract lightcone for target_idx
-    dependencies = set([target_idx])
-    # Iterate in REVERSE to find everything that affects target_idx
-    # This is slightly wrong for a dependency graph, better to build it once.
-    # But let's just use a simple set-based approach going forward.
-    
-    # Build dependency map
-    influent_qubits = set([target_idx])
-    instructions_to_keep = []
-    
-    # Actually, iterate forward and track sets?
-    # No, iterate REWARD.
-    
-    data = list(qc_reduced.data)
-    for i in range(len(data)-1, -1, -1):
-        instr = data[i]
-        qargs = [qc_reduced.find_bit(q).index for q in instr.qubits]
-        if any(q in influent_qubits for q in qargs):
-            influent_qubits.update(qargs)
-            instructions_to_keep.append(instr)
-            
-    print(f"Target Q{target_idx} influent qubits: {len(influent_qubits)}")
-    
-    # If influent qubits > 30, it's still hard.
-    if len(influent_qubits) > 30:
-        print("Still too many qubits. Trying approximation on the subcircuit.")
-        # We can't easily build a subcircuit from data[] because indices change.
-        # Let's just use the full circuit but only measure the target.
-        # (This is just as slow as full simulation unless we transpile with measurement).
-        pass
+    qc_reduced = reduce_qasm_file("challenge/P9_grand_summit.qasm", strategy="full_reduce")
+
+    # 2. Extract lightcone for target_idx (all cones come from one reverse pass)
+    lc = lightcones(qc_reduced)
+    sub, influent_qubits, local_target = lc.subcircuit(target_idx)
+    nq, ng = lc.sizes()
+
+    print(f"Target Q{target_idx} influent qubits: {len(influent_qubits)} ({len(lc.gates(target_idx))} gates)")
+    print(f"All cones: qubits min/max {nq.min()}/{nq.max()}, gates min/max {ng.min()}/{ng.max()}")
+    print(f"Standalone cone circuit: {sub.num_qubits} qubits, size {sub.size()}, "
+          f"target is local qubit {local_target}")
+
+    # 3. Simulate only the cone: statevector when small, native MPS otherwise.
+    # (solutions/cone_solver.py does this for every qubit, in parallel.)
+    method = "statevector" if len(influent_qubits) <= SV_QUBITS else "mps"
+    z = cone_marginals(sub, [local_target], method, bond_dim=bond_dim)[0]
+    print(f"<Z_{target_idx}> = {z:.4f} ({method}) -> bit {'1' if z < 0 else '0'}")
+    return z
 
 if __name__ == "__main__":
     solve_for_qubit(36)
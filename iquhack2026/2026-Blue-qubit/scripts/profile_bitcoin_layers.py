@@ -1,49 +1,40 @@
+import os
+import sys
 
-from qiskit import QuantumCircuit
-from qiskit.converters import circuit_to_dag
-import matplotlib.pyplot as plt
 import numpy as np
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "solutions"))
+from layered import LayeredCircuit
+from mps import chain_order
+from pinch import scan_time_cuts
+
 def profile_layers():
     print("Loading Bitcoin P1...")
-    qc = QuantumCircuit.from_qasm_file("bitcoin_problem/P1_little_dimple.qasm")
-    dag = circuit_to_dag(qc)
-    
-    layers = list(dag.layers())
-    gate_counts = []
-    qubit_counts = []
-    
-    for i, layer in enumerate(layers):
-        nodes = layer['graph'].op_nodes()
-        n_2q = sum(1 for n in nodes if len(n.qargs) == 2)
-        gate_counts.append(n_2q)
-        
+    lc = LayeredCircuit.from_qasm_file("bitcoin_problem/P1_little_dimple.qasm")
+    t = lc.table
+    gate_counts = np.bincount(lc.layer[t.q1 >= 0], minlength=lc.num_layers)
+
     print(f"Total Layers: {len(gate_counts)}")
     print(f"Avg 2Q gates/layer: {np.mean(gate_counts):.2f}")
-    
-    # Print suspicious "Low Density" zones
-    low_zones = []
-    current_low = []
-    for i, count in enumerate(gate_counts):
-        if count <= 2:
-            current_low.append(i)
+
+    # Pinch points: time cuts where both halves have a smaller Schmidt-rank
+    # bound than the whole circuit (a sparse layer alone does not imply one).
+    for kind in ("natural", "spectral"):
+        whole, cuts = scan_time_cuts(lc, chain_order(t, kind))
+        pinches = [c for c in cuts if c.width < whole.width]
+        print(f"\n[{kind} order] one pass needs chi <= 2^{whole.width}")
+        if pinches:
+            print("Pinch Points (cut: forward / backward width):")
+            for c in pinches[:5]:
+                print(f"  Cut {c.cut}: 2^{c.forward_width} / 2^{c.backward_width}")
         else:
-            if len(current_low) > 5:
-                low_zones.append((current_low[0], current_low[-1]))
-            current_low = []
-            
-    if low_zones:
-        print("\nLow Density Zones (Potential Pinch Points):")
-        for start, end in low_zones:
-            print(f"  Layers {start}-{end} (Len {end-start+1})")
-    else:
-        print("\nNo obvious pinch points (count <= 2) found.")
+            print("No pinch points: every cut leaves a half as wide as the whole circuit.")
 
     # Check for symmetry in 2Q gate counts
     mid = len(gate_counts) // 2
     first_half = gate_counts[:mid]
     second_half = gate_counts[mid+1:][::-1]
-    
+
     min_len = min(len(first_half), len(second_half))
     match_score = sum(1 for i in range(min_len) if first_half[i] == second_half[i])
     print(f"\nSymmetry Match Score: {match_score}/{min_len} ({100*match_score/min_len:.1f}%)")
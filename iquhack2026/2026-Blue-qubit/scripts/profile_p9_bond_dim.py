@@ -1,50 +1,44 @@
-from qiskit import QuantumCircuit, transpile
-from qiskit_aer import AerSimulator
-import numpy as np
+import argparse
+import os
+import sys
 
-def profile_bond_dimension():
-    qc_full = QuantumCircuit.from_qasm_file("challenge/P9_grand_summit.qasm")
-    n = qc_full.num_qubits
-    
-    # Track layers
-    qubit_time = [0] * n
-    layer_insts = []
-    
-    for instruction in qc_full.data:
-        qargs = [qc_full.find_bit(q).index for q in instruction.qubits]
-        start_time = max(qubit_time[i] for i in qargs)
-        duration = 1
-        for i in qargs:
-            qubit_time[i] = start_time + duration
-        layer_insts.append((start_time, instruction))
-    
-    max_t = max(t for t, _ in layer_insts)
-    
-    # We want to check bond dim at different t.
-    # Qiskit Aer doesn't give us the bond dim during simulation easily.
-    # We will simulate prefixes of length T.
-    
-    sim = AerSimulator(method='matrix_product_state', matrix_product_state_max_bond_dimension=256)
-    
-    print(f"{'Layer':<6} {'BondDim':<10}")
-    for t_step in range(0, max_t + 1, 10):
-        qc_t = QuantumCircuit(n)
-        for t, inst in layer_insts:
-            if t <= t_step:
-                qc_t.append(inst.operation, inst.qubits)
-        
-        # We need a way to extract bond dimension. 
-        # One way is to check the size of the result metadata if available.
-        # Another is to check if it converges or fails.
-        
-        # Actually, let's just use the 'val' of a marginal as a proxy for 'Simulability'.
-        # If BondDim is too low, val will be 0 or garbage.
-        
-        # Better: use a local library or just trust the 'Identiy' hypothesis for now if we see a 
-        # bitstring that is 000... or similar.
-        
-        print(f"Layer {t_step:2d}: [Simulating...]")
-        # (Simulation code here)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "solutions"))
+from gate_table import GateTable
+from mps import trace_evolution, write_trace
+
+def profile_bond_dimension(qasm: str, bond_dim: int, every: int, output: str, stride: int):
+    # One instrumented pass instead of re-simulating every prefix: the native
+    # MPS reports its bond dimensions after every ASAP layer.
+    gt = GateTable.from_qasm_file(qasm)
+    mps, rows = trace_evolution(gt, max_bond=bond_dim, every=every)
+    write_trace(rows, output)
+    key = "gate" if every else "layer"
+
+    print(f"{key.capitalize():<6} {'BondDim':<8} {'Mean':<8} {'Discarded':<12} {'Time(s)':<8}")
+    for i, r in enumerate(rows):
+        if i % stride == 0 or i == len(rows) - 1:
+            print(f"{r[key]:<6} {r['max_bond']:<8} {r['mean_bond']:<8.1f} {r['discarded']:<12.3e} {r['seconds']:<8.2f}")
+
+    # Pinch points: entanglement collapses back to a (near) product state.
+    peak = max(rows, key=lambda r: r["max_bond"])
+    print(f"\nPeak bond {peak['max_bond']} at {key} {peak[key]}")
+    pinches, grown = [], False
+    for r in rows:
+        if grown and r["max_bond"] <= 2:
+            pinches.append(r[key])
+        grown = grown or r["max_bond"] > 2
+    if pinches:
+        print(f"Pinch points (max bond <= 2): {pinches}")
+    worst = sorted(rows, key=lambda r: -r["step_discarded"])[:5]
+    print("Largest truncation steps: " + ", ".join(f"{key} {r[key]} ({r['step_discarded']:.2e})" for r in worst))
+    print(f"Trace saved to {output}")
 
 if __name__ == "__main__":
-    profile_bond_dimension()
+    parser = argparse.ArgumentParser(description="Per-layer MPS bond dimension / truncation profile")
+    parser.add_argument("--qasm", default="challenge/P9_grand_summit.qasm")
+    parser.add_argument("--bond-dim", type=int, default=64)
+    parser.add_argument("--every", type=int, default=0, help="Sample every N gates instead of per layer")
+    parser.add_argument("--stride", type=int, default=10, help="Print every N-th row")
+    parser.add_argument("--output", default="results/p9_bond_trace.csv")
+    args = parser.parse_args()
+    profile_bond_dimension(args.qasm, args.bond_dim, args.every, args.output, args.stride)
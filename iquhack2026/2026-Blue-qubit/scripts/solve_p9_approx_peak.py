@@ -1,8 +1,11 @@
-import pyzx as zx
-from qiskit import QuantumCircuit, transpile, qasm2
+from qiskit import QuantumCircuit, transpile
 from qiskit_aer import AerSimulator
 import json
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "solutions"))
+from zx_cache import reduce_qasm_file
 
 TARGET_QASM = "challenge/P9_grand_summit.qasm"
 
@@ -15,11 +18,7 @@ def solve_approx():
     
     # 2. PyZX Reduction
     print("Simplifying with PyZX...")
-    qasm_str = qasm2.dumps(qc)
-    g = zx.Circuit.from_qasm(qasm_str).to_graph()
-    zx.full_reduce(g)
-    circ_reduced = zx.extract_circuit(g)
-    qc_zx = QuantumCircuit.from_qasm_str(circ_reduced.to_qasm())
+    qc_zx = reduce_qasm_file(TARGET_QASM, strategy="full_reduce")
     print(f"Post-PyZX Depth: {qc_zx.depth()}")
     
     # 3. Aggressive Approximation
@@ -10,8 +10,12 @@ import pyzx as zx
 from qiskit.transpiler import PassManager
 import json
 import os
+import sys
 import time
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "solutions"))
+from transpile_cache import cached_transpile
+
 # P9: Grand Summit
 TARGET_QASM = "challenge/P9_grand_summit.qasm"
 OUTPUT_FILE = "results/final_P9_ibm_qpu.json"
@@ -80,7 +84,7 @@ def solve_p9_qpu():
         # B. Approximate Transpilation (Local)
         # We start with a generic pass to simplify structure 
         # before targeting the specific backend
-        qc_approx = transpile(qc_orig, 
+        qc_approx = cached_transpile(qc_orig, 
                               basis_gates=['u3', 'cx'], 
                               optimization_level=3, 
                               approximation_degree=0.99)
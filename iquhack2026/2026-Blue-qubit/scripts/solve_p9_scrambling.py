@@ -1,60 +1,39 @@
-from qiskit import QuantumCircuit
-import networkx as nx
-from networkx.algorithms import isomorphism
-from collections import defaultdict
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "solutions"))
+from layered import LayeredCircuit
+from perm_solver import mirror_pairs, solve_permutation
 
 def solve_permutation_39_53():
-    qc = QuantumCircuit.from_qasm_file("challenge/P9_grand_summit.qasm")
-    q_t = [0] * qc.num_qubits
-    layers = defaultdict(list)
-    
-    for instruction in qc.data:
-        qargs = [qc.find_bit(q).index for q in instruction.qubits]
-        start_time = max(q_t[i] for i in qargs)
-        for i in qargs:
-            q_t[i] = start_time + 1
-        if len(qargs) == 2:
-            layers[start_time].append(tuple(sorted(qargs)))
-            
-    # Solve for 39 -> 53
-    edges39 = layers[39]
-    edges53 = layers[53]
-    
-    G39 = nx.Graph()
-    G39.add_edges_from(edges39)
-    # Ensure all nodes present for correct mapping size
-    G39.add_nodes_from(range(qc.num_qubits))
-    
-    G53 = nx.Graph()
-    G53.add_edges_from(edges53)
-    G53.add_nodes_from(range(qc.num_qubits))
-    
-    GM = isomorphism.GraphMatcher(G39, G53)
-    if GM.is_isomorphic():
-        print("SUCCESS: Layer 39 and 53 are ISOMORPHIC!")
-        S = GM.mapping
-        # Print mapping in a copy-pasteable format
-        print("Scrambling Map S = {")
-        for k, v in sorted(S.items()):
-            print(f"    {k}: {v},")
-        print("}")
-        
-        # Verify if this S works for Layer 37 -> 55 (Distance 2 out)
-        # S maps 39 to 53. Does it map 37 to 55?
-        edges37 = layers[37]
-        edges55 = layers[55]
-        
-        mapped_37 = []
-        for u, v in edges37:
-            mapped_37.append(tuple(sorted([S[u], S[v]])))
-        mapped_37 = sorted(mapped_37)
-        
-        if mapped_37 == sorted(edges55):
-             print("DOUBLE SUCCESS: Permutation S holds for Layer 37 -> 55!")
-        else:
-             print("FAIL: Permutation S does NOT hold for Layer 37 -> 55.")
+    lc = LayeredCircuit.from_qasm_file("challenge/P9_grand_summit.qasm")
+
+    # Solve for 39 -> 53 jointly with every mirrored pair further out
+    # (38 -> 54, 37 -> 55, ...): one layer pair alone is a perfect matching
+    # with a huge automorphism group, so VF2 on it returned an arbitrary map.
+    pairs = mirror_pairs(lc, 40, 53)
+    sol = solve_permutation(lc, pairs)
+    if not sol.candidates:
+        print("FAIL: no permutation maps the layers before 40 onto the layers from 53.")
+        return
+    print(f"{len(pairs)} layer pairs -> {len(sol.candidates)} candidate(s)"
+          f"{' (UNIQUE)' if sol.unique else ''}")
+    S = dict(enumerate(sol.best.perm.tolist()))
+    print(f"Best map explains {sol.best.explained}/{len(pairs)} pairs, {sol.best.edge_fraction:.1%} of edges")
+    # Print mapping in a copy-pasteable format
+    print("Scrambling Map S = {")
+    for k, v in sorted(S.items()):
+        print(f"    {k}: {v},")
+    print("}")
+
+    # Verify if this S works for Layer 37 -> 55 (Distance 2 out)
+    edges37 = lc.edges(37)
+    edges55 = lc.edges(55)
+    mapped_37 = {tuple(sorted([S[u], S[v]])) for u, v in edges37}
+    if mapped_37 == edges55:
+        print("DOUBLE SUCCESS: Permutation S holds for Layer 37 -> 55!")
     else:
-        print("FAIL: Layer 39 and 53 are NOT isomorphic.")
+        print("FAIL: Permutation S does NOT hold for Layer 37 -> 55.")
 
 if __name__ == "__main__":
     solve_permutation_39_53()
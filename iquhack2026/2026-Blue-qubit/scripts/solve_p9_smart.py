@@ -2,6 +2,7 @@ import bluequbit
 from qiskit import QuantumCircuit
 import json
 import os
+import sys
 import time
 import argparse
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -92,88 +93,39 @@ def solve_smart(dry_run=False, batch_size=5):
         submit_job(*task, dry_run=False)
 
 
-def solve_local_mps(dry_run=False):
+def solve_local_mps(dry_run=False, bond_dim=32):
     print("Starting Local MPS Marginal Attack...")
-    try:
-        from qiskit_aer import AerSimulator
-        from qiskit import transpile
-    except ImportError:
-        print("Error: qiskit-aer not installed.")
-        return
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "solutions"))
+    from gate_table import GateTable
+    from mps import simulate, marginals_to_results
 
     name = "P9"
     info = TARGETS[name]
-    qc_orig = QuantumCircuit.from_qasm_file(info['path'])
-    qc_orig.remove_final_measurements(inplace=True)
-    
-    # Add measurements for all qubits to get marginals from counts
-    qc_orig.measure_all()
-    
-    print("  Transpiling for MPS...")
-    sim = AerSimulator(method='matrix_product_state', 
-                       matrix_product_state_max_bond_dimension=32) # Low bond dim for speed/robustness
-    
-    # Enable logging? standard run doesn't show much.
-    
-    # Use optimization_level=3 to optimize layout (minimize swaps for 1D MPS)
-    qc_trans = transpile(qc_orig, backend=sim, optimization_level=3)
+    gt = GateTable.from_qasm_file(info['path'])
     
     if dry_run:
         print("  [DRY-RUN] Would run MPS simulation.")
         return
 
-    print("  Running MPS Simulation (shots=10000, bond_dim=32)...")
+    # Exact <Zi> from a native MPS sweep (no shots, no per-character loops)
+    print(f"  Running native MPS simulation (bond_dim={bond_dim})...")
     start_t = time.time()
-    result = sim.run(qc_trans, shots=10000).result()
-    print(f"  Simulation done in {time.time() - start_t:.2f}s")
-    counts = result.get_counts()
-    
-    # Calculate Marginals <Zi> from counts
-    # counts keys are "q55...q0" (bitstring)
-    
-    n = qc_orig.num_qubits # 56
+    mps = simulate(gt, max_bond=bond_dim)
+    z_exp = mps.expect_z()
+    print(f"  Simulation done in {time.time() - start_t:.2f}s (discarded weight {mps.discarded:.3e})")
     
-    # Initialize expectations
-    z_exp = {i: 0.0 for i in range(n)}
-    total_shots = sum(counts.values())
-    
-    for bitstr, count in counts.items():
-        # bitstr is little-endian reversed string from qiskit: "b_n-1 ... b_0"
-        # So index 0 in string is qubit n-1. 
-        # Index k in string corresponds to qubit (n - 1 - k).
-        
-        for k, char in enumerate(bitstr):
-            qubit_idx = n - 1 - k
-            # Z eigenvalue is +1 for '0', -1 for '1'
-            val = 1 if char == '0' else -1
-            z_exp[qubit_idx] += val * count
-            
-    # Normalize
-    for i in range(n):
-        z_exp[i] /= total_shots
+    n = gt.num_qubits # 56
+    results_map = marginals_to_results(z_exp, name, job_id="local_mps")
         
     print("\nLocal MPS Results:")
-    results_map = {}
-    
     for i in range(n):
         val = z_exp[i]
-        bit = '1' if val < 0 else '0' # Negative Z expectation favors |1>
-        
-        # Determine confidence/magnitude
-        # If val is close to 0, it's uncertain.
-        
-        results_map[str(i)] = {
-            "bit": bit,
-            "val": val,
-            "job_id": "local_mps",
-            "name": f"P9_q{i}_local"
-        }
         # Print high confidence ones
         if abs(val) > 0.5:
-             print(f"  Q{i}: {bit} (<Z>={val:.4f})")
+             print(f"  Q{i}: {results_map[str(i)]['bit']} (<Z>={val:.4f})")
              
     # Save to file compatible with harvest
-    os.makedirs("results", exist_ok=True)
+    os.makedirs("../results", exist_ok=True)
     with open(f"../results/final_{name}_local.json", "w") as f:
         json.dump(results_map, f, indent=2)
     print(f"  Saved to results/final_{name}_local.json")
@@ -187,9 +139,10 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--dry-run", action="store_true")
     parser.add_argument("--local", action="store_true", help="Run with Local MPS instead of Cloud")
+    parser.add_argument("--bond-dim", type=int, default=32, help="Bond dimension for --local")
     args = parser.parse_args()
     
     if args.local:
-        solve_local_mps(dry_run=args.dry_run)
+        solve_local_mps(dry_run=args.dry_run, bond_dim=args.bond_dim)
     else:
         solve_smart(dry_run=args.dry_run)
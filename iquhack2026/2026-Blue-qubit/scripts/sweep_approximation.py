@@ -1,6 +1,11 @@
-import pyzx as zx
-from qiskit import QuantumCircuit, transpile, qasm2
+from qiskit import QuantumCircuit
 import numpy as np
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "solutions"))
+from zx_cache import reduce_qasm_file
+from transpile_cache import cached_transpile
 
 TARGET_QASM = "../challenge/P9_grand_summit.qasm"
 
@@ -13,11 +18,7 @@ def sweep():
     
     # 2. PyZX Reduction first?
     print("Running PyZX reduction base...")
-    qasm_str = qasm2.dumps(qc)
-    g = zx.Circuit.from_qasm(qasm_str).to_graph()
-    zx.full_reduce(g)
-    circ_reduced = zx.extract_circuit(g)
-    qc_zx = QuantumCircuit.from_qasm_str(circ_reduced.to_qasm())
+    qc_zx = reduce_qasm_file(TARGET_QASM, strategy="full_reduce")
     print(f"PyZX Base Depth: {qc_zx.depth()}")
     
     # 3. Sweep Transpilation
@@ -30,7 +31,7 @@ def sweep():
     best_deg = 1.0
     
     for deg in degrees:
-        qc_approx = transpile(qc_zx, 
+        qc_approx = cached_transpile(qc_zx, 
                               basis_gates=['u3', 'cx'], 
                               optimization_level=3, 
                               approximation_degree=deg)
@@ -50,7 +51,7 @@ def sweep():
         print("FOUND CLIFF! Generating candidate from best circuit...")
         # Simulate?
         from qiskit_aer import AerSimulator
-        qc_best = transpile(qc_zx, 
+        qc_best = cached_transpile(qc_zx, 
                               basis_gates=['u3', 'cx'], 
                               optimization_level=3, 
                               approximation_degree=best_deg)
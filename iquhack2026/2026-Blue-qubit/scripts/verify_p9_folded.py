@@ -1,7 +1,13 @@
+import os
+import sys
+
 from qiskit import QuantumCircuit, transpile
 from qiskit_aer import AerSimulator
 import numpy as np
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "solutions"))
+from outcomes import z_marginals
+
 def verify_folded_identity():
     qc_full = QuantumCircuit.from_qasm_file("challenge/P9_grand_summit.qasm")
     n = qc_full.num_qubits
@@ -57,11 +63,7 @@ def verify_folded_identity():
         qc_m.measure_all()
         job = sim.run(transpile(qc_m, sim), shots=1000)
         counts = job.result().get_counts()
-        z_exps = np.zeros(n)
-        for bitstring, count in counts.items():
-            for i, bit in enumerate(bitstring[::-1]):
-                z_exps[i] += (1 if bit == '0' else -1) * count
-        return z_exps / 1000
+        return z_marginals(counts)
 
     print("Simulating U1 marginals...")
     m1 = get_marginals(qc1)
@@ -1,8 +1,14 @@
 import json
+import os
+import sys
+
 from qiskit import QuantumCircuit
 from qiskit_aer import AerSimulator
 import numpy as np
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "solutions"))
+from outcomes import z_marginals
+
 def inverse_peeling():
     # Load candidate from results/final_P9.json
     try:
@@ -53,16 +59,8 @@ def inverse_peeling():
     result = job.result()
     counts = result.get_counts()
     
-    # Calculate marginals
-    z_exp = [0.0] * n
-    total = sum(counts.values())
-    for b_str, count in counts.items():
-        # b_str is q55...q0
-        for i in range(n):
-            bit = b_str[n-1-i]
-            z_exp[i] += (1 if bit == '0' else -1) * count
-    
-    z_exp = [v/total for v in z_exp]
+    # Calculate marginals (keys are q55...q0)
+    z_exp = z_marginals(counts)
     
     # Compare with candidate
     new_bits = []
@@ -77,7 +75,6 @@ def inverse_peeling():
     print(f"\nNew Candidate: {new_str}")
     print(f"Flipped Bits: {diffs}")
     
-    import os
     os.makedirs("solutions", exist_ok=True)
     with open("solutions/p9_mps_improved.txt", "w") as f:
         f.write(new_str)
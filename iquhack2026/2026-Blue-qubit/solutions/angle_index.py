@@ -0,0 +1,168 @@
+"""Hash-grid index over single-qubit gates for matching / inverse queries.
+
+check_p9_param_mirror.py and check_p9_angle_periodicity.py compared u3
+parameters layer pair by layer pair with `np.allclose`, keyed on a guessed
+pivot and qubit map, and compared raw (theta, phi, lambda) triples. Raw
+triples miss equal gates: theta lives on a 4pi circle (2pi up to phase),
+phi / lambda wrap at 2pi, and U3(theta, phi, lam) = U3(-theta, phi + pi,
+lam + pi). So every 1-qubit gate is embedded instead as its SU(2) unit
+quaternion (a, b) -> (Re a, Im a, Re b, Im b) of U / sqrt(det U). The only
+remaining ambiguity is the sign of q, and both signs are indexed. Distances
+in this space are phase-free and wraparound-free:
+|q1 - q2| ~ half the rotation angle between the gates. The adjoint U† is
+(Re a, -Im a, -Re b, -Im b), the same transform as (theta, phi, lam) ->
+(-theta, -lam, -phi) on the angles.
+
+The index is a dict over a grid with cell size `tol`. A query reads the
+3^4 neighbouring cells and keeps the hits within `tol`, so
+"which gates anywhere in the circuit equal (or invert) this one" costs
+O(1) per query. `mirror_report` runs every gate against the index once and
+tallies the layer pairs, pivots ((a + b) / 2) and qubit pairs behind the
+adjoint matches, plus the layer distances behind the identical ones.
+
+Usage:
+    python solutions/angle_index.py challenge/P9_grand_summit.qasm --tol 1e-6
+
+    from angle_index import AngleIndex
+    index = AngleIndex(lc.table)
+    index.inverses(g), index.matches(g)
+"""
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import product
+
+import numpy as np
+
+from gate_table import GateTable
+from layered import LayeredCircuit
+from mps import gate_matrix
+
+_OFFSETS = np.array(list(product((-1, 0, 1), repeat=4)), dtype=np.int64)
+_ADJOINT = np.array([1.0, -1.0, -1.0, -1.0])
+
+def su2_vector(U: np.ndarray) -> np.ndarray:
+    """Unit quaternion of a 2x2 unitary with the global phase removed (defined up to sign)."""
+    V = U / np.sqrt(np.linalg.det(U))
+    a, b = V[0, 0], V[1, 0]
+    return np.array([a.real, a.imag, b.real, b.imag])
+
+class AngleIndex:
+    def __init__(self, table: GateTable, tol: float = 1e-6):
+        self.table = table
+        self.tol = tol
+        self.gates = np.flatnonzero(table.q1 < 0)  # 1-qubit gates
+        self.vectors = np.array([su2_vector(gate_matrix(int(table.op[g]), table.params[g]))
+                                 for g in self.gates.tolist()]).reshape(-1, 4)
+        self._row = {g: i for i, g in enumerate(self.gates.tolist())}
+        self._grid: dict[tuple, list[int]] = {}
+        for i, v in enumerate(self.vectors):
+            for s in (v, -v):
+                self._grid.setdefault(self._cell(s), []).append(i)
+
+    def __len__(self) -> int:
+        return len(self.gates)
+
+    def _cell(self, v: np.ndarray) -> tuple:
+        return tuple(np.floor(v / self.tol).astype(np.int64).tolist())
+
+    def query(self, v: np.ndarray, tol: float | None = None) -> np.ndarray:
+        """Gate indices (into the table) whose quaternion is within `tol` (<= index tol) of +-v."""
+        tol = self.tol if tol is None else min(tol, self.tol)
+        base = np.array(self._cell(v), dtype=np.int64)
+        rows = set()
+        for off in _OFFSETS:
+            rows.update(self._grid.get(tuple((base + off).tolist()), ()))
+        if not rows:
+            return np.empty(0, dtype=np.int64)
+        rows = np.fromiter(rows, dtype=np.int64)
+        d = np.minimum(np.linalg.norm(self.vectors[rows] - v, axis=1), np.linalg.norm(self.vectors[rows] + v, axis=1))
+        return np.sort(self.gates[rows[d <= tol]])
+
+    def matches(self, g: int, tol: float | None = None) -> np.ndarray:
+        """Other gates equal to gate g up to global phase."""
+        hits = self.query(self.vectors[self._row[g]], tol)
+        return hits[hits != g]
+
+    def inverses(self, g: int, tol: float | None = None) -> np.ndarray:
+        """Gates equal to gate g's adjoint up to global phase (g itself if it is an involution)."""
+        return self.query(self.vectors[self._row[g]] * _ADJOINT, tol)
+
+    def lookup(self, U: np.ndarray, tol: float | None = None) -> np.ndarray:
+        """Gates equal to an arbitrary 2x2 unitary up to global phase."""
+        return self.query(su2_vector(U), tol)
+
+@dataclass
+class MirrorReport:
+    adjoint_layers: Counter = field(default_factory=Counter)    # (layer a, layer b), a < b
+    pivots: Counter = field(default_factory=Counter)            # (a + b) / 2 of adjoint pairs
+    qubit_pairs: Counter = field(default_factory=Counter)       # (qubit in a, qubit in b) of adjoint pairs
+    identical_distances: Counter = field(default_factory=Counter)  # b - a of equal-gate pairs
+    adjoint_pairs: int = 0
+    identical_pairs: int = 0
+
+    def qubit_map(self, a: int, b: int, lc: LayeredCircuit, index: AngleIndex) -> dict[int, int]:
+        """Qubit of layer a -> qubit of layer b, from gates of a with a unique adjoint in b."""
+        t = index.table
+        out = {}
+        for g in lc.gates(a).tolist():
+            if t.q1[g] >= 0:
+                continue
+            hits = [h for h in index.inverses(g).tolist() if lc.layer[h] == b]
+            if len(hits) == 1:
+                out[int(t.q0[g])] = int(t.q0[hits[0]])
+        return out
+
+def mirror_report(lc: LayeredCircuit, index: AngleIndex | None = None, skip_trivial: bool = True) -> MirrorReport:
+    """Tally adjoint and identical gate pairs over the whole circuit.
+
+    Gates that are the identity up to phase (and, with `skip_trivial`,
+    gates matching more than 1% of all gates, e.g. fixed H / X) are left
+    out, since they pair with everything.
+    """
+    index = index or AngleIndex(lc.table)
+    t = index.table
+    rep = MirrorReport()
+    common = max(2, len(index) // 100)
+    ident = np.array([1.0, 0.0, 0.0, 0.0])
+    for i, g in enumerate(index.gates.tolist()):
+        v = index.vectors[i]
+        if min(np.linalg.norm(v - ident), np.linalg.norm(v + ident)) <= index.tol:
+            continue
+        for kind, hits in (("adjoint", index.inverses(g)), ("identical", index.matches(g))):
+            if skip_trivial and len(hits) > common:
+                continue
+            for h in hits.tolist():
+                la, lb = int(lc.layer[g]), int(lc.layer[h])
+                if lb <= la:
+                    continue
+                if kind == "adjoint":
+                    rep.adjoint_pairs += 1
+                    rep.adjoint_layers[(la, lb)] += 1
+                    rep.pivots[(la + lb) / 2] += 1
+                    rep.qubit_pairs[(int(t.q0[g]), int(t.q0[h]))] += 1
+                else:
+                    rep.identical_pairs += 1
+                    rep.identical_distances[lb - la] += 1
+    return rep
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Index 1-qubit gates and report matching / inverse structure")
+    parser.add_argument("qasm")
+    parser.add_argument("--tol", type=float, default=1e-6, help="Quaternion distance (~ half rotation angle)")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    lc = LayeredCircuit.from_qasm_file(args.qasm)
+    t0 = time.perf_counter()
+    index = AngleIndex(lc.table, tol=args.tol)
+    t1 = time.perf_counter()
+    rep = mirror_report(lc, index)
+    t2 = time.perf_counter()
+    print(f"{args.qasm}: {len(index)} 1-qubit gates indexed in {t1 - t0:.2f}s, report in {t2 - t1:.2f}s")
+    print(f"  {rep.adjoint_pairs} adjoint pairs, {rep.identical_pairs} identical pairs")
+    print("  pivots (adjoint pairs):", ", ".join(f"{p:g}: {c}" for p, c in rep.pivots.most_common(args.top)))
+    print("  adjoint layer pairs:", ", ".join(f"{a}/{b}: {c}" for (a, b), c in rep.adjoint_layers.most_common(args.top)))
+    print("  identical-gate layer distances:",
+          ", ".join(f"{d}: {c}" for d, c in rep.identical_distances.most_common(args.top)) or "none")
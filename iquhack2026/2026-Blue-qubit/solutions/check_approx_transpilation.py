@@ -1,6 +1,7 @@
-from qiskit import QuantumCircuit, transpile
+from qiskit import QuantumCircuit
 from qiskit_aer import AerSimulator
 import time
+from transpile_cache import cached_transpile
 
 TARGETS = {
     "P6": "challenge/P6_low_hill.qasm",
@@ -20,10 +21,12 @@ def check_approx(name, path):
     for degree in [1.0, 0.99, 0.95, 0.90]:
         start = time.time()
         # Use AerSimulator as target to allow optimizing for simulator
-        qc_tr = transpile(qc, 
+        # use_cache=False: t= below is meant to be the real transpile cost
+        qc_tr = cached_transpile(qc, 
                           basis_gates=['u3', 'cx'], # force standard basis
                           approximation_degree=degree, 
-                          optimization_level=3)
+                          optimization_level=3,
+                          use_cache=False)
         dt = time.time() - start
         
         new_depth = qc_tr.depth()
@@ -0,0 +1,169 @@
+"""Local marginal attack: `<Z_i>` of every output from its causal cone only.
+
+The cloud PPS jobs in cloud_solver.py estimate each `<Z_i>` on BlueQubit's
+Pauli-path backend. Locally, `<Z_o>` only depends on the gates in output
+o's backward lightcone (lightcone.py), so each output can be simulated on
+that subcircuit alone:
+
+    - cones are grouped first: if o's cone (as a gate set) is contained in
+      the cone of an output p already being simulated, o's marginal is read
+      from p's run, so identical cones are simulated once;
+    - a group with <= `sv_qubits` qubits is simulated exactly with the Aer
+      statevector, larger ones with the native MPS (exact `<Z>` of the
+      truncated state, no shot noise);
+    - groups run concurrently, one process each (job_runner), largest first.
+
+The result is written in the results/final_P9.json schema
+({"<qubit>": {"bit", "val", "job_id", "name"}}) as groups finish, and an
+interrupted run resumes from that file.
+
+Usage:
+    python solutions/cone_solver.py challenge/P9_grand_summit.qasm --name P9 --workers 4 \
+        --output results/final_P9_cones.json
+"""
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+from gate_table import GateTable
+from job_runner import Job, run_jobs
+from lightcone import Lightcones, lightcones
+from mps import marginal_bitstring, simulate
+
+SV_QUBITS = 24
+
+def group_cones(lc: Lightcones) -> list[tuple[int, list[int]]]:
+    """(representative output, outputs read from its cone), biggest cones first.
+
+    Output o joins representative p when every gate of o's cone is also in
+    p's; a backward cone is closed under predecessors, so the extra gates of
+    p's cone cannot change `<Z_o>`.
+    """
+    n = lc.num_qubits
+    member = np.unpackbits(lc.gate_mask.view(np.uint8), axis=1, bitorder="little")[:, :n].astype(bool)
+    qubit_counts, gate_counts = lc.sizes()
+    groups: list[tuple[int, list[int]]] = []
+    for o in sorted(range(n), key=lambda q: (-gate_counts[q], -qubit_counts[q], q)):
+        for rep, outs in groups:
+            if not np.any(member[:, o] & ~member[:, rep]) and set(lc.qubits(o)) <= set(lc.qubits(rep)):
+                outs.append(o)
+                break
+        else:
+            groups.append((o, [o]))
+    return groups
+
+def cone_digest(sub) -> str:
+    if isinstance(sub, GateTable):
+        h = hashlib.sha256(str(sub.num_qubits).encode())
+        for arr in (sub.op, sub.q0, sub.q1, sub.params):
+            h.update(np.ascontiguousarray(arr).tobytes())
+        return h.hexdigest()[:12]
+    from qiskit import qasm2
+    return hashlib.sha256(qasm2.dumps(sub).encode()).hexdigest()[:12]
+
+def cone_marginals(sub, targets: list[int], method: str, bond_dim: int = 64) -> list[float]:
+    """Worker: `<Z>` of local qubits `targets` on one cone subcircuit."""
+    if method == "statevector":
+        from qiskit_aer import AerSimulator
+        qc = sub.to_circuit() if isinstance(sub, GateTable) else sub.copy()
+        qc.save_statevector()
+        state = AerSimulator(method="statevector").run(qc).result().get_statevector()
+        probs = (np.abs(np.asarray(state)) ** 2).reshape((2,) * qc.num_qubits)  # axis 0 = last qubit
+        k = qc.num_qubits
+        out = []
+        for t in targets:
+            p = probs.sum(axis=tuple(a for a in range(k) if a != k - 1 - t))
+            out.append(float(p[0] - p[1]))
+        return out
+    z = simulate(sub, max_bond=bond_dim).expect_z()
+    return [float(z[t]) for t in targets]
+
+def solve_cones(circuit, name: str, output: str | None = None, workers: int | None = None,
+                sv_qubits: int = SV_QUBITS, bond_dim: int = 64, mem_mb: float | None = None,
+                timeout: float | None = None, resume: bool = True) -> dict:
+    """Marginals of every output qubit via its lightcone, in the final_<name>.json schema."""
+    lc = lightcones(circuit)
+    results = {}
+    if output and resume and os.path.exists(output):
+        with open(output) as f:
+            results = json.load(f)
+    groups = [(rep, [o for o in outs if str(o) not in results]) for rep, outs in group_cones(lc)]
+    groups = [(rep, outs) for rep, outs in groups if outs]
+
+    jobs, seen, outputs, sizes = [], {}, {}, {}
+    for rep, outs in groups:
+        sub, qubits, _ = lc.subcircuit(rep)
+        local = {q: i for i, q in enumerate(qubits.tolist())}
+        digest = cone_digest(sub)
+        if digest in seen:  # same subcircuit as another group: read these outputs from that run
+            seen[digest].kwargs["targets"] += [local[o] for o in outs]
+            outputs[seen[digest].name] += outs
+            continue
+        method = "statevector" if len(qubits) <= sv_qubits else "mps"
+        job = Job(f"q{rep}", cone_marginals,
+                  dict(sub=sub, targets=[local[o] for o in outs], method=method, bond_dim=bond_dim),
+                  mem_mb=mem_mb, timeout=timeout)
+        seen[digest] = job
+        outputs[job.name], sizes[job.name] = outs, (len(qubits), len(lc.gates(rep)))
+        jobs.append(job)
+    jobs.sort(key=lambda j: (-sizes[j.name][0], -sizes[j.name][1]))
+
+    print(f"  {lc.num_qubits} outputs, {len(results)} already done, {len(jobs)} cone simulations "
+          f"({sum(j.kwargs['method'] == 'statevector' for j in jobs)} statevector)")
+    t0 = time.perf_counter()
+
+    def on_result(res) -> None:
+        job = res.job
+        nq, ng = sizes[job.name]
+        if not res.ok:
+            print(f"  [{time.perf_counter() - t0:7.1f}s] cone {job.name} ({nq} qubits) FAILED: "
+                  f"{res.error.strip().splitlines()[-1] if res.error else ''}")
+            return
+        for o, val in zip(outputs[job.name], res.value):
+            results[str(o)] = {"bit": "1" if val < 0 else "0", "val": val,
+                               "job_id": f"lightcone_{job.kwargs['method']}", "name": f"{name}_q{o}_local"}
+        print(f"  [{time.perf_counter() - t0:7.1f}s] cone {job.name}: {nq} qubits, {ng} gates, "
+              f"{job.kwargs['method']} -> outputs {outputs[job.name]} ({res.elapsed:.1f}s)")
+        if output:
+            tmp = output + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(dict(sorted(results.items(), key=lambda kv: int(kv[0]))), f, indent=2)
+            os.replace(tmp, output)
+
+    if jobs:
+        run_jobs(jobs, workers=min(workers or os.cpu_count() or 1, len(jobs)), on_result=on_result)
+    return results
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Per-qubit marginals from lightcone subcircuits, in parallel")
+    parser.add_argument("qasm")
+    parser.add_argument("--name", default=None, help="Circuit name used in the results file")
+    parser.add_argument("--zx-strategy", default=None, help="Reduce with PyZX first (cached)")
+    parser.add_argument("--workers", type=int, default=None, help="Concurrent cones (default: CPU count)")
+    parser.add_argument("--sv-qubits", type=int, default=SV_QUBITS, help="Largest cone simulated by statevector")
+    parser.add_argument("--bond-dim", type=int, default=64, help="MPS bond dimension for larger cones")
+    parser.add_argument("--mem-mb", type=float, default=None, help="Memory cap per cone process")
+    parser.add_argument("--timeout", type=float, default=None, help="Wall-clock limit per cone (s)")
+    parser.add_argument("--no-resume", action="store_true")
+    parser.add_argument("--output", default=None, help="Default: results/final_<name>_cones.json")
+    args = parser.parse_args()
+
+    name = args.name or os.path.basename(args.qasm).split("_")[0]
+    if args.zx_strategy:
+        from zx_cache import reduce_qasm_file
+        circuit = reduce_qasm_file(args.qasm, strategy=args.zx_strategy)
+    else:
+        circuit = GateTable.from_qasm_file(args.qasm)
+    output = args.output or f"results/final_{name}_cones.json"
+    res = solve_cones(circuit, name, output=output, workers=args.workers, sv_qubits=args.sv_qubits,
+                      bond_dim=args.bond_dim, mem_mb=args.mem_mb, timeout=args.timeout, resume=not args.no_resume)
+    if len(res) == circuit.num_qubits:
+        z = np.array([res[str(i)]["val"] for i in range(circuit.num_qubits)])
+        print(f"\n[FINAL {name}]: {marginal_bitstring(z)}")
+    else:
+        print(f"\n{circuit.num_qubits - len(res)} marginals missing; rerun to resume")
+    print(f"Saved to {output}")
@@ -0,0 +1,162 @@
+"""Factor a circuit into independent qubit components and solve them in parallel.
+
+When no 2-qubit gate ever connects two groups of qubits (P7, P8), the output
+state is a tensor product and its peak is the concatenation of the per-group
+peaks. `factor_circuit` splits the circuit along the connected components of
+its interaction graph and picks a method per component from its size:
+
+    idle         no gates: the qubit stays |0>
+    exact        <= INLINE_QUBITS qubits: untruncated native MPS, exact peak,
+                 solved in the parent process (not worth a fork)
+    statevector / mps / stabilizer
+                 chosen by the planner, run in a worker process each
+
+`solve_factored` runs the worker components concurrently through
+`job_runner`, largest first, so the wall time is that of the biggest
+component rather than the sum, and stitches the component peaks back into one
+Qiskit-ordered bitstring (local qubit i of a component = its i-th smallest
+original qubit; the final measurements of `qc` are honoured). Inside a
+job_runner worker (daemonic, so it cannot fork children) the worker
+components are solved one after another in-process instead.
+
+Usage:
+    from factoring import solve_factored
+    res = solve_factored(qc, shots=2000, bond_dim=128, workers=4)
+    res.bitstring, res.probability
+"""
+import multiprocessing as mp
+import os
+import time
+import traceback
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from gate_table import GateTable
+from job_runner import Job, JobResult, run_jobs
+from mps import measured_bitstring, simulate
+from planner import component_tables, plan_circuit
+
+INLINE_QUBITS = 10
+WORKER_METHODS = ("statevector", "mps", "stabilizer")
+
+@dataclass
+class Component:
+    qubits: np.ndarray   # original qubit indices, ascending; local qubit i = qubits[i]
+    table: GateTable     # gates on local qubits 0..k-1
+    method: str
+    seconds: float = 0.0  # planner estimate, used for scheduling
+
+@dataclass
+class Factored:
+    bitstring: str
+    probability: float
+    components: list[dict] = field(default_factory=list)
+
+def factor_circuit(circuit, bond_dim: int = 128, mem_mb: float | None = None) -> list[Component]:
+    """Independent components of `circuit` (QuantumCircuit or GateTable), each with a method."""
+    table = circuit if isinstance(circuit, GateTable) else GateTable.from_circuit(circuit)
+    parts = []
+    for qubits, sub in component_tables(table):
+        if len(sub) == 0:
+            parts.append(Component(qubits, sub, "idle"))
+        elif len(qubits) <= INLINE_QUBITS:
+            parts.append(Component(qubits, sub, "exact"))
+        else:
+            plan = plan_circuit(sub, max_bond=bond_dim, mem_mb=mem_mb, methods=WORKER_METHODS)
+            parts.append(Component(qubits, sub, plan.method, plan.chosen.seconds))
+    return parts
+
+def solve_component(table: GateTable, method: str, shots: int = 2000, bond_dim: int = 128) -> tuple[str, float]:
+    """Peak bitstring of one component (local Qiskit order) and its probability."""
+    if method == "idle":
+        return "0" * table.num_qubits, 1.0
+    if method == "exact":
+        # A beam as wide as the whole space makes the beam search exhaustive.
+        mps = simulate(table, max_bond=2 ** (table.num_qubits // 2))
+        return mps.top_bitstrings(2 ** table.num_qubits)[0]
+    from solve_circuit import run_mps, run_stabilizer, run_statevector
+    qc = table.to_circuit()
+    qc.measure_all()
+    if method == "statevector":
+        counts = run_statevector(qc, shots)
+    elif method == "stabilizer":
+        counts = run_stabilizer(qc, shots)
+    else:
+        counts = run_mps(qc, shots, bond_dim)
+    winner = max(counts, key=counts.get)
+    return winner, counts[winner] / sum(counts.values())
+
+def stitch(parts: list[Component], winners: list[str], num_qubits: int) -> str:
+    """Qiskit-ordered bitstring over all qubits from per-component local bitstrings."""
+    bits = ["0"] * num_qubits
+    for part, winner in zip(parts, winners):
+        for rel, q in enumerate(part.qubits.tolist()):
+            bits[q] = winner[-(rel + 1)]
+    return "".join(reversed(bits))
+
+def solve_factored(circuit, shots: int = 2000, bond_dim: int = 128, workers: int | None = None,
+                   mem_mb: float | None = None, timeout: float | None = None) -> Factored:
+    """Solve every component (workers concurrently) and join the peaks.
+
+    The probability is the product of the component peak probabilities.
+    `mem_mb`/`timeout` cap each worker process (when already running in a
+    daemonic worker, components run in-process under that worker's caps).
+    Raises RuntimeError if a component fails.
+    """
+    parts = factor_circuit(circuit, bond_dim=bond_dim, mem_mb=mem_mb)
+    num_qubits = sum(len(p.qubits) for p in parts)
+    print(f"  Factoring: {len(parts)} components, sizes {sorted((len(p.qubits) for p in parts), reverse=True)}")
+    winners: list[str | None] = [None] * len(parts)
+    probs = np.ones(len(parts))
+    elapsed = np.zeros(len(parts))
+
+    jobs = []
+    for i, part in enumerate(parts):
+        if part.method in WORKER_METHODS:
+            jobs.append(Job(str(i), solve_component,
+                            dict(table=part.table, method=part.method, shots=shots, bond_dim=bond_dim),
+                            mem_mb=mem_mb, timeout=timeout))
+        else:
+            t0 = time.perf_counter()
+            winners[i], probs[i] = solve_component(part.table, part.method)
+            elapsed[i] = time.perf_counter() - t0
+    jobs.sort(key=lambda job: -parts[int(job.name)].seconds)
+
+    errors = []
+
+    def on_result(res) -> bool:
+        i = int(res.job.name)
+        if not res.ok:
+            errors.append(f"component {i} ({len(parts[i].qubits)} qubits, {parts[i].method}): "
+                          f"{res.error.strip().splitlines()[-1] if res.error else 'failed'}")
+            return True
+        winners[i], probs[i] = res.value
+        elapsed[i] = res.elapsed
+        print(f"  Component {i}: {len(parts[i].qubits)} qubits, {parts[i].method}, "
+              f"p={probs[i]:.4f} ({res.elapsed:.2f}s)")
+        return False
+
+    if jobs and mp.current_process().daemon:
+        for job in jobs:
+            t0 = time.perf_counter()
+            try:
+                res = JobResult(job, True, job.fn(**job.kwargs))
+            except Exception:
+                res = JobResult(job, False, error=traceback.format_exc(limit=5))
+            res.elapsed = time.perf_counter() - t0
+            on_result(res)
+    elif jobs:
+        run_jobs(jobs, workers=min(workers or os.cpu_count() or 1, len(jobs)), on_result=on_result)
+    if errors:
+        raise RuntimeError("factored simulation failed: " + "; ".join(errors))
+
+    bitstring = stitch(parts, winners, num_qubits)
+    if not isinstance(circuit, GateTable):
+        bitstring = measured_bitstring(circuit, bitstring)
+    return Factored(
+        bitstring,
+        float(np.prod(probs)),
+        [{"qubits": p.qubits.tolist(), "method": p.method, "peak": w, "probability": float(pr), "seconds": float(t)}
+         for p, w, pr, t in zip(parts, winners, probs, elapsed)],
+    )
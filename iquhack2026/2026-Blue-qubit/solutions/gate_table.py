@@ -0,0 +1,242 @@
+"""Array-backed QASM loader for the challenge dialect.
+
+`QuantumCircuit.from_qasm_file` + walking `qc.data` with `find_bit` is the
+slowest part of most structural analyses on the 5-7k line P8/P10 files. A
+`GateTable` is the same circuit stored column-wise as NumPy arrays:
+
+    op      int8    opcode (see OPCODES)
+    q0, q1  int32   qubit operands (q1 = -1 for single-qubit gates)
+    params  (n, 3)  float64 gate parameters, left-aligned (rz(l) -> [l, 0, 0])
+
+so connectivity, angle and periodicity checks become array expressions.
+Barriers are dropped; `to_circuit()` rebuilds a QuantumCircuit when a
+simulation is needed.
+
+Usage:
+    from gate_table import GateTable
+    gt = GateTable.from_qasm_file("challenge/P9_grand_summit.qasm")
+    counts = gt.interaction_matrix()
+"""
+import math
+import re
+from dataclasses import dataclass
+from itertools import islice
+
+import numpy as np
+
+OPCODES = {"u3": 0, "cz": 1, "cx": 2, "rz": 3, "x": 4, "h": 5}
+OPNAMES = {v: k for k, v in OPCODES.items()}
+ALIASES = {"u": "u3", "U": "u3"}
+N_PARAMS = {"u3": 3, "cz": 0, "cx": 0, "rz": 1, "x": 0, "h": 0}
+TWO_QUBIT = np.array([OPCODES["cz"], OPCODES["cx"]], dtype=np.int8)
+
+_STMT_RE = re.compile(
+    r"^([A-Za-z_]\w*)\s*(?:\(([^)]*)\))?\s+([A-Za-z_]\w*)\s*\[\s*(\d+)\s*\]"
+    r"(?:\s*,\s*([A-Za-z_]\w*)\s*\[\s*(\d+)\s*\])?\s*;$",
+    re.M,
+)
+_REG_RE = re.compile(r"^qreg\s+([A-Za-z_][A-Za-z0-9_]*)\s*\[\s*(\d+)\s*\]\s*;")
+_SKIP = ("OPENQASM", "include", "creg", "barrier", "measure", "//")
+
+_expr_cache: dict[str, float] = {}
+
+def _param(expr: str) -> float:
+    """Evaluate a QASM parameter (plain float or simple expression in pi)."""
+    expr = expr.strip()
+    try:
+        return float(expr)
+    except ValueError:
+        pass
+    val = _expr_cache.get(expr)
+    if val is None:
+        if not re.fullmatch(r"[0-9eE.+\-*/() pi]+", expr):
+            raise ValueError(f"Unsupported QASM parameter: {expr!r}")
+        val = float(eval(expr, {"__builtins__": {}}, {"pi": math.pi}))
+        _expr_cache[expr] = val
+    return val
+
+@dataclass
+class GateTable:
+    num_qubits: int
+    op: np.ndarray
+    q0: np.ndarray
+    q1: np.ndarray
+    params: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.op)
+
+    # ------------------------------------------------------------------ loaders
+    @classmethod
+    def from_lines(cls, lines, chunk_size: int = 8192) -> "GateTable":
+        """Stream QASM 2.0 lines into columns without building a QuantumCircuit.
+
+        Lines are consumed in chunks and each chunk is tokenized with a single
+        regex pass, so memory stays bounded by the chunk and the result columns.
+        """
+        offsets: dict[str, int] = {}
+        n = 0
+        names, pstrs, r0, i0, r1, i1 = [], [], [], [], [], []
+        it = iter(lines)
+        while True:
+            chunk = list(islice(it, chunk_size))
+            if not chunk:
+                break
+            body = []
+            for raw in chunk:
+                line = raw.strip()
+                if not line or line.startswith(_SKIP):
+                    continue
+                m = _REG_RE.match(line)
+                if m:
+                    offsets[m.group(1)] = n
+                    n += int(m.group(2))
+                    continue
+                body.append(line)
+            text = "\n".join(body)
+            found = _STMT_RE.findall(text)
+            if len(found) != len(body):
+                bad = next(l for l in body if not _STMT_RE.fullmatch(l))
+                raise ValueError(f"Cannot parse QASM line: {bad!r}")
+            for name, pstr, ra, ia, rb, ib in found:
+                names.append(name)
+                pstrs.append(pstr)
+                r0.append(ra)
+                i0.append(ia)
+                r1.append(rb)
+                i1.append(ib)
+
+        names = [ALIASES.get(x, x) for x in names]
+        unknown = set(names) - set(OPCODES)
+        if unknown:
+            raise ValueError(f"Gates {sorted(unknown)} are outside the challenge dialect {sorted(OPCODES)}")
+        op = np.array([OPCODES[x] for x in names], dtype=np.int8)
+        q0 = np.array([offsets[r] + int(i) for r, i in zip(r0, i0)], dtype=np.int32)
+        q1 = np.array([offsets[r] + int(i) if r else -1 for r, i in zip(r1, i1)], dtype=np.int32)
+        arity = np.array([N_PARAMS[x] for x in names], dtype=np.int64)
+        is_two = np.isin(op, TWO_QUBIT)
+        if np.any(is_two != (q1 >= 0)):
+            bad = int(np.argmax(is_two != (q1 >= 0)))
+            raise ValueError(f"Bad qubit arity for {names[bad]} (gate #{bad})")
+
+        params = np.zeros((len(op), 3), dtype=np.float64)
+        tokens = [t for p in pstrs if p for t in p.split(",")]
+        got = np.array([len(p.split(",")) if p else 0 for p in pstrs], dtype=np.int64)
+        if np.any(got != arity):
+            bad = int(np.argmax(got != arity))
+            raise ValueError(f"Bad parameter count for {names[bad]} (gate #{bad})")
+        try:
+            flat = np.array(tokens, dtype=np.float64)
+        except ValueError:
+            flat = np.array([_param(t) for t in tokens], dtype=np.float64)
+        rows = np.repeat(np.arange(len(op)), arity)
+        cols = np.arange(len(rows)) - np.repeat(np.cumsum(arity) - arity, arity)
+        params[rows, cols] = flat
+        return cls(num_qubits=n, op=op, q0=q0, q1=q1, params=params)
+
+    @classmethod
+    def from_qasm_file(cls, path: str) -> "GateTable":
+        with open(path, "r") as f:
+            return cls.from_lines(f)
+
+    @classmethod
+    def from_qasm_str(cls, qasm_str: str) -> "GateTable":
+        return cls.from_lines(qasm_str.splitlines())
+
+    @classmethod
+    def from_circuit(cls, qc) -> "GateTable":
+        """Tabulate an existing QuantumCircuit (e.g. a PyZX/transpiler output)."""
+        index = {q: i for i, q in enumerate(qc.qubits)}
+        rows = []
+        for instr in qc.data:
+            name = ALIASES.get(instr.operation.name, instr.operation.name)
+            if name in ("barrier", "measure"):
+                continue
+            if name not in OPCODES:
+                raise ValueError(f"Gate {name!r} is outside the challenge dialect {sorted(OPCODES)}")
+            qs = [index[q] for q in instr.qubits]
+            p = [float(x) for x in instr.operation.params]
+            rows.append((OPCODES[name], qs[0], qs[1] if len(qs) == 2 else -1, p + [0.0] * (3 - len(p))))
+        return cls(
+            num_qubits=qc.num_qubits,
+            op=np.array([r[0] for r in rows], dtype=np.int8),
+            q0=np.array([r[1] for r in rows], dtype=np.int32),
+            q1=np.array([r[2] for r in rows], dtype=np.int32),
+            params=np.array([r[3] for r in rows], dtype=np.float64).reshape(-1, 3),
+        )
+
+    # ------------------------------------------------------------------ views
+    def select(self, index) -> "GateTable":
+        """Sub-table from a boolean mask, slice or index array (gate order kept)."""
+        return GateTable(self.num_qubits, self.op[index], self.q0[index], self.q1[index], self.params[index])
+
+    @property
+    def two_qubit_mask(self) -> np.ndarray:
+        return np.isin(self.op, TWO_QUBIT)
+
+    def edges(self) -> np.ndarray:
+        """(m, 2) array of sorted 2-qubit operand pairs in gate order."""
+        mask = self.two_qubit_mask
+        pairs = np.stack([self.q0[mask], self.q1[mask]], axis=1)
+        return np.sort(pairs, axis=1)
+
+    def interaction_matrix(self) -> np.ndarray:
+        """Symmetric n x n count of 2-qubit gates between each qubit pair."""
+        e = self.edges()
+        mat = np.zeros((self.num_qubits, self.num_qubits), dtype=np.int64)
+        np.add.at(mat, (e[:, 0], e[:, 1]), 1)
+        return mat + mat.T
+
+    def u3_params(self) -> np.ndarray:
+        """(k, 3) array of (theta, phi, lambda) for every u3 gate."""
+        return self.params[self.op == OPCODES["u3"]]
+
+    def counts(self) -> dict[str, int]:
+        codes, freq = np.unique(self.op, return_counts=True)
+        return {OPNAMES[int(c)]: int(k) for c, k in zip(codes, freq)}
+
+    # ------------------------------------------------------------------ export
+    def to_circuit(self, num_qubits: int | None = None):
+        """Rebuild a QuantumCircuit (barrier-free) for simulation."""
+        from qiskit import QuantumCircuit
+        from qiskit.circuit.library import CXGate, CZGate, HGate, RZGate, U3Gate, XGate
+
+        qc = QuantumCircuit(num_qubits or self.num_qubits)
+        qubits = qc.qubits
+        cz, cx, x, h = CZGate(), CXGate(), XGate(), HGate()
+        fixed = {OPCODES["cz"]: cz, OPCODES["cx"]: cx, OPCODES["x"]: x, OPCODES["h"]: h}
+        u3, rz = OPCODES["u3"], OPCODES["rz"]
+        for code, a, b, p in zip(self.op.tolist(), self.q0.tolist(), self.q1.tolist(), self.params.tolist()):
+            if code == u3:
+                qc._append(U3Gate(*p), [qubits[a]], [])
+            elif code == rz:
+                qc._append(RZGate(p[0]), [qubits[a]], [])
+            elif b >= 0:
+                qc._append(fixed[code], [qubits[a], qubits[b]], [])
+            else:
+                qc._append(fixed[code], [qubits[a]], [])
+        return qc
+
+    def to_qasm(self) -> str:
+        lines = ['OPENQASM 2.0;', 'include "qelib1.inc";', f"qreg q[{self.num_qubits}];"]
+        for code, a, b, p in zip(self.op.tolist(), self.q0.tolist(), self.q1.tolist(), self.params.tolist()):
+            name = OPNAMES[code]
+            args = f"q[{a}],q[{b}]" if b >= 0 else f"q[{a}]"
+            k = N_PARAMS[name]
+            plist = f"({','.join(repr(v) for v in p[:k])})" if k else ""
+            lines.append(f"{name}{plist} {args};")
+        return "\n".join(lines) + "\n"
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Load QASM files into gate tables and print a summary")
+    parser.add_argument("qasm", nargs="+")
+    args = parser.parse_args()
+    for path in args.qasm:
+        t0 = time.perf_counter()
+        gt = GateTable.from_qasm_file(path)
+        dt = time.perf_counter() - t0
+        inter = gt.interaction_matrix()
+        print(f"{path}: {gt.num_qubits} qubits, {len(gt)} gates {gt.counts()}, "
+              f"{int((inter > 0).sum() // 2)} distinct pairs ({dt * 1e3:.1f} ms)")
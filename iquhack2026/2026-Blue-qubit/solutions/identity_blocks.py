@@ -0,0 +1,249 @@
+"""Automatic identity-block (U·U†) elimination.
+
+solve_p9_pinched.py, verify_p9_core_perm.py and check_p9_core_minus_46.py
+hard-coded the P9 core as layers 40-52 and pasted a 56-entry scrambling map
+`S` found by graph matching. This pass finds such cores itself: a run of
+ASAP layers [a, b) whose unitary is a *qubit permutation* P (U·U† with the
+wires shuffled in between; P = identity for a plain U·U†).
+
+Search. A block that permutes wires maps a product state to a product
+state, so from every start layer a random product state is pushed through
+the following layers on a small MPS (`max_bond`). Whenever the state is a
+product again (all bonds 1), each output wire's local state is matched
+against the input states; a perfect one-to-one match is the candidate
+permutation. The sweep stops once the state needs more than `max_bond`, so
+a start costs a handful of cheap layers unless it is a real core. Maximal
+non-overlapping candidates are kept, longest first. The pivot is the layer
+after which the running state is most entangled (sum of log2 bond
+dimensions), i.e. the U / U† seam; ties go to the layer nearest the centre.
+
+Verification. Each candidate is re-run on `trials` fresh random product
+states with a larger bond cap and must map every input qubit's state onto
+its wire with fidelity >= 1 - tol and no bond-capped truncation. If
+P†·block is not proportional to the identity, a random product state is
+almost surely not one of its eigenvectors, so passing trials certify the
+block up to global phase.
+
+Collapse. Block gates are dropped and every later gate is moved onto the
+wire that now holds its state, so the collapsed circuit's wire
+`output_wire[w]` carries the original output qubit w. `restore_bitstring`
+maps a collapsed bitstring back; `certificate()` is the JSON record.
+
+Usage:
+    python solutions/identity_blocks.py challenge/P9_grand_summit.qasm \
+        --output challenge/P9_collapsed.qasm --certificate results/P9_collapse.json
+
+    from identity_blocks import collapse_circuit
+    col = collapse_circuit(LayeredCircuit.from_qasm_file("challenge/P9_grand_summit.qasm"))
+    col.table, col.restore_bitstring(peak)
+"""
+import json
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from gate_table import GateTable
+from layered import LayeredCircuit, asap_layers
+from mps import MPS, u3_matrix
+
+@dataclass
+class PermutationBlock:
+    start_layer: int
+    stop_layer: int         # exclusive
+    pivot_layer: int
+    perm: np.ndarray        # perm[q] = wire holding input qubit q's state after the block
+    num_gates: int
+    peak_bond: int          # largest bond seen while searching
+    fidelity: float = 0.0   # worst verification trial (0 = not verified)
+    trials: int = 0
+
+    @property
+    def is_identity(self) -> bool:
+        return bool(np.all(self.perm == np.arange(len(self.perm))))
+
+    def to_dict(self) -> dict:
+        return {"start_layer": self.start_layer, "stop_layer": self.stop_layer, "pivot_layer": self.pivot_layer,
+                "num_gates": self.num_gates, "identity": self.is_identity, "perm": self.perm.tolist(),
+                "peak_bond": self.peak_bond, "fidelity": self.fidelity, "trials": self.trials}
+
+@dataclass
+class Collapsed:
+    table: GateTable
+    output_wire: np.ndarray  # collapsed wire that carries original output qubit w
+    blocks: list[PermutationBlock] = field(default_factory=list)
+    gates_before: int = 0
+    depth_before: int = 0
+
+    @property
+    def depth(self) -> int:
+        return int(asap_layers(self.table).max()) + 1 if len(self.table) else 0
+
+    def restore_bitstring(self, bitstring: str) -> str:
+        """Qiskit-ordered bitstring of the collapsed circuit -> the original circuit's."""
+        bits = bitstring[::-1]
+        return "".join(bits[w] for w in self.output_wire.tolist())[::-1]
+
+    def certificate(self) -> dict:
+        return {"num_qubits": self.table.num_qubits,
+                "gates_before": self.gates_before, "gates_after": len(self.table),
+                "depth_before": self.depth_before, "depth_after": self.depth,
+                "output_wire": self.output_wire.tolist(),
+                "blocks": [b.to_dict() for b in self.blocks]}
+
+def _random_product(n: int, rng) -> np.ndarray:
+    """(n, 2) random single-qubit states."""
+    return np.stack([u3_matrix(*rng.uniform(0, 2 * np.pi, 3))[:, 0] for _ in range(n)])
+
+def _prepare(states: np.ndarray, max_bond: int) -> MPS:
+    mps = MPS(len(states), max_bond=max_bond)
+    for q, v in enumerate(states):
+        mps.tensors[q] = v.reshape(1, 2, 1).astype(complex)
+    return mps
+
+def _product_states(mps: MPS) -> np.ndarray | None:
+    """(n, 2) per-qubit states if the MPS is a product state, else None."""
+    if mps.max_bond_dim > 1:
+        return None
+    out = np.empty((mps.num_qubits, 2), dtype=complex)
+    for s, A in enumerate(mps.tensors):
+        v = A[0, :, 0]
+        out[mps.qubit_at[s]] = v / np.linalg.norm(v)
+    return out
+
+def _fidelities(inp: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """[q, w] = |<in_q|out_w>|^2."""
+    return np.abs(inp.conj() @ out.T) ** 2
+
+def _match(inp: np.ndarray, out: np.ndarray, tol: float) -> np.ndarray | None:
+    """perm with out[perm[q]] ~ inp[q] for every q, if it is one-to-one."""
+    fid = _fidelities(inp, out)
+    perm = np.argmax(fid, axis=1)
+    if np.any(fid[np.arange(len(perm)), perm] < 1 - tol) or len(np.unique(perm)) != len(perm):
+        return None
+    return perm
+
+def _pivot(a: int, b: int, entropy: list[float]) -> int:
+    """Layer in [a, b) after which the state was most entangled, ties broken towards the centre."""
+    centre = (a + b - 1) / 2
+    return max(range(a, b), key=lambda t: (round(entropy[t - a], 9), -abs(t - centre), -t))
+
+def find_blocks(lc: LayeredCircuit, max_bond: int = 8, min_layers: int = 2, tol: float = 1e-8,
+                seed: int = 0) -> list[PermutationBlock]:
+    """Maximal non-overlapping permutation-block candidates (unverified), in layer order."""
+    rng = np.random.default_rng(seed)
+    n = lc.num_qubits
+    layers = [lc.layer_table(t) for t in range(lc.num_layers)]
+    candidates = []
+    for a in range(lc.num_layers):
+        inp = _random_product(n, rng)
+        mps = _prepare(inp, max_bond)
+        best, peak, entropy = None, 1, []
+        for b in range(a, lc.num_layers):
+            mps.apply_table(layers[b])
+            if mps.num_capped:
+                break
+            peak = max(peak, mps.max_bond_dim)
+            entropy.append(float(np.sum(np.log2(mps.bond_dims))))
+            out = _product_states(mps)
+            if out is not None and b - a + 1 >= min_layers:
+                perm = _match(inp, out, tol)
+                if perm is not None:
+                    best = (b + 1, perm, peak)
+        if best is not None:
+            stop, perm, pk = best
+            num_gates = int(lc.bounds[stop] - lc.bounds[a])
+            candidates.append(PermutationBlock(a, stop, _pivot(a, stop, entropy), perm, num_gates, pk))
+    chosen: list[PermutationBlock] = []
+    for c in sorted(candidates, key=lambda c: (-(c.stop_layer - c.start_layer), c.start_layer)):
+        if all(c.stop_layer <= k.start_layer or c.start_layer >= k.stop_layer for k in chosen):
+            chosen.append(c)
+    return sorted(chosen, key=lambda c: c.start_layer)
+
+def verify_block(lc: LayeredCircuit, block: PermutationBlock, trials: int = 3, max_bond: int = 64,
+                 tol: float = 1e-8, seed: int = 1) -> bool:
+    """Re-check `block.perm` on fresh random product states; records the worst fidelity on the block."""
+    rng = np.random.default_rng(seed)
+    table = lc.layer_table(block.start_layer, block.stop_layer - 1)
+    worst = 1.0
+    for _ in range(trials):
+        inp = _random_product(lc.num_qubits, rng)
+        mps = _prepare(inp, max_bond).apply_table(table)
+        out = _product_states(mps)
+        if mps.num_capped or out is None:
+            worst = 0.0
+            break
+        fid = _fidelities(inp, out)[np.arange(len(inp)), block.perm]
+        worst = min(worst, float(np.prod(fid)))
+    block.fidelity, block.trials = worst, trials
+    return worst >= 1 - tol
+
+def collapse(lc: LayeredCircuit, blocks: list[PermutationBlock]) -> Collapsed:
+    """Drop the blocks' gates and relabel every later gate onto the wire holding its state."""
+    t = lc.table
+    n = t.num_qubits
+    wire = np.arange(n)  # original wire -> collapsed wire
+    pieces, prev = [], 0
+    for block in sorted(blocks, key=lambda b: b.start_layer):
+        pieces.append((lc.order[lc.bounds[prev]:lc.bounds[block.start_layer]], wire.copy()))
+        inv = np.argsort(block.perm)
+        wire = wire[inv]  # original wire perm[q] now holds what wire q held
+        prev = block.stop_layer
+    pieces.append((lc.order[lc.bounds[prev]:], wire.copy()))
+    op, q0, q1, params = [], [], [], []
+    for g, w in pieces:
+        op.append(t.op[g])
+        q0.append(w[t.q0[g]])
+        q1.append(np.where(t.q1[g] >= 0, w[np.maximum(t.q1[g], 0)], -1))
+        params.append(t.params[g])
+    table = GateTable(n, np.concatenate(op).astype(np.int8), np.concatenate(q0).astype(np.int32),
+                      np.concatenate(q1).astype(np.int32), np.concatenate(params).reshape(-1, 3))
+    return Collapsed(table, wire, list(blocks), len(t), lc.num_layers)
+
+def collapse_circuit(circuit, max_bond: int = 8, verify_bond: int = 64, trials: int = 3, min_layers: int = 2,
+                     tol: float = 1e-8, seed: int = 0) -> Collapsed:
+    """Find, verify and collapse every permutation block of a LayeredCircuit / GateTable / QuantumCircuit.
+
+    Candidates that fail verification are kept in the circuit.
+    """
+    if isinstance(circuit, LayeredCircuit):
+        lc = circuit
+    elif isinstance(circuit, GateTable):
+        lc = LayeredCircuit(circuit)
+    else:
+        lc = LayeredCircuit.from_circuit(circuit)
+    blocks = find_blocks(lc, max_bond=max_bond, min_layers=min_layers, tol=tol, seed=seed)
+    verified = [b for b in blocks if verify_block(lc, b, trials=trials, max_bond=verify_bond, tol=tol, seed=seed + 1)]
+    return collapse(lc, verified)
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Find and remove blocks that only permute qubits (U·U† cores)")
+    parser.add_argument("qasm")
+    parser.add_argument("--max-bond", type=int, default=8, help="Bond cap while searching")
+    parser.add_argument("--verify-bond", type=int, default=64, help="Bond cap while verifying")
+    parser.add_argument("--trials", type=int, default=3, help="Random product states per verification")
+    parser.add_argument("--min-layers", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Write the collapsed circuit as QASM")
+    parser.add_argument("--certificate", default=None, help="Write the certificate as JSON")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    col = collapse_circuit(LayeredCircuit.from_qasm_file(args.qasm), max_bond=args.max_bond,
+                           verify_bond=args.verify_bond, trials=args.trials, min_layers=args.min_layers,
+                           seed=args.seed)
+    print(f"{args.qasm}: {len(col.blocks)} blocks collapsed in {time.perf_counter() - t0:.1f}s")
+    for b in col.blocks:
+        kind = "identity" if b.is_identity else f"permutation ({int(np.sum(b.perm != np.arange(len(b.perm))))} wires moved)"
+        print(f"  layers {b.start_layer}-{b.stop_layer - 1}, pivot {b.pivot_layer}: {b.num_gates} gates, {kind}, "
+              f"fidelity {b.fidelity:.12f} over {b.trials} trials")
+    print(f"  gates {col.gates_before} -> {len(col.table)}, depth {col.depth_before} -> {col.depth}")
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(col.table.to_qasm())
+        print(f"Collapsed circuit saved to {args.output}")
+    if args.certificate:
+        with open(args.certificate, "w") as f:
+            json.dump(col.certificate(), f, indent=2)
+        print(f"Certificate saved to {args.certificate}")
@@ -0,0 +1,122 @@
+"""Process-per-job runner with resource caps and early cancellation.
+
+`concurrent.futures.ProcessPoolExecutor` can neither cap a single worker's
+memory nor kill a job that is already running, and both matter when one
+pipeline (e.g. P9 at bond_dim=256) can eat all RAM or the answer is already
+known. Each job here gets its own forked process with optional
+RLIMIT_AS / RLIMIT_CPU limits and a wall-clock timeout; the `on_result`
+callback sees every outcome as it arrives and can stop everything else by
+returning True.
+"""
+import multiprocessing as mp
+import os
+import queue
+import resource
+import sys
+import time
+import traceback
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+@dataclass
+class Job:
+    name: str
+    fn: Callable
+    kwargs: dict = field(default_factory=dict)
+    mem_mb: float | None = None   # address-space cap for the worker
+    cpu_s: float | None = None    # CPU-seconds cap for the worker
+    timeout: float | None = None  # wall-clock budget, enforced by the parent
+    log_path: str | None = None   # worker stdout/stderr go here instead of the console
+
+@dataclass
+class JobResult:
+    job: Job
+    ok: bool
+    value: Any = None
+    error: str | None = None
+    elapsed: float = 0.0
+
+def _worker(job: Job, out: "mp.Queue", quiet: bool) -> None:
+    if job.mem_mb:
+        limit = int(job.mem_mb * 1024 * 1024)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    if job.cpu_s:
+        cpu = int(job.cpu_s) + 1
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu))
+    if job.log_path:
+        sys.stdout = sys.stderr = open(job.log_path, "w", buffering=1)
+    elif quiet:
+        sys.stdout = open(os.devnull, "w")
+    try:
+        out.put((job.name, True, job.fn(**job.kwargs), None))
+    except MemoryError:
+        out.put((job.name, False, None, f"MemoryError (cap {job.mem_mb} MB)"))
+    except BaseException:
+        out.put((job.name, False, None, traceback.format_exc(limit=5)))
+
+def run_jobs(jobs: list[Job], workers: int, on_result: Callable[[JobResult], bool | None],
+             quiet: bool = True, poll: float = 0.2) -> list[JobResult]:
+    """Run `jobs` (in list order) on up to `workers` processes.
+
+    Returns the collected results; jobs that were cancelled never appear.
+    """
+    ctx = mp.get_context("fork")
+    out = ctx.Queue()
+    pending = list(jobs)
+    running: dict[str, tuple[Job, Any, float]] = {}
+    results: list[JobResult] = []
+    dead_since: dict[str, float] = {}
+    stop = False
+
+    def finish(res: JobResult) -> bool:
+        results.append(res)
+        return bool(on_result(res))
+
+    try:
+        while (pending and not stop) or running:
+            while pending and not stop and len(running) < workers:
+                job = pending.pop(0)
+                proc = ctx.Process(target=_worker, args=(job, out, quiet), daemon=True)
+                proc.start()
+                running[job.name] = (job, proc, time.perf_counter())
+
+            messages = []
+            try:
+                messages.append(out.get(timeout=poll))
+                while True:
+                    messages.append(out.get_nowait())
+            except queue.Empty:
+                pass
+            for name, ok, value, error in messages:
+                if name not in running:
+                    continue
+                job, proc, t0 = running.pop(name)
+                dead_since.pop(name, None)
+                proc.join(timeout=5)
+                stop = finish(JobResult(job, ok, value, error, time.perf_counter() - t0)) or stop
+
+            now = time.perf_counter()
+            for name, (job, proc, t0) in list(running.items()):
+                if job.timeout and now - t0 > job.timeout:
+                    proc.terminate()
+                    proc.join()
+                    running.pop(name)
+                    stop = finish(JobResult(job, False, None, f"timeout after {job.timeout:.0f}s", now - t0)) or stop
+                elif not proc.is_alive():
+                    # Died without reporting (OOM kill, RLIMIT_CPU signal, segfault);
+                    # give an in-flight queue message a grace period first.
+                    if now - dead_since.setdefault(name, now) > 1.0:
+                        running.pop(name)
+                        dead_since.pop(name)
+                        stop = finish(JobResult(job, False, None, f"worker exited with code {proc.exitcode}", now - t0)) or stop
+
+            if stop:
+                for job, proc, _ in running.values():
+                    proc.terminate()
+                for job, proc, _ in running.values():
+                    proc.join()
+                running.clear()
+    finally:
+        for job, proc, _ in running.values():
+            proc.terminate()
+    return results
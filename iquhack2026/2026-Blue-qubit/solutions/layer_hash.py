@@ -0,0 +1,173 @@
+"""Permutation-invariant layer hashing for identical / adjoint block search.
+
+check_p9_adjoint_blocks.py and compare_bitcoin_layers.py compared every pair
+of layers (O(L^2)) with frozenset / isclose fingerprints keyed on absolute
+qubit indices, so a block that reappears on relabelled qubits was never
+matched. Here every block of `width` consecutive ASAP layers gets four
+hashes:
+
+    labeled        exact content: qubit indices, gate order, gate matrices
+    canonical      Weisfeiler-Lehman hash of the block's interaction graph:
+                   node colour = the qubit's 1-qubit gates (matrix up to
+                   global phase, quantized) by layer offset, edges coloured
+                   by layer offset and gate (CX keeps control/target roles),
+                   refined `wl_rounds` times; invariant under qubit relabelling
+    adj_labeled / adj_canonical
+                   the same hashes of the block's adjoint (layers reversed,
+                   every gate daggered; CX/CZ are self-inverse)
+
+Blocks are then bucketed by hash, so identical, permuted, adjoint and
+permuted-adjoint pairs come out of one pass over the circuit. WL colours can
+collide for non-isomorphic graphs (e.g. regular graphs), so a `canonical`
+match is a candidate to be confirmed, not a proof; `labeled` matches are
+exact up to the quantization.
+
+Usage:
+    python solutions/layer_hash.py challenge/P9_grand_summit.qasm --width 2
+    python solutions/layer_hash.py challenge/P9_grand_summit.qasm challenge/P10_eternal_mountain.qasm
+"""
+import hashlib
+from collections import defaultdict
+from dataclasses import dataclass
+
+import numpy as np
+
+from gate_table import OPCODES
+from layered import LayeredCircuit
+from mps import gate_matrix
+
+MATCH_KINDS = ("identical", "permuted", "adjoint", "permuted-adjoint")
+
+def _h(*parts) -> int:
+    """Stable 64-bit hash (Python's hash() of str is salted per process)."""
+    return int.from_bytes(hashlib.blake2b(repr(parts).encode(), digest_size=8).digest(), "little")
+
+def matrix_key(U: np.ndarray, decimals: int = 6) -> tuple:
+    """Quantized 2x2 matrix with the global phase removed (largest entry made real positive)."""
+    flat = U.ravel()
+    k = int(np.argmax(np.abs(flat) > np.abs(flat).max() - 10.0 ** -decimals))
+    v = flat * (abs(flat[k]) / flat[k])
+    scale = 10.0 ** decimals
+    return tuple(int(x) for x in np.round(np.concatenate([v.real, v.imag]) * scale))
+
+@dataclass
+class BlockSignature:
+    start: int          # first layer
+    stop: int           # last layer + 1
+    qubits: frozenset   # qubits touched
+    labeled: int
+    canonical: int
+    adj_labeled: int
+    adj_canonical: int
+
+def _hashes(ones: dict, edges: list, wl_rounds: int) -> tuple[int, int]:
+    """(labeled, canonical) hash of {qubit: [(t, key), ...]} and [(t, code, q0, q1), ...]."""
+    labeled = _h(tuple(sorted((q, tuple(sorted(v))) for q, v in ones.items())), tuple(sorted(edges)))
+    nodes = set(ones) | {q for e in edges for q in e[2:]}
+    colour = {q: _h(tuple(sorted(ones.get(q, ())))) for q in nodes}
+    nbrs = defaultdict(list)
+    cz = OPCODES["cz"]
+    for t, code, a, b in edges:
+        if code == cz:
+            nbrs[a].append((t, code, 0, b))
+            nbrs[b].append((t, code, 0, a))
+        else:  # directed: role 1 = control, 2 = target
+            nbrs[a].append((t, code, 1, b))
+            nbrs[b].append((t, code, 2, a))
+    for _ in range(wl_rounds):
+        colour = {q: _h(colour[q], tuple(sorted((t, c, r, colour[o]) for t, c, r, o in nbrs[q]))) for q in nodes}
+    return labeled, _h(tuple(sorted(colour.values())))
+
+def block_signature(lc: LayeredCircuit, a: int, b: int, wl_rounds: int = 3, decimals: int = 6) -> BlockSignature:
+    """Signatures of layers a..b inclusive."""
+    t = lc.table
+    width = b - a + 1
+    ones, adj_ones, edges, adj_edges = defaultdict(list), defaultdict(list), [], []
+    for g in np.sort(lc.gates(a, b)).tolist():
+        off = int(lc.layer[g]) - a
+        code, q0, q1 = int(t.op[g]), int(t.q0[g]), int(t.q1[g])
+        if q1 >= 0:
+            edges.append((off, code, q0, q1))
+            adj_edges.append((width - 1 - off, code, q0, q1))
+        else:
+            U = gate_matrix(code, t.params[g])
+            ones[q0].append((off, matrix_key(U, decimals)))
+            adj_ones[q0].append((width - 1 - off, matrix_key(U.conj().T, decimals)))
+    labeled, canonical = _hashes(ones, edges, wl_rounds)
+    adj_labeled, adj_canonical = _hashes(adj_ones, adj_edges, wl_rounds)
+    qubits = frozenset(ones) | frozenset(q for e in edges for q in e[2:])
+    return BlockSignature(a, b + 1, qubits, labeled, canonical, adj_labeled, adj_canonical)
+
+def block_signatures(lc: LayeredCircuit, width: int = 1, step: int | None = None, wl_rounds: int = 3,
+                     decimals: int = 6) -> list[BlockSignature]:
+    """Signatures of blocks of `width` layers every `step` layers (default: non-overlapping)."""
+    step = step or width
+    return [block_signature(lc, a, min(a + width, lc.num_layers) - 1, wl_rounds, decimals)
+            for a in range(0, lc.num_layers, step)]
+
+class LayerIndex:
+    """Hash buckets over the block signatures of one or more circuits."""
+
+    def __init__(self):
+        self.blocks: list[tuple[str, BlockSignature]] = []
+        self._labeled = defaultdict(list)
+        self._canonical = defaultdict(list)
+
+    def add(self, name: str, sigs: list[BlockSignature]) -> None:
+        for s in sigs:
+            i = len(self.blocks)
+            self.blocks.append((name, s))
+            self._labeled[s.labeled].append(i)
+            self._canonical[s.canonical].append(i)
+
+    def matches(self, skip_empty: bool = True) -> list[tuple[int, int, str]]:
+        """(i, j, kind) with i < j over all indexed blocks, strongest kind per pair.
+
+        Identical implies permuted (and adjoint implies permuted-adjoint), so
+        each pair is reported once with the most specific kind.
+        """
+        found = {}
+        for i, (_, s) in enumerate(self.blocks):
+            if skip_empty and not s.qubits:
+                continue
+            for kind, bucket, key in (("identical", self._labeled, s.labeled),
+                                      ("permuted", self._canonical, s.canonical),
+                                      ("adjoint", self._labeled, s.adj_labeled),
+                                      ("permuted-adjoint", self._canonical, s.adj_canonical)):
+                for j in bucket.get(key, ()):
+                    if j == i or (kind in ("identical", "permuted") and j < i):
+                        continue
+                    pair = (min(i, j), max(i, j))
+                    if pair not in found or MATCH_KINDS.index(kind) < MATCH_KINDS.index(found[pair]):
+                        found[pair] = kind
+        return sorted((i, j, k) for (i, j), k in found.items())
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Find identical / adjoint (optionally permuted) layer blocks")
+    parser.add_argument("qasm", nargs="+")
+    parser.add_argument("--width", type=int, default=1, help="Layers per block")
+    parser.add_argument("--step", type=int, default=None, help="Block stride in layers (default: --width)")
+    parser.add_argument("--wl-rounds", type=int, default=3)
+    parser.add_argument("--decimals", type=int, default=6, help="Matrix quantization")
+    parser.add_argument("--min-qubits", type=int, default=4, help="Only report blocks touching this many qubits")
+    parser.add_argument("--kinds", nargs="+", choices=MATCH_KINDS, default=list(MATCH_KINDS))
+    args = parser.parse_args()
+
+    index = LayerIndex()
+    t0 = time.perf_counter()
+    for path in args.qasm:
+        lc = LayeredCircuit.from_qasm_file(path)
+        index.add(path, block_signatures(lc, args.width, args.step, args.wl_rounds, args.decimals))
+    matches = [(i, j, k) for i, j, k in index.matches() if k in args.kinds
+               and min(len(index.blocks[i][1].qubits), len(index.blocks[j][1].qubits)) >= args.min_qubits]
+    print(f"{len(index.blocks)} blocks hashed, {len(matches)} matches in {time.perf_counter() - t0:.2f}s")
+    counts = defaultdict(int)
+    for i, j, kind in matches:
+        counts[kind] += 1
+        (na, a), (nb, b) = index.blocks[i], index.blocks[j]
+        where = f"layers {a.start}-{a.stop - 1} / {b.start}-{b.stop - 1}" if na == nb else \
+            f"{na}:{a.start}-{a.stop - 1} / {nb}:{b.start}-{b.stop - 1}"
+        print(f"  {kind:<17} {where} ({len(a.qubits)} qubits)")
+    print("  " + ", ".join(f"{k}: {counts[k]}" for k in MATCH_KINDS))
@@ -0,0 +1,166 @@
+"""Layered-circuit IR with cached ASAP layer assignment.
+
+Replaces the `qubit_time` / `q_t` loop that is copy-pasted across the P9
+scripts:
+
+    start_time = max(qubit_time[i] for i in qargs)
+    for i in qargs: qubit_time[i] = start_time + 1
+
+Every gate (1- or 2-qubit) occupies one time step, exactly as in those
+scripts. Layers are computed once on top of a `GateTable`; gates are then kept
+sorted by layer so any layer or layer range is a contiguous slice of
+`order`, and the whole thing is persisted to `<name>.layers.npz` next to the
+QASM so later runs skip parsing and layering.
+
+Usage:
+    from layered import LayeredCircuit
+    lc = LayeredCircuit.from_qasm_file("challenge/P9_grand_summit.qasm")
+    lc.edges(46), lc.u3_params(46), lc.to_circuit(40, 52)
+"""
+import hashlib
+import os
+
+import numpy as np
+
+from gate_table import OPCODES, GateTable
+
+NPZ_SUFFIX = ".layers.npz"
+LAYOUT_VERSION = 1
+
+def asap_layers(table: GateTable) -> np.ndarray:
+    """ASAP time step of every gate (unit duration, shared-qubit dependencies)."""
+    qubit_time = [0] * table.num_qubits
+    layer = np.empty(len(table), dtype=np.int32)
+    for g, (a, b) in enumerate(zip(table.q0.tolist(), table.q1.tolist())):
+        if b >= 0:
+            t = qubit_time[a] if qubit_time[a] >= qubit_time[b] else qubit_time[b]
+            qubit_time[a] = qubit_time[b] = t + 1
+        else:
+            t = qubit_time[a]
+            qubit_time[a] = t + 1
+        layer[g] = t
+    return layer
+
+class LayeredCircuit:
+    def __init__(self, table: GateTable, layer: np.ndarray | None = None, circuit=None):
+        self.table = table
+        self.layer = asap_layers(table) if layer is None else np.asarray(layer, dtype=np.int32)
+        self.num_layers = int(self.layer.max()) + 1 if len(self.layer) else 0
+        # Stable sort keeps the original gate order inside each layer.
+        self.order = np.argsort(self.layer, kind="stable")
+        self.bounds = np.searchsorted(self.layer[self.order], np.arange(self.num_layers + 1))
+        # Optional source QuantumCircuit whose instructions `to_circuit` reuses.
+        self.circuit = circuit
+        self._src_index = None
+        if circuit is not None:
+            self._src_index = [i for i, instr in enumerate(circuit.data)
+                               if instr.operation.name not in ("barrier", "measure")]
+
+    @property
+    def num_qubits(self) -> int:
+        return self.table.num_qubits
+
+    # ------------------------------------------------------------------ loaders
+    @classmethod
+    def from_circuit(cls, qc) -> "LayeredCircuit":
+        return cls(GateTable.from_circuit(qc), circuit=qc)
+
+    @classmethod
+    def from_qasm_file(cls, path: str, use_cache: bool = True) -> "LayeredCircuit":
+        """Load from `<name>.layers.npz` when it matches the QASM contents, else build and persist it."""
+        with open(path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        npz_path = os.path.splitext(path)[0] + NPZ_SUFFIX
+        if use_cache and os.path.exists(npz_path):
+            lc = cls.load_npz(npz_path, expected_digest=digest)
+            if lc is not None:
+                return lc
+        lc = cls(GateTable.from_qasm_file(path))
+        if use_cache:
+            lc.save_npz(npz_path, digest)
+        return lc
+
+    def save_npz(self, path: str, digest: str = "") -> None:
+        t = self.table
+        tmp = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez_compressed(
+            tmp, version=LAYOUT_VERSION, digest=digest, num_qubits=t.num_qubits,
+            op=t.op, q0=t.q0, q1=t.q1, params=t.params, layer=self.layer,
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load_npz(cls, path: str, expected_digest: str | None = None) -> "LayeredCircuit | None":
+        """Load a persisted IR; returns None if it is stale or from another layout version."""
+        with np.load(path) as z:
+            if int(z["version"]) != LAYOUT_VERSION:
+                return None
+            if expected_digest is not None and str(z["digest"]) != expected_digest:
+                return None
+            table = GateTable(int(z["num_qubits"]), z["op"], z["q0"], z["q1"], z["params"])
+            return cls(table, z["layer"])
+
+    # ------------------------------------------------------------------ views
+    def gates(self, a: int, b: int | None = None) -> np.ndarray:
+        """Gate indices (into `table`) for layer `a`, or layers `a..b` inclusive."""
+        b = a if b is None else b
+        return self.order[self.bounds[a]:self.bounds[b + 1]]
+
+    def layer_table(self, a: int, b: int | None = None) -> GateTable:
+        return self.table.select(self.gates(a, b))
+
+    def edges(self, t: int) -> set[tuple[int, int]]:
+        """Sorted 2-qubit operand pairs acting in layer `t`."""
+        g = self.gates(t)
+        g = g[self.table.q1[g] >= 0]
+        lo = np.minimum(self.table.q0[g], self.table.q1[g])
+        hi = np.maximum(self.table.q0[g], self.table.q1[g])
+        return set(zip(lo.tolist(), hi.tolist()))
+
+    def edge_sets(self) -> list[frozenset]:
+        return [frozenset(self.edges(t)) for t in range(self.num_layers)]
+
+    def two_qubit_layers(self) -> np.ndarray:
+        """Indices of layers that contain at least one 2-qubit gate."""
+        return np.unique(self.layer[self.table.q1 >= 0])
+
+    def u3_params(self, t: int) -> tuple[np.ndarray, np.ndarray]:
+        """(qubits, (k, 3) params) of the u3 gates in layer `t`."""
+        g = self.gates(t)
+        g = g[self.table.op[g] == OPCODES["u3"]]
+        return self.table.q0[g], self.table.params[g]
+
+    def u3_param_map(self, t: int) -> dict[int, np.ndarray]:
+        qubits, params = self.u3_params(t)
+        return dict(zip(qubits.tolist(), params))
+
+    def to_circuit(self, a: int = 0, b: int | None = None):
+        """QuantumCircuit of layers `a..b` inclusive (gate order preserved).
+
+        When built from a QuantumCircuit the original CircuitInstruction objects
+        are appended as-is instead of being re-created.
+        """
+        b = self.num_layers - 1 if b is None else b
+        idx = np.sort(self.gates(a, b))
+        if self.circuit is None:
+            return self.table.select(idx).to_circuit()
+        from qiskit import QuantumCircuit
+        src = self.circuit
+        out = QuantumCircuit(*src.qregs)
+        for i in idx.tolist():
+            out._append(src.data[self._src_index[i]])
+        return out
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Build (and cache) the layered IR for QASM files")
+    parser.add_argument("qasm", nargs="+")
+    parser.add_argument("--no-cache", action="store_true")
+    args = parser.parse_args()
+    for path in args.qasm:
+        t0 = time.perf_counter()
+        lc = LayeredCircuit.from_qasm_file(path, use_cache=not args.no_cache)
+        dt = time.perf_counter() - t0
+        print(f"{path}: {lc.num_qubits} qubits, {len(lc.table)} gates, {lc.num_layers} layers, "
+              f"{len(lc.two_qubit_layers())} with 2q gates ({dt * 1e3:.1f} ms)")
@@ -0,0 +1,133 @@
+"""Backward causal cones of every output qubit in one reverse pass.
+
+`scripts/analyze_lightcones.py` walked the whole circuit backwards once per
+qubit with Python set unions (O(qubits x gates) set operations), and
+`p9_subcircuit_solver.py` did the same again after a PyZX reduction. Here
+each qubit wire carries a bitset row of the *outputs* whose cone currently
+contains it (uint64 words, bit o = output qubit o). Walking the gates once
+from the end:
+
+    2-qubit gate (a, b):  rows[a] = rows[b] = rows[a] | rows[b]
+    every gate g:         gate_mask[g] = rows of its operands (OR-ed)
+
+After the pass, output o's cone holds input qubit q iff bit o of rows[q] is
+set, and gate g iff bit o of gate_mask[g] is set.
+
+Usage:
+    from lightcone import lightcones
+    lc = lightcones(GateTable.from_qasm_file("challenge/P9_grand_summit.qasm"))
+    lc.qubits(36), lc.gates(36), lc.sizes()
+    sub, qubits, target = lc.subcircuit(36)
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from gate_table import GateTable
+
+def _operands(circuit) -> tuple[np.ndarray, np.ndarray]:
+    """(q0, q1) per gate, q1 = -1 for single-qubit gates; barriers/measures dropped."""
+    if isinstance(circuit, GateTable):
+        return circuit.q0, circuit.q1
+    index = {q: i for i, q in enumerate(circuit.qubits)}
+    q0, q1 = [], []
+    for instr in circuit.data:
+        if instr.operation.name in ("barrier", "measure"):
+            continue
+        qs = [index[q] for q in instr.qubits]
+        if len(qs) > 2:
+            raise ValueError(f"{instr.operation.name} acts on {len(qs)} qubits; decompose to 1-/2-qubit gates first")
+        q0.append(qs[0])
+        q1.append(qs[1] if len(qs) == 2 else -1)
+    return np.array(q0, dtype=np.int32), np.array(q1, dtype=np.int32)
+
+def _bits(rows: np.ndarray, o: int) -> np.ndarray:
+    """Boolean column: which rows have bit o set."""
+    return ((rows[:, o >> 6] >> np.uint64(o & 63)) & np.uint64(1)).astype(bool)
+
+@dataclass
+class Lightcones:
+    circuit: object          # GateTable or QuantumCircuit the cones were computed on
+    qubit_mask: np.ndarray   # (n, words) uint64, row q = outputs whose cone contains qubit q
+    gate_mask: np.ndarray    # (m, words) uint64, row g = outputs whose cone contains gate g
+
+    @property
+    def num_qubits(self) -> int:
+        return self.qubit_mask.shape[0]
+
+    def qubits(self, o: int) -> np.ndarray:
+        """Ascending qubits in output o's backward cone (always includes o)."""
+        return np.flatnonzero(_bits(self.qubit_mask, o))
+
+    def gates(self, o: int) -> np.ndarray:
+        """Indices (program order, barriers/measures skipped) of the gates in o's cone."""
+        return np.flatnonzero(_bits(self.gate_mask, o))
+
+    def sizes(self) -> tuple[np.ndarray, np.ndarray]:
+        """(cone qubit count, cone gate count) for every output qubit."""
+        def counts(mask):
+            bits = np.unpackbits(mask.view(np.uint8), axis=1, bitorder="little")[:, :self.num_qubits]
+            return bits.sum(axis=0, dtype=np.int64)
+        return counts(self.qubit_mask), counts(self.gate_mask)
+
+    def subcircuit(self, o: int):
+        """(standalone cone circuit on qubits 0..k-1, original qubits, local index of o).
+
+        Local qubit i is original qubit `qubits[i]`; the result is a GateTable
+        or QuantumCircuit, matching what the cones were computed on.
+        """
+        qubits, gates = self.qubits(o), self.gates(o)
+        remap = np.full(self.num_qubits, -1, dtype=np.int32)
+        remap[qubits] = np.arange(len(qubits), dtype=np.int32)
+        target = int(remap[o])
+        if isinstance(self.circuit, GateTable):
+            sub = self.circuit.select(gates)
+            q1 = np.where(sub.q1 >= 0, remap[np.maximum(sub.q1, 0)], -1).astype(np.int32)
+            return GateTable(len(qubits), sub.op, remap[sub.q0], q1, sub.params), qubits, target
+        from qiskit import QuantumCircuit
+        src = [instr for instr in self.circuit.data if instr.operation.name not in ("barrier", "measure")]
+        index = {q: i for i, q in enumerate(self.circuit.qubits)}
+        out = QuantumCircuit(len(qubits))
+        for g in gates.tolist():
+            instr = src[g]
+            out.append(instr.operation, [int(remap[index[q]]) for q in instr.qubits])
+        return out, qubits, target
+
+def lightcones(circuit) -> Lightcones:
+    """Cones of all output qubits of a GateTable or QuantumCircuit in one reverse pass."""
+    q0, q1 = _operands(circuit)
+    n = circuit.num_qubits
+    words = (n + 63) // 64
+    rows = np.zeros((n, words), dtype=np.uint64)
+    rows[np.arange(n), np.arange(n) >> 6] = np.uint64(1) << (np.arange(n) & 63).astype(np.uint64)
+    gate_mask = np.empty((len(q0), words), dtype=np.uint64)
+    for g in range(len(q0) - 1, -1, -1):
+        a, b = int(q0[g]), int(q1[g])
+        if b >= 0:
+            u = rows[a] | rows[b]
+            rows[a] = u
+            rows[b] = u
+            gate_mask[g] = u
+        else:
+            gate_mask[g] = rows[a]
+    return Lightcones(circuit, rows, gate_mask)
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Backward lightcone of every output qubit")
+    parser.add_argument("qasm", nargs="+")
+    parser.add_argument("--per-qubit", action="store_true", help="Print every qubit's cone size")
+    args = parser.parse_args()
+    for path in args.qasm:
+        gt = GateTable.from_qasm_file(path)
+        t0 = time.perf_counter()
+        lc = lightcones(gt)
+        nq, ng = lc.sizes()
+        dt = time.perf_counter() - t0
+        print(f"{path}: {gt.num_qubits} qubits, {len(gt)} gates, cones in {dt * 1e3:.1f} ms")
+        print(f"  cone qubits min/mean/max {nq.min()}/{nq.mean():.1f}/{nq.max()}, "
+              f"cone gates min/mean/max {ng.min()}/{ng.mean():.1f}/{ng.max()}")
+        if args.per_qubit:
+            for q in range(gt.num_qubits):
+                print(f"  {q:3d}  {nq[q]:3d} qubits  {ng[q]:5d} gates")
@@ -0,0 +1,229 @@
+"""Middle-MPO attack: locate U·U† seams by evolving an identity operator outwards.
+
+paper_context.md describes it: put the identity operator at a cut between
+two ASAP layers and grow O = (layers after the cut) · I · (layers before the
+cut) one layer on each side at a time, i.e.
+
+    O_k = L[c+k-1] · O_{k-1} · L[c-k]
+
+If the circuit around the cut is U·U†, O_k stays the identity and its MPO
+keeps operator bond dimension 1; at any other cut the operator entangles
+about twice as fast as a state would. `scan_cuts` does this for every cut
+with a small bond cap and ranks the cuts by how low the bond stayed, which
+replaces the edge-set / marginal-correlation pivot guesses in
+find_p9_perfect_pivots.py, find_p9_midpoint.py and check_p9_mid_fidelity.py.
+
+Conventions:
+    - tensors[s] has shape (chi_left, 4, chi_right) with physical index
+      2 * out + in for qubit `qubit_at[s]`; the operator is kept with unit
+      Frobenius norm, so the identity is I/sqrt(2) on every site.
+    - `left(U, qubits)` is O -> U·O (a later gate), `right(U, qubits)` is
+      O -> O·U (an earlier gate); 2-qubit matrices follow mps.py's operand
+      order, and long-range gates are routed with swaps as in MPS.apply_2q.
+
+Usage:
+    python solutions/mpo.py challenge/P9_grand_summit.qasm --radius 6 --max-bond 16
+    python solutions/mpo.py challenge/P9_grand_summit.qasm --cut 46 --radius 12
+"""
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from layered import LayeredCircuit
+from mps import gate_matrix
+
+_I2 = np.eye(2, dtype=complex)
+# Exchange two 4-dim sites: (s1, s2) -> (s2, s1).
+_SWAP16 = np.eye(16, dtype=complex).reshape(4, 4, 4, 4).transpose(1, 0, 2, 3).reshape(16, 16)
+
+def _left_2q(G: np.ndarray) -> np.ndarray:
+    """16x16 action of U·O for a 4x4 U on two adjacent sites (o1, i1, o2, i2)."""
+    return np.einsum("OPop,Ii,Jj->OIPJoipj", G.reshape(2, 2, 2, 2), _I2, _I2).reshape(16, 16)
+
+def _right_2q(G: np.ndarray) -> np.ndarray:
+    """16x16 action of O·U for a 4x4 U on two adjacent sites."""
+    return np.einsum("Oo,Pp,mnIJ->OIPJompn", _I2, _I2, G.reshape(2, 2, 2, 2)).reshape(16, 16)
+
+def _flip(U: np.ndarray) -> np.ndarray:
+    return U.reshape(2, 2, 2, 2).transpose(1, 0, 3, 2).reshape(4, 4)
+
+class MPO:
+    def __init__(self, num_qubits: int, max_bond: int = 64, cutoff: float = 1e-12):
+        self.num_qubits = num_qubits
+        self.max_bond = max_bond
+        self.cutoff = cutoff
+        self.qubit_at = list(range(num_qubits))
+        self.site_of = list(range(num_qubits))
+        ident = (_I2 / np.sqrt(2)).reshape(1, 4, 1)
+        self.tensors = [ident.copy() for _ in range(num_qubits)]
+        self.center = 0
+        self.discarded = 0.0
+        self.num_capped = 0
+
+    # ------------------------------------------------------------------ canonical form
+    def _move_center(self, target: int) -> None:
+        A = self.tensors
+        while self.center < target:
+            c = self.center
+            l, d, r = A[c].shape
+            Q, R = np.linalg.qr(A[c].reshape(l * d, r))
+            A[c] = Q.reshape(l, d, -1)
+            A[c + 1] = np.tensordot(R, A[c + 1], axes=(1, 0))
+            self.center += 1
+        while self.center > target:
+            c = self.center
+            l, d, r = A[c].shape
+            Q, R = np.linalg.qr(A[c].reshape(l, d * r).T)
+            A[c] = Q.T.reshape(-1, d, r)
+            A[c - 1] = np.tensordot(A[c - 1], R.T, axes=(2, 0))
+            self.center -= 1
+
+    def _apply_two_site(self, S: np.ndarray, i: int) -> None:
+        """Apply a 16x16 site operator on sites (i, i+1) and re-split with truncation."""
+        self._move_center(i)
+        A, B = self.tensors[i], self.tensors[i + 1]
+        l, r = A.shape[0], B.shape[2]
+        theta = np.tensordot(A, B, axes=(2, 0))  # (l, 4, 4, r)
+        theta = np.tensordot(S.reshape(4, 4, 4, 4), theta, axes=([2, 3], [1, 2]))  # (4, 4, l, r)
+        theta = theta.transpose(2, 0, 1, 3).reshape(l * 4, 4 * r)
+        try:
+            Uu, s, Vh = np.linalg.svd(theta, full_matrices=False)
+        except np.linalg.LinAlgError:
+            V, s, Uh = np.linalg.svd(theta.conj().T, full_matrices=False)
+            Uu, Vh = Uh.conj().T, V.conj().T
+        keep = int(np.count_nonzero(s > self.cutoff * s[0])) if s[0] > 0 else 1
+        if keep > self.max_bond:
+            self.num_capped += 1
+        keep = max(1, min(keep, self.max_bond))
+        self.discarded += float(np.sum(s[keep:] ** 2) / np.sum(s ** 2))
+        s = s[:keep] / np.linalg.norm(s[:keep])
+        self.tensors[i] = Uu[:, :keep].reshape(l, 4, -1)
+        self.tensors[i + 1] = (s[:, None] * Vh[:keep]).reshape(-1, 4, r)
+        self.center = i + 1
+
+    def _swap_sites(self, i: int) -> None:
+        self._apply_two_site(_SWAP16, i)
+        qa, qb = self.qubit_at[i], self.qubit_at[i + 1]
+        self.qubit_at[i], self.qubit_at[i + 1] = qb, qa
+        self.site_of[qa], self.site_of[qb] = i + 1, i
+
+    def _apply(self, U: np.ndarray, qubits, side: str) -> None:
+        if len(qubits) == 1:
+            s = self.site_of[qubits[0]]
+            S = np.kron(U, _I2) if side == "left" else np.kron(_I2, U.T)
+            self.tensors[s] = np.einsum("ab,lbr->lar", S, self.tensors[s])
+            return
+        a, b = qubits
+        sa, sb = self.site_of[a], self.site_of[b]
+        while sb > sa + 1:
+            self._swap_sites(sb - 1)
+            sb -= 1
+        while sb < sa - 1:
+            self._swap_sites(sb)
+            sb += 1
+        if sa > sb:
+            U, sa = _flip(U), sb
+        self._apply_two_site(_left_2q(U) if side == "left" else _right_2q(U), sa)
+
+    def left(self, U: np.ndarray, qubits) -> None:
+        """O -> U·O (a gate applied after the operator)."""
+        self._apply(U, list(qubits), "left")
+
+    def right(self, U: np.ndarray, qubits) -> None:
+        """O -> O·U (a gate applied before the operator)."""
+        self._apply(U, list(qubits), "right")
+
+    def apply_layers(self, lc: LayeredCircuit, t: int, side: str) -> None:
+        """Multiply by all gates of ASAP layer t on one side (gates in a layer commute)."""
+        tab = lc.table
+        for g in lc.gates(t).tolist():
+            b = int(tab.q1[g])
+            qubits = (int(tab.q0[g]),) if b < 0 else (int(tab.q0[g]), b)
+            self._apply(gate_matrix(int(tab.op[g]), tab.params[g]), qubits, side)
+
+    # ------------------------------------------------------------------ observables
+    @property
+    def bond_dims(self) -> list[int]:
+        return [t.shape[2] for t in self.tensors[:-1]]
+
+    @property
+    def max_bond_dim(self) -> int:
+        return max(self.bond_dims, default=1)
+
+    def identity_overlap(self) -> float:
+        """|Tr O| / 2^n for the unit-norm operator: 1 iff O is the identity up to phase."""
+        v = (_I2 / np.sqrt(2)).ravel()
+        env = np.ones(1, dtype=complex)
+        for A in self.tensors:
+            env = env @ np.tensordot(A, v.conj(), axes=(1, 0))
+        return float(abs(env[0]))
+
+@dataclass
+class CutProfile:
+    cut: int                     # between layers cut - 1 and cut
+    bonds: list[int] = field(default_factory=list)  # max operator bond after each outward step
+    overlaps: list[float] = field(default_factory=list)
+    capped: bool = False
+    seconds: float = 0.0
+
+    @property
+    def reach(self) -> int:
+        """Outward steps for which the operator stayed rank 1."""
+        return next((k for k, b in enumerate(self.bonds) if b > 1), len(self.bonds))
+
+    def score(self, radius: int, max_bond: int) -> float:
+        """Sum of log2(bond) over `radius` steps; steps lost to the cap count as log2(2 * max_bond)."""
+        return float(np.sum(np.log2(self.bonds))) + (radius - len(self.bonds)) * np.log2(2 * max_bond)
+
+def middle_out(lc: LayeredCircuit, cut: int, radius: int, max_bond: int = 16, cutoff: float = 1e-10) -> CutProfile:
+    """Grow the identity outwards from `cut` for up to `radius` layers per side.
+
+    A side with no layers left is skipped; the run stops early once the
+    operator needs more than `max_bond`.
+    """
+    prof = CutProfile(cut)
+    mpo = MPO(lc.num_qubits, max_bond=max_bond, cutoff=cutoff)
+    t0 = time.perf_counter()
+    for k in range(1, radius + 1):
+        after, before = cut + k - 1, cut - k
+        if after >= lc.num_layers and before < 0:
+            break
+        if after < lc.num_layers:
+            mpo.apply_layers(lc, after, "left")
+        if before >= 0:
+            mpo.apply_layers(lc, before, "right")
+        if mpo.num_capped:
+            prof.capped = True
+            break
+        prof.bonds.append(mpo.max_bond_dim)
+        prof.overlaps.append(mpo.identity_overlap())
+    prof.seconds = time.perf_counter() - t0
+    return prof
+
+def scan_cuts(lc: LayeredCircuit, radius: int = 6, max_bond: int = 16, cutoff: float = 1e-10,
+              cuts=None) -> list[CutProfile]:
+    """Middle-out profile of every cut (default 1 .. num_layers - 1), best (lowest bond) first."""
+    cuts = range(1, lc.num_layers) if cuts is None else cuts
+    profiles = [middle_out(lc, c, radius, max_bond, cutoff) for c in cuts]
+    return sorted(profiles, key=lambda p: (p.score(radius, max_bond), -p.reach, p.cut))
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Middle-MPO scan for U·U† seams")
+    parser.add_argument("qasm")
+    parser.add_argument("--radius", type=int, default=6, help="Layers to grow on each side of a cut")
+    parser.add_argument("--max-bond", type=int, default=16, help="Operator bond cap (a cut stops there)")
+    parser.add_argument("--cut", type=int, nargs="+", default=None, help="Only these cuts (default: all)")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    lc = LayeredCircuit.from_qasm_file(args.qasm)
+    t0 = time.perf_counter()
+    profiles = scan_cuts(lc, radius=args.radius, max_bond=args.max_bond, cuts=args.cut)
+    print(f"{args.qasm}: {lc.num_layers} layers, {len(profiles)} cuts scanned in {time.perf_counter() - t0:.1f}s")
+    print(f"  {'cut':>4} {'score':>7} {'reach':>5}  bonds (overlap with I at the last step)")
+    for p in profiles[:args.top]:
+        last = f"{p.overlaps[-1]:.4f}" if p.overlaps else "-"
+        print(f"  {p.cut:4d} {p.score(args.radius, args.max_bond):7.2f} {p.reach:5d}  "
+              f"{p.bonds}{' capped' if p.capped else ''} ({last})")
@@ -0,0 +1,571 @@
+"""Native NumPy MPS simulator with exact single-qubit marginals.
+
+The Aer MPS backend only hands back shots, so the marginal attacks
+(solve_p9_smart.py --local, solve_p9_linear_mps.py) had to sample 1k-10k
+bitstrings and average characters in Python. This engine keeps the state as
+an MPS in mixed-canonical form and computes every `<Z_i>` in one
+left-to-right sweep of the orthogonality center, with no sampling noise.
+
+Conventions:
+    - tensors[s] has shape (chi_left, 2, chi_right); site s holds qubit
+      `qubit_at[s]` (the mapping changes as SWAPs are absorbed).
+    - two-qubit matrices are indexed (bit_a, bit_b) row-major for a gate
+      acting on qubits (a, b), i.e. big-endian in operand order.
+    - `discarded` accumulates the relative squared singular-value weight
+      dropped by truncation (a bound on 1 - fidelity for small values).
+
+Usage:
+    python solutions/mps.py challenge/P9_grand_summit.qasm --bond-dim 64 --name P9 \
+        --output results/final_P9_local.json
+    python solutions/mps.py challenge/P4_gentle_mound.qasm --bond-dim 32 --top-k 8
+    python solutions/mps.py challenge/P4_gentle_mound.qasm --adaptive --bond-dim 256 --top-k 8
+    python solutions/mps.py challenge/P9_grand_summit.qasm --bond-dim 64 --trace results/p9_bond_trace.csv
+"""
+import json
+import os
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from gate_table import OPCODES, GateTable
+
+_SQ2 = 1 / np.sqrt(2)
+SWAP = np.array([[1, 0, 0, 0], [0, 0, 1, 0], [0, 1, 0, 0], [0, 0, 0, 1]], dtype=complex)
+CZ = np.diag([1, 1, 1, -1]).astype(complex)
+CX = np.array([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, 1], [0, 0, 1, 0]], dtype=complex)
+X = np.array([[0, 1], [1, 0]], dtype=complex)
+H = np.array([[_SQ2, _SQ2], [_SQ2, -_SQ2]], dtype=complex)
+_FIXED = {OPCODES["x"]: X, OPCODES["h"]: H, OPCODES["cz"]: CZ, OPCODES["cx"]: CX}
+
+def u3_matrix(theta: float, phi: float, lam: float) -> np.ndarray:
+    c, s = np.cos(theta / 2), np.sin(theta / 2)
+    return np.array([
+        [c, -np.exp(1j * lam) * s],
+        [np.exp(1j * phi) * s, np.exp(1j * (phi + lam)) * c],
+    ], dtype=complex)
+
+def rz_matrix(lam: float) -> np.ndarray:
+    return np.diag([np.exp(-0.5j * lam), np.exp(0.5j * lam)])
+
+def qiskit_2q_matrix(op) -> np.ndarray:
+    """Qiskit's little-endian 4x4 matrix re-indexed to (bit_a, bit_b) operand order."""
+    return np.asarray(op.to_matrix(), dtype=complex).reshape(2, 2, 2, 2).transpose(1, 0, 3, 2).reshape(4, 4)
+
+def gate_matrix(code: int, params) -> np.ndarray:
+    """Matrix of a GateTable gate (2x2, or 4x4 in (q0, q1) operand order)."""
+    if code == OPCODES["u3"]:
+        return u3_matrix(*params)
+    if code == OPCODES["rz"]:
+        return rz_matrix(params[0])
+    return _FIXED[code]
+
+def _flip(U: np.ndarray) -> np.ndarray:
+    """Same two-qubit gate with operand order reversed."""
+    return U.reshape(2, 2, 2, 2).transpose(1, 0, 3, 2).reshape(4, 4)
+
+class MPS:
+    def __init__(self, num_qubits: int, max_bond: int = 64, cutoff: float = 1e-12, order=None):
+        self.num_qubits = num_qubits
+        self.max_bond = max_bond
+        self.cutoff = cutoff
+        self.qubit_at = list(order) if order is not None else list(range(num_qubits))
+        if sorted(self.qubit_at) != list(range(num_qubits)):
+            raise ValueError("order must be a permutation of range(num_qubits)")
+        self.site_of = [0] * num_qubits
+        for s, q in enumerate(self.qubit_at):
+            self.site_of[q] = s
+        zero = np.zeros((1, 2, 1), dtype=complex)
+        zero[0, 0, 0] = 1.0
+        self.tensors = [zero.copy() for _ in range(num_qubits)]
+        self.center = 0
+        self.discarded = 0.0
+        self.num_truncations = 0
+        self.num_capped = 0  # truncations forced by max_bond rather than cutoff
+
+    # ------------------------------------------------------------------ canonical form
+    def _move_center(self, target: int) -> None:
+        A = self.tensors
+        while self.center < target:
+            c = self.center
+            l, d, r = A[c].shape
+            Q, R = np.linalg.qr(A[c].reshape(l * d, r))
+            A[c] = Q.reshape(l, d, -1)
+            A[c + 1] = np.tensordot(R, A[c + 1], axes=(1, 0))
+            self.center += 1
+        while self.center > target:
+            c = self.center
+            l, d, r = A[c].shape
+            Q, R = np.linalg.qr(A[c].reshape(l, d * r).T)
+            A[c] = Q.T.reshape(-1, d, r)
+            A[c - 1] = np.tensordot(A[c - 1], R.T, axes=(2, 0))
+            self.center -= 1
+
+    def _svd(self, theta: np.ndarray):
+        try:
+            return np.linalg.svd(theta, full_matrices=False)
+        except np.linalg.LinAlgError:
+            U, S, Vh = np.linalg.svd(theta.conj().T, full_matrices=False)
+            return Vh.conj().T, S, U.conj().T
+
+    def _apply_two_site(self, U: np.ndarray, i: int) -> None:
+        """Apply a 4x4 gate on sites (i, i+1) and re-split with truncation."""
+        self._move_center(i)
+        A, B = self.tensors[i], self.tensors[i + 1]
+        l, r = A.shape[0], B.shape[2]
+        theta = np.tensordot(A, B, axes=(2, 0))  # (l, 2, 2, r)
+        theta = np.tensordot(U.reshape(2, 2, 2, 2), theta, axes=([2, 3], [1, 2]))  # (2, 2, l, r)
+        theta = theta.transpose(2, 0, 1, 3).reshape(l * 2, 2 * r)
+        Uu, S, Vh = self._truncated_svd(theta)
+        self.tensors[i] = Uu.reshape(l, 2, -1)
+        self.tensors[i + 1] = (S[:, None] * Vh).reshape(-1, 2, r)
+        self.center = i + 1
+
+    def _truncated_svd(self, theta: np.ndarray):
+        """SVD kept to cutoff / max_bond, with renormalized singular values and bookkeeping."""
+        Uu, S, Vh = self._svd(theta)
+        total = float(np.sum(S ** 2))
+        keep = int(np.count_nonzero(S > self.cutoff * S[0])) if S[0] > 0 else 1
+        if keep > self.max_bond:
+            self.num_capped += 1
+        keep = max(1, min(keep, self.max_bond))
+        if keep < len(S):
+            self.discarded += float(np.sum(S[keep:] ** 2)) / total
+            self.num_truncations += 1
+        S = S[:keep] / np.sqrt(np.sum(S[:keep] ** 2))
+        return Uu[:, :keep], S, Vh[:keep]
+
+    # ------------------------------------------------------------------ gates
+    def apply_1q(self, U: np.ndarray, q: int) -> None:
+        s = self.site_of[q]
+        self.tensors[s] = np.einsum("ab,lbr->lar", U, self.tensors[s])
+
+    def swap_qubits(self, a: int, b: int) -> None:
+        """A SWAP gate only relabels which site holds which qubit."""
+        sa, sb = self.site_of[a], self.site_of[b]
+        self.site_of[a], self.site_of[b] = sb, sa
+        self.qubit_at[sa], self.qubit_at[sb] = b, a
+
+    def _swap_sites(self, i: int) -> None:
+        """Physically exchange the qubits on sites i and i+1."""
+        self._apply_two_site(SWAP, i)
+        qa, qb = self.qubit_at[i], self.qubit_at[i + 1]
+        self.qubit_at[i], self.qubit_at[i + 1] = qb, qa
+        self.site_of[qa], self.site_of[qb] = i + 1, i
+
+    def apply_2q(self, U: np.ndarray, a: int, b: int) -> None:
+        """Apply a 4x4 gate on qubits (a, b), routing b next to a with swaps if needed."""
+        sa, sb = self.site_of[a], self.site_of[b]
+        while sb > sa + 1:
+            self._swap_sites(sb - 1)
+            sb -= 1
+        while sb < sa - 1:
+            self._swap_sites(sb)
+            sb += 1
+        if sa < sb:
+            self._apply_two_site(U, sa)
+        else:
+            self._apply_two_site(_flip(U), sb)
+
+    def apply_block(self, U: np.ndarray, qubits) -> None:
+        """Apply a 2^k x 2^k unitary on `qubits` (big-endian in that order).
+
+        The qubits are swapped onto adjacent sites, merged into one
+        (chi_l, 2^k, chi_r) tensor, multiplied by U and split back with a
+        left-to-right sweep of truncated SVDs.
+        """
+        qubits = list(qubits)
+        k = len(qubits)
+        if k == 1:
+            return self.apply_1q(U, qubits[0])
+        if k == 2:
+            return self.apply_2q(U, qubits[0], qubits[1])
+        by_site = sorted(qubits, key=lambda q: self.site_of[q])
+        start = self.site_of[by_site[0]]
+        for j, q in enumerate(by_site[1:], 1):
+            cur = self.site_of[q]
+            while cur > start + j:
+                self._swap_sites(cur - 1)
+                cur -= 1
+        # U's axes follow `qubits`; reorder them to site order.
+        perm = [qubits.index(q) for q in by_site]
+        U = U.reshape((2,) * (2 * k)).transpose(perm + [k + p for p in perm])
+        self._move_center(start)
+        theta = self.tensors[start]
+        for s in range(start + 1, start + k):
+            theta = np.tensordot(theta, self.tensors[s], axes=(theta.ndim - 1, 0))
+        l, r = theta.shape[0], theta.shape[-1]
+        theta = np.tensordot(U, theta, axes=(list(range(k, 2 * k)), list(range(1, k + 1))))  # (2,)*k, l, r
+        theta = np.moveaxis(theta, k, 0)  # l, (2,)*k, r
+        left = l
+        for s in range(start, start + k - 1):
+            mat = theta.reshape(left * 2, -1)
+            Uu, S, Vh = self._truncated_svd(mat)
+            self.tensors[s] = Uu.reshape(left, 2, -1)
+            left = len(S)
+            theta = S[:, None] * Vh
+        self.tensors[start + k - 1] = theta.reshape(left, 2, r)
+        self.center = start + k - 1
+
+    def apply_table(self, table: GateTable, callback=None) -> "MPS":
+        """Evolve through a GateTable; `callback(gate_index, mps)` runs after every gate."""
+        u3, rz, cz, cx, x, h = (OPCODES[k] for k in ("u3", "rz", "cz", "cx", "x", "h"))
+        for g, (code, a, b, p) in enumerate(zip(table.op.tolist(), table.q0.tolist(),
+                                                table.q1.tolist(), table.params.tolist())):
+            if code == u3:
+                self.apply_1q(u3_matrix(*p), a)
+            elif code == rz:
+                self.apply_1q(rz_matrix(p[0]), a)
+            elif code == x:
+                self.apply_1q(X, a)
+            elif code == h:
+                self.apply_1q(H, a)
+            elif code == cz:
+                self.apply_2q(CZ, a, b)
+            elif code == cx:
+                self.apply_2q(CX, a, b)
+            if callback is not None:
+                callback(g, self)
+        return self
+
+    def apply_circuit(self, qc, callback=None) -> "MPS":
+        """Evolve through an arbitrary QuantumCircuit of 1-/2-qubit gates (e.g. PyZX output)."""
+        index = {q: i for i, q in enumerate(qc.qubits)}
+        for g, instr in enumerate(qc.data):
+            op = instr.operation
+            if op.name in ("barrier", "measure"):
+                continue
+            qs = [index[q] for q in instr.qubits]
+            if op.name == "swap":
+                self.swap_qubits(*qs)
+            elif len(qs) == 1:
+                self.apply_1q(np.asarray(op.to_matrix(), dtype=complex), qs[0])
+            elif len(qs) == 2:
+                self.apply_2q(qiskit_2q_matrix(op), qs[0], qs[1])
+            else:
+                raise ValueError(f"{op.name} acts on {len(qs)} qubits; decompose to 1-/2-qubit gates first")
+            if callback is not None:
+                callback(g, self)
+        return self
+
+    # ------------------------------------------------------------------ observables
+    @property
+    def bond_dims(self) -> list[int]:
+        return [t.shape[2] for t in self.tensors[:-1]]
+
+    @property
+    def max_bond_dim(self) -> int:
+        return max(self.bond_dims, default=1)
+
+    def expect_z(self) -> np.ndarray:
+        """Exact `<Z_q>` for every qubit q (indexed by qubit, not site) in one sweep."""
+        self._move_center(0)
+        out = np.empty(self.num_qubits)
+        for s in range(self.num_qubits):
+            self._move_center(s)
+            A = self.tensors[s]
+            p0 = float(np.vdot(A[:, 0, :], A[:, 0, :]).real)
+            p1 = float(np.vdot(A[:, 1, :], A[:, 1, :]).real)
+            out[self.qubit_at[s]] = (p0 - p1) / (p0 + p1)
+        return out
+
+    def top_bitstrings(self, k: int = 8) -> list[tuple[str, float]]:
+        """Beam-search the K most probable bitstrings with their exact probabilities.
+
+        With the center on site 0 every tensor to the right is an isometry, so
+        the probability of a prefix is just the squared norm of its left
+        boundary vector. Sites are decoded left to right keeping the K best
+        prefixes; returned bitstrings are Qiskit-ordered (q_{n-1} ... q_0).
+        """
+        self._move_center(0)
+        beam_bits = np.zeros((1, 0), dtype=np.int8)
+        beam_vecs = np.ones((1, 1), dtype=complex)
+        for s in range(self.num_qubits):
+            cand = np.einsum("kl,lbr->kbr", beam_vecs, self.tensors[s])  # (K, 2, chi_r)
+            probs = np.sum(np.abs(cand) ** 2, axis=2).ravel()  # (2K,)
+            keep = np.argsort(-probs, kind="stable")[:k]
+            keep = keep[probs[keep] > 0] if np.any(probs[keep] > 0) else keep[:1]
+            parent, bit = np.divmod(keep, 2)
+            beam_bits = np.concatenate([beam_bits[parent], bit[:, None].astype(np.int8)], axis=1)
+            beam_vecs = cand[parent, bit, :]
+        probs = np.sum(np.abs(beam_vecs) ** 2, axis=1)
+        out = []
+        for site_bits, p in zip(beam_bits, probs):
+            bits = ["0"] * self.num_qubits
+            for s, b in enumerate(site_bits.tolist()):
+                bits[self.qubit_at[s]] = str(b)
+            out.append(("".join(reversed(bits)), float(p)))
+        return sorted(out, key=lambda x: -x[1])
+
+def interaction_counts(circuit) -> np.ndarray:
+    """n x n 2-qubit gate counts for a GateTable or QuantumCircuit."""
+    if isinstance(circuit, GateTable):
+        return circuit.interaction_matrix()
+    index = {q: i for i, q in enumerate(circuit.qubits)}
+    mat = np.zeros((circuit.num_qubits, circuit.num_qubits), dtype=np.int64)
+    for instr in circuit.data:
+        if len(instr.qubits) == 2 and instr.operation.name not in ("swap", "barrier"):
+            a, b = index[instr.qubits[0]], index[instr.qubits[1]]
+            mat[a, b] += 1
+            mat[b, a] += 1
+    return mat
+
+ORDERINGS = ("natural", "reverse", "spectral")
+
+def chain_order(circuit, kind: str = "natural") -> list[int]:
+    """Qubit placement along the MPS chain.
+
+    "spectral" sorts qubits by the Fiedler vector of the weighted interaction
+    graph, which tends to put strongly-coupled qubits next to each other.
+    """
+    n = circuit.num_qubits
+    if kind == "natural":
+        return list(range(n))
+    if kind == "reverse":
+        return list(range(n - 1, -1, -1))
+    if kind == "spectral":
+        w = interaction_counts(circuit).astype(float)
+        lap = np.diag(w.sum(axis=1)) - w
+        _, vecs = np.linalg.eigh(lap)
+        fiedler = vecs[:, 1] if n > 1 else np.zeros(n)
+        return np.argsort(fiedler, kind="stable").tolist()
+    raise ValueError(f"Unknown ordering {kind!r}; expected one of {ORDERINGS}")
+
+def simulate(circuit, max_bond: int = 64, cutoff: float = 1e-12, order=None, callback=None) -> MPS:
+    """Run a GateTable or QuantumCircuit through a fresh MPS."""
+    mps = MPS(circuit.num_qubits, max_bond=max_bond, cutoff=cutoff, order=order)
+    if isinstance(circuit, GateTable):
+        return mps.apply_table(circuit, callback=callback)
+    return mps.apply_circuit(circuit, callback=callback)
+
+def layer_schedule(circuit):
+    """Gates regrouped by ASAP layer (stable within a layer) and the layer of each gate.
+
+    Reordering by ASAP layer respects every qubit dependency, so the final
+    state is unchanged; it just makes "after layer t" a well-defined point.
+    """
+    if isinstance(circuit, GateTable):
+        from layered import asap_layers
+        layer = asap_layers(circuit)
+        order = np.argsort(layer, kind="stable")
+        return circuit.select(order), layer[order]
+    index = {q: i for i, q in enumerate(circuit.qubits)}
+    qubit_time = [0] * circuit.num_qubits
+    timed = []
+    for instr in circuit.data:
+        if instr.operation.name in ("barrier", "measure"):
+            continue
+        qs = [index[q] for q in instr.qubits]
+        t = max(qubit_time[i] for i in qs)
+        for i in qs:
+            qubit_time[i] = t + 1
+        timed.append((t, instr))
+    timed.sort(key=lambda x: x[0])
+    out = circuit.copy_empty_like()
+    for _, instr in timed:
+        out._append(instr)
+    return out, np.array([t for t, _ in timed], dtype=np.int32)
+
+def trace_evolution(circuit, max_bond: int = 64, cutoff: float = 1e-12, order=None,
+                    every: int = 0) -> tuple[MPS, list[dict]]:
+    """Single-pass MPS evolution that records bond growth as it goes.
+
+    One row per ASAP layer (default) or per `every` gates in program order:
+    max/mean bond dimension, cumulative and per-step discarded weight, number
+    of cap-forced truncations, and wall time.
+    """
+    if every:
+        sched = circuit
+        n_gates = len(circuit) if isinstance(circuit, GateTable) else sum(
+            1 for i in circuit.data if i.operation.name not in ("barrier", "measure"))
+        labels = np.arange(n_gates)
+        checkpoint = (labels + 1) % every == 0
+        key = "gate"
+    else:
+        sched, labels = layer_schedule(circuit)
+        checkpoint = np.r_[labels[1:] != labels[:-1], True] if len(labels) else labels.astype(bool)
+        key = "layer"
+    if len(checkpoint):
+        checkpoint[-1] = True
+    checkpoint = checkpoint.tolist()
+    labels = labels.tolist()
+
+    rows = []
+    count = 0
+    t0 = last_t = time.perf_counter()
+    last_disc = 0.0
+
+    def record(_, mps):
+        nonlocal count, last_t, last_disc
+        i = count
+        count += 1
+        if not checkpoint[i]:
+            return
+        now = time.perf_counter()
+        bonds = mps.bond_dims
+        rows.append({
+            key: int(labels[i]),
+            "gates": i + 1,
+            "max_bond": max(bonds, default=1),
+            "mean_bond": float(np.mean(bonds)) if bonds else 1.0,
+            "discarded": mps.discarded,
+            "step_discarded": mps.discarded - last_disc,
+            "capped": mps.num_capped,
+            "seconds": now - t0,
+            "step_seconds": now - last_t,
+        })
+        last_t, last_disc = now, mps.discarded
+
+    mps = simulate(sched, max_bond=max_bond, cutoff=cutoff, order=order, callback=record)
+    return mps, rows
+
+def write_trace(rows: list[dict], path: str) -> None:
+    """Write a trace as CSV (by extension) or JSON."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if path.endswith(".csv"):
+        import csv
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else [])
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        with open(path, "w") as f:
+            json.dump(rows, f, indent=2)
+
+@dataclass
+class Escalation:
+    mps: MPS
+    chi: int                 # bond cap of the returned state
+    converged: bool
+    history: list[dict] = field(default_factory=list)
+
+def adaptive_simulate(circuit, chi_start: int = 16, chi_max: int = 256, top_k: int = 8, tol: float = 1e-2,
+                      cutoff: float = 1e-12, order=None) -> Escalation:
+    """Re-simulate with doubling bond caps until the answer stops moving.
+
+    After each run the top-`top_k` candidate set and the `<Z_i>` marginals are
+    compared with the previous cap; escalation stops once the set is unchanged
+    and no marginal moved by more than `tol`, once a run never hit the bond cap
+    (only cutoff truncation, so more chi cannot change it), or at `chi_max`.
+    """
+    history = []
+    prev_top, prev_z = None, None
+    chi = max(1, min(chi_start, chi_max))
+    while True:
+        t0 = time.perf_counter()
+        mps = simulate(circuit, max_bond=chi, cutoff=cutoff, order=order)
+        top = mps.top_bitstrings(top_k)
+        z = mps.expect_z()
+        step = {
+            "chi": chi,
+            "max_bond": mps.max_bond_dim,
+            "discarded": mps.discarded,
+            "capped": mps.num_capped,
+            "top": top[0][0],
+            "top_prob": top[0][1],
+            "seconds": time.perf_counter() - t0,
+        }
+        if prev_z is not None:
+            step["top_set_changed"] = {b for b, _ in top} != {b for b, _ in prev_top}
+            step["max_dz"] = float(np.max(np.abs(z - prev_z)))
+        history.append(step)
+        print(f"  chi={chi:<5} max bond {mps.max_bond_dim:<5} discarded {mps.discarded:.2e}  "
+              f"top p={top[0][1]:.4f}" + (f"  max|dZ|={step['max_dz']:.3e}" if prev_z is not None else ""))
+        exact = mps.num_capped == 0
+        stable = prev_z is not None and not step["top_set_changed"] and step["max_dz"] < tol
+        if exact or stable or chi >= chi_max:
+            return Escalation(mps, chi, converged=exact or stable, history=history)
+        prev_top, prev_z = top, z
+        chi = min(2 * chi, chi_max)
+
+def measured_bitstring(qc, bitstring: str) -> str:
+    """Re-read a qubit-ordered bitstring through `qc`'s final measurements.
+
+    Level-3 transpilation (ElidePermutations) folds trailing SWAPs into the
+    measure targets, so clbit c is not necessarily qubit c. Circuits without
+    measurements are returned unchanged.
+    """
+    measures = [instr for instr in qc.data if instr.operation.name == "measure"]
+    if not measures:
+        return bitstring
+    n = len(bitstring)
+    qindex = {q: i for i, q in enumerate(qc.qubits)}
+    cindex = {c: i for i, c in enumerate(qc.clbits)}
+    bits = ["0"] * qc.num_clbits
+    for instr in measures:
+        q, c = qindex[instr.qubits[0]], cindex[instr.clbits[0]]
+        bits[c] = bitstring[n - 1 - q]
+    return "".join(reversed(bits))
+
+def marginals_to_results(z: np.ndarray, name: str, job_id: str = "native_mps") -> dict:
+    """`<Z_i>` values in the results/final_<name>_local.json schema."""
+    return {
+        str(i): {"bit": "1" if val < 0 else "0", "val": float(val), "job_id": job_id, "name": f"{name}_q{i}_local"}
+        for i, val in enumerate(z)
+    }
+
+def marginal_bitstring(z: np.ndarray) -> str:
+    """Qiskit-ordered (q_{n-1} ... q_0) bitstring from the sign of each `<Z_i>`."""
+    return "".join("1" if val < 0 else "0" for val in z[::-1])
+
+def main() -> None:
+    import argparse
+    parser = argparse.ArgumentParser(description="Exact single-qubit marginals from a native MPS")
+    parser.add_argument("qasm", help="Path to QASM file")
+    parser.add_argument("--bond-dim", type=int, default=64, help="Maximum MPS bond dimension")
+    parser.add_argument("--cutoff", type=float, default=1e-12, help="Relative singular-value cutoff")
+    parser.add_argument("--zx-strategy", default=None,
+                        help="Reduce with PyZX first (clifford_simp/full_reduce/...; cached)")
+    parser.add_argument("--name", default=None, help="Circuit name used in the results file")
+    parser.add_argument("--top-k", type=int, default=0, help="Also beam-decode the K most probable bitstrings")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="Double chi from --chi-start up to --bond-dim until top-k and marginals are stable")
+    parser.add_argument("--chi-start", type=int, default=16, help="First bond cap for --adaptive")
+    parser.add_argument("--tol", type=float, default=1e-2, help="Max |<Z>| change accepted as converged")
+    parser.add_argument("--trace", help="Record bond dimension / discarded weight per layer to this .csv or .json")
+    parser.add_argument("--trace-every", type=int, default=0, help="Trace every N gates instead of per layer")
+    parser.add_argument("--output", help="Write marginals in the final_<name>_local.json schema")
+    args = parser.parse_args()
+
+    name = args.name or os.path.splitext(os.path.basename(args.qasm))[0]
+    if args.zx_strategy:
+        from zx_cache import reduce_qasm_file
+        circuit = reduce_qasm_file(args.qasm, strategy=args.zx_strategy)
+    else:
+        circuit = GateTable.from_qasm_file(args.qasm)
+
+    t0 = time.perf_counter()
+    if args.adaptive:
+        esc = adaptive_simulate(circuit, chi_start=args.chi_start, chi_max=args.bond_dim, top_k=max(args.top_k, 1),
+                                tol=args.tol, cutoff=args.cutoff)
+        mps = esc.mps
+        print(f"  {'Converged' if esc.converged else 'NOT converged'} at chi={esc.chi}")
+    elif args.trace:
+        mps, rows = trace_evolution(circuit, max_bond=args.bond_dim, cutoff=args.cutoff, every=args.trace_every)
+        write_trace(rows, args.trace)
+        peak = max(rows, key=lambda r: r["max_bond"], default=None)
+        if peak:
+            where = f"layer {peak['layer']}" if "layer" in peak else f"gate {peak['gate']}"
+            print(f"  Trace: {len(rows)} rows -> {args.trace} (peak bond {peak['max_bond']} at {where})")
+    else:
+        mps = simulate(circuit, max_bond=args.bond_dim, cutoff=args.cutoff)
+    t_evolve = time.perf_counter() - t0
+    z = mps.expect_z()
+    print(f"  Evolved in {t_evolve:.2f}s (max bond {mps.max_bond_dim}, discarded weight {mps.discarded:.3e})")
+    print(f"  Marginals in {time.perf_counter() - t0 - t_evolve:.3f}s")
+    for i, val in enumerate(z):
+        if abs(val) > 0.5:
+            print(f"  Q{i}: {'1' if val < 0 else '0'} (<Z>={val:.4f})")
+    print(f"Marginal bitstring: {marginal_bitstring(z)}")
+    if args.top_k:
+        for bits, p in mps.top_bitstrings(args.top_k):
+            print(f"  {bits}  p={p:.4f}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(marginals_to_results(z, name), f, indent=2)
+        print(f"  Saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""FFT periodicity and mirror-symmetry detector over per-layer feature vectors.
+
+check_p9_periodicity.py compares every period and every pivot with O(L^2)
+tuple comparisons of edge lists, and find_p9_structural_period.py /
+check_p9_symmetry.py repeat the same loops on raw CZ pairs. Here each ASAP
+layer becomes one feature vector:
+
+    edges    feature-hashed edge set: every 2-qubit gate (gate, sorted pair)
+             adds +-1 to one of `bits` buckets, so the dot product of two
+             layers estimates how many edges they share (labelled structure)
+    density  2-qubit and 1-qubit gate counts per qubit
+    angles   mean moments of the 1-qubit rotation angles 2*acos|Re a| (from the
+             SU(2) quaternion), which are unchanged by U -> U†, global phase
+             and qubit relabelling, so a permuted U† still mirrors U
+
+With one FFT per feature column,
+
+    autocorrelation   r(p) = sum_t x[t] x[t + p]          (periods)
+    mirror            m(s) = sum_t x[t] x[s - t]          (pivot s / 2)
+
+are summed over columns. With every layer's vector scaled to unit length,
+a score is the mean cosine similarity of the overlapping layer pairs, in
+[-1, 1]; candidates are ranked by score * sqrt(support), so a few layers
+at either end cannot outrank a long mirror. That is O(F L log L) for every
+period and every pivot at once. Columns are standardized only over the
+layers where they are non-zero, so the u3/CZ alternation shows up in
+`density` alone (period 2, every integer pivot).
+
+Usage:
+    python solutions/periodicity.py challenge/P9_grand_summit.qasm
+    python solutions/periodicity.py challenge/P9_grand_summit.qasm --features angles --top 5
+"""
+import hashlib
+from dataclasses import dataclass
+
+import numpy as np
+
+from angle_index import su2_vector
+from gate_table import OPCODES
+from layered import LayeredCircuit
+from mps import gate_matrix
+
+FEATURES = ("edges", "density", "angles")
+
+def _bucket(edge: tuple, bits: int) -> tuple[int, float]:
+    h = int.from_bytes(hashlib.blake2b(repr(edge).encode(), digest_size=8).digest(), "little")
+    return (h >> 1) % bits, 1.0 if h & 1 else -1.0
+
+def layer_features(lc: LayeredCircuit, features=FEATURES, bits: int = 64) -> np.ndarray:
+    """(num_layers, F) feature matrix; columns grouped as in `features`."""
+    t = lc.table
+    n, L = lc.num_qubits, lc.num_layers
+    cz = OPCODES["cz"]
+    blocks = []
+    if "edges" in features:
+        X = np.zeros((L, bits))
+        for g in np.flatnonzero(t.q1 >= 0).tolist():
+            a, b = int(t.q0[g]), int(t.q1[g])
+            code = int(t.op[g])
+            j, s = _bucket((code, min(a, b), max(a, b)) if code == cz else (code, a, b), bits)
+            X[lc.layer[g], j] += s
+        blocks.append(X)
+    if "density" in features:
+        two = np.bincount(lc.layer[t.q1 >= 0], minlength=L) / n
+        one = np.bincount(lc.layer[t.q1 < 0], minlength=L) / n
+        blocks.append(np.stack([two, one], axis=1))
+    if "angles" in features:
+        X = np.zeros((L, 4))
+        ones = np.flatnonzero(t.q1 < 0)
+        angle = np.array([2 * np.arccos(min(1.0, abs(su2_vector(gate_matrix(int(t.op[g]), t.params[g]))[0])))
+                          for g in ones.tolist()])
+        layer = lc.layer[ones]
+        count = np.maximum(np.bincount(layer, minlength=L), 1)
+        for k in range(1, 5):
+            X[:, k - 1] = np.bincount(layer, weights=angle ** k, minlength=L) / count
+        blocks.append(X)
+    return np.concatenate(blocks, axis=1) if blocks else np.zeros((L, 0))
+
+def _standardize(X: np.ndarray) -> np.ndarray:
+    """Standardize every column over the layers where it is non-zero; zeros stay zero.
+
+    Angle moments only exist on 1-qubit layers and edge buckets on 2-qubit
+    layers, so centering over all layers would turn the u3/CZ alternation
+    into a period-2 signal in every column. A column that is constant where
+    it is non-zero (an edge repeated exactly, a fixed gate count) has nothing
+    to centre and becomes an on/off indicator (its sign) instead of zero.
+    """
+    out = np.zeros_like(X)
+    for f in range(X.shape[1]):
+        on = X[:, f] != 0
+        if not on.any():
+            continue
+        col = X[on, f] - X[on, f].mean()
+        std = col.std()
+        out[on, f] = col / std if std > 1e-12 else np.sign(X[on, f])
+    return out
+
+@dataclass
+class Detection:
+    periods: np.ndarray   # candidate periods p = 1 .. L - min_overlap
+    period_scores: np.ndarray
+    period_support: np.ndarray  # non-empty layers behind each period score
+    pivots: np.ndarray    # candidate pivots s / 2 (half-integers fall between layers)
+    pivot_scores: np.ndarray
+    pivot_support: np.ndarray
+
+    @staticmethod
+    def _rank(scores: np.ndarray, support: np.ndarray, k: int) -> np.ndarray:
+        # mean cosine * sqrt(support) ~ z-score against uncorrelated layers, so
+        # a short window near the ends cannot outrank a long exact mirror
+        return np.argsort(-scores * np.sqrt(support), kind="stable")[:k]
+
+    def top_periods(self, k: int = 5) -> list[tuple[int, float]]:
+        order = self._rank(self.period_scores, self.period_support, k)
+        return [(int(self.periods[i]), float(self.period_scores[i])) for i in order]
+
+    def top_pivots(self, k: int = 5) -> list[tuple[float, float]]:
+        order = self._rank(self.pivot_scores, self.pivot_support, k)
+        return [(float(self.pivots[i]), float(self.pivot_scores[i])) for i in order]
+
+def detect(X: np.ndarray, min_overlap: int = 4) -> Detection:
+    """Autocorrelation over periods and mirror correlation over pivots of a (L, F) feature matrix.
+
+    Rows are scaled to unit length after standardization, so a score is the
+    mean cosine similarity of the overlapping (non-empty) layer pairs and a
+    few outlier layers cannot dominate it; the pair counts come from prefix
+    sums of the per-layer energies. Rankings weight scores by sqrt(support).
+    """
+    X = _standardize(np.asarray(X, dtype=float))
+    norm = np.linalg.norm(X, axis=1, keepdims=True)
+    X = np.divide(X, norm, out=np.zeros_like(X), where=norm > 1e-12)
+    L = X.shape[0]
+    size = 1 << int(np.ceil(np.log2(max(2 * L, 2))))
+    spec = np.fft.rfft(X, n=size, axis=0)
+    auto = np.fft.irfft(spec * spec.conj(), n=size, axis=0)[:L].sum(axis=1)
+    mirror = np.fft.irfft(spec * spec, n=size, axis=0)[:2 * L - 1].sum(axis=1)
+    energy = (X ** 2).sum(axis=1)
+    cum = np.concatenate([[0.0], np.cumsum(energy)])
+
+    periods = np.arange(1, L - min_overlap + 1)
+    head = cum[L - periods]                 # layers 0 .. L-p-1
+    tail = cum[L] - cum[periods]            # layers p .. L-1
+    period_support = np.sqrt(head * tail)
+    period_scores = auto[periods] / np.maximum(period_support, 1e-12)
+
+    s = np.arange(2 * L - 1)
+    lo, hi = np.maximum(0, s - L + 1), np.minimum(s, L - 1)
+    # t runs over lo..hi and pairs with s - t over the same range; drop the
+    # self term t = s - t of integer pivots.
+    centre = np.where(s % 2 == 0, energy[np.minimum(s // 2, L - 1)], 0.0)
+    span = cum[hi + 1] - cum[lo] - centre
+    pairs = hi - lo + 1 - (s % 2 == 0)
+    valid = pairs >= 2 * min_overlap
+    pivot_scores = (mirror - centre)[valid] / np.maximum(span[valid], 1e-12)
+    return Detection(periods, period_scores, period_support, s[valid] / 2, pivot_scores, span[valid])
+
+def detect_circuit(lc: LayeredCircuit, features=FEATURES, bits: int = 64, min_overlap: int = 4) -> Detection:
+    return detect(layer_features(lc, features, bits), min_overlap)
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Rank periods and mirror pivots of a circuit's layer sequence")
+    parser.add_argument("qasm", nargs="+")
+    parser.add_argument("--features", nargs="+", choices=FEATURES, default=None,
+                        help="Feature groups (default: each group separately, then all)")
+    parser.add_argument("--bits", type=int, default=64, help="Edge-hash buckets")
+    parser.add_argument("--min-overlap", type=int, default=4, help="Layer pairs needed to score a period / pivot")
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [tuple(args.features)] if args.features else [(f,) for f in FEATURES] + [FEATURES]
+    for path in args.qasm:
+        lc = LayeredCircuit.from_qasm_file(path)
+        print(f"{path}: {lc.num_layers} layers")
+        for feats in runs:
+            t0 = time.perf_counter()
+            det = detect_circuit(lc, feats, args.bits, args.min_overlap)
+            dt = time.perf_counter() - t0
+            print(f"  [{'+'.join(feats)}] ({dt * 1e3:.1f} ms)")
+            print("    periods:", ", ".join(f"{p} ({s:+.3f})" for p, s in det.top_periods(args.top)))
+            print("    pivots: ", ", ".join(f"{p:g} ({s:+.3f})" for p, s in det.top_pivots(args.top)))
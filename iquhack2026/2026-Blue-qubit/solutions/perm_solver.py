@@ -0,0 +1,239 @@
+"""Qubit-permutation recovery from many mirrored layer pairs at once.
+
+solve_p9_scrambling.py and solve_p9_pivot_perm.py ran networkx VF2 on one
+layer pair. One CZ layer is a perfect matching, so VF2 returns an arbitrary
+member of a huge automorphism group (the pasted P9 map `S` was one of them),
+and VF2 itself is exponential in the worst case. Here every layer pair
+(a, b) that should correspond under the permutation contributes at once:
+
+    - edges of a 2-qubit layer, coloured by (pair, gate, role) so that CX
+      control/target roles must line up;
+    - per-qubit parameter signatures of a 1-qubit layer (the gate matrix up to
+      global phase, quantized): side a's gate must equal side b's (`same`) or
+      its adjoint (`adjoint`, the U / U† case); `auto` picks whichever
+      makes the two layers' multisets agree, and ignores the angles of a pair
+      where neither does (swept parameters).
+
+Qubits of side a and side b are colour-refined jointly (1-WL over all pairs
+at once) until the partition is stable. If every class holds one qubit per
+side the permutation is unique; otherwise the smallest class is split by
+individualizing one qubit against each candidate and refining again, with
+`max_candidates` / `max_nodes` bounding the search. Each candidate is scored
+by how many layer pairs it maps exactly and by the fraction of 2-qubit
+edges it explains.
+
+Usage:
+    python solutions/perm_solver.py challenge/P9_grand_summit.qasm --block 40 53
+    python solutions/perm_solver.py challenge/P9_grand_summit.qasm --pairs 39:53 37:55 38:54
+
+    from perm_solver import mirror_pairs, solve_permutation
+    sol = solve_permutation(lc, mirror_pairs(lc, 40, 53))
+    sol.best.perm   # perm[q] = side-b qubit matched with side-a qubit q
+"""
+from collections import Counter
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from gate_table import OPCODES
+from layer_hash import matrix_key
+from layered import LayeredCircuit
+from mps import gate_matrix
+
+PARAM_MODES = ("auto", "adjoint", "same", "none")
+
+@dataclass
+class PermCandidate:
+    perm: np.ndarray      # perm[q] = side-b qubit matched with side-a qubit q
+    explained: int        # layer pairs mapped exactly (edges and signatures)
+    edge_fraction: float  # 2-qubit edges of side a landing on side-b edges
+
+@dataclass
+class PermSolution:
+    pairs: list[tuple[int, int]]
+    modes: list[str]                 # parameter mode used per pair
+    cells: int                       # colour classes after plain refinement
+    candidates: list[PermCandidate] = field(default_factory=list)  # best first
+    complete: bool = True            # False if a search limit cut the enumeration short
+
+    @property
+    def best(self) -> PermCandidate | None:
+        return self.candidates[0] if self.candidates else None
+
+    @property
+    def unique(self) -> bool:
+        return self.complete and len(self.candidates) == 1
+
+def mirror_pairs(lc: LayeredCircuit, start: int, stop: int, depth: int | None = None) -> list[tuple[int, int]]:
+    """(start-1-d, stop+d) for d = 0, 1, ...: the layers flanking block [start, stop) outwards.
+
+    For a pivot layer p use (p, p + 1).
+    """
+    pairs = []
+    d = 0
+    while start - 1 - d >= 0 and stop + d < lc.num_layers and (depth is None or d < depth):
+        pairs.append((start - 1 - d, stop + d))
+        d += 1
+    return pairs
+
+def _layer_gates(lc: LayeredCircuit, t: int, decimals: int):
+    """(edges [(code, q0, q1)], {qubit: (key, adjoint key)}) of layer t."""
+    tab = lc.table
+    cz = OPCODES["cz"]
+    edges, ones = [], {}
+    for g in lc.gates(t).tolist():
+        code, a, b = int(tab.op[g]), int(tab.q0[g]), int(tab.q1[g])
+        if b >= 0:
+            edges.append((code, min(a, b), max(a, b)) if code == cz else (code, a, b))
+        else:
+            U = gate_matrix(code, tab.params[g])
+            ones[a] = (matrix_key(U, decimals), matrix_key(U.conj().T, decimals))
+    return edges, ones
+
+def _pair_mode(ones_a: dict, ones_b: dict, mode: str) -> str:
+    if mode != "auto":
+        return mode
+    if not ones_a and not ones_b:
+        return "none"
+    b_keys = Counter(k for k, _ in ones_b.values())
+    if Counter(adj for _, adj in ones_a.values()) == b_keys:
+        return "adjoint"
+    if Counter(k for k, _ in ones_a.values()) == b_keys:
+        return "same"
+    return "none"
+
+def _relabel(sigs_a: list, sigs_b: list) -> tuple[np.ndarray, np.ndarray]:
+    """Dense colour ids shared by both sides (ids follow sorted signatures)."""
+    ids = {s: i for i, s in enumerate(sorted(set(sigs_a) | set(sigs_b)))}
+    return np.array([ids[s] for s in sigs_a]), np.array([ids[s] for s in sigs_b])
+
+def _refine(col_a: np.ndarray, col_b: np.ndarray, nbr_a: list, nbr_b: list) -> tuple[np.ndarray, np.ndarray]:
+    """Joint 1-WL refinement to a stable partition."""
+    classes = len(np.unique(np.concatenate([col_a, col_b])))
+    while True:
+        sig_a = [(int(col_a[q]), tuple(sorted((k, c, r, int(col_a[o])) for k, c, r, o in nbr_a[q])))
+                 for q in range(len(col_a))]
+        sig_b = [(int(col_b[q]), tuple(sorted((k, c, r, int(col_b[o])) for k, c, r, o in nbr_b[q])))
+                 for q in range(len(col_b))]
+        col_a, col_b = _relabel(sig_a, sig_b)
+        new = len(np.unique(np.concatenate([col_a, col_b])))
+        if new == classes:
+            return col_a, col_b
+        classes = new
+
+def _balanced(col_a: np.ndarray, col_b: np.ndarray) -> bool:
+    ca, cb = np.unique(col_a, return_counts=True), np.unique(col_b, return_counts=True)
+    return len(ca[0]) == len(cb[0]) and np.array_equal(ca[0], cb[0]) and np.array_equal(ca[1], cb[1])
+
+def score_permutation(lc: LayeredCircuit, pairs: list[tuple[int, int]], perm: np.ndarray,
+                      modes: list[str] | None = None, decimals: int = 6) -> tuple[int, float]:
+    """(layer pairs mapped exactly, fraction of side-a 2-qubit edges explained) under `perm`."""
+    cz = OPCODES["cz"]
+    explained, hit, total = 0, 0, 0
+    for k, (a, b) in enumerate(pairs):
+        edges_a, ones_a = _layer_gates(lc, a, decimals)
+        edges_b, ones_b = _layer_gates(lc, b, decimals)
+        mode = (modes[k] if modes else None) or _pair_mode(ones_a, ones_b, "auto")
+        mapped = set()
+        for code, x, y in edges_a:
+            px, py = int(perm[x]), int(perm[y])
+            mapped.add((code, min(px, py), max(px, py)) if code == cz else (code, px, py))
+        hits = len(mapped & set(edges_b))
+        hit, total = hit + hits, total + len(edges_a)
+        ok = hits == len(edges_a) == len(edges_b)
+        if mode != "none":
+            ok = ok and len(ones_a) == len(ones_b) and all(
+                int(perm[q]) in ones_b and ones_b[int(perm[q])][0] == (adj if mode == "adjoint" else key)
+                for q, (key, adj) in ones_a.items())
+        explained += ok
+    return explained, hit / total if total else 1.0
+
+def solve_permutation(lc: LayeredCircuit, pairs: list[tuple[int, int]], params: str = "auto",
+                      decimals: int = 6, max_candidates: int = 16, max_nodes: int = 10000) -> PermSolution:
+    """Permutations mapping side a onto side b of every layer pair, best first."""
+    if params not in PARAM_MODES:
+        raise ValueError(f"params must be one of {PARAM_MODES}")
+    n = lc.num_qubits
+    init_a, init_b = [[] for _ in range(n)], [[] for _ in range(n)]
+    nbr_a, nbr_b = [[] for _ in range(n)], [[] for _ in range(n)]
+    modes = []
+    for k, (a, b) in enumerate(pairs):
+        edges_a, ones_a = _layer_gates(lc, a, decimals)
+        edges_b, ones_b = _layer_gates(lc, b, decimals)
+        mode = _pair_mode(ones_a, ones_b, params)
+        modes.append(mode)
+        for edges, nbr in ((edges_a, nbr_a), (edges_b, nbr_b)):
+            for code, x, y in edges:
+                nbr[x].append((k, code, 1, y))
+                nbr[y].append((k, code, 2 if code != OPCODES["cz"] else 1, x))
+        if mode != "none":
+            for q, (key, adj) in ones_a.items():
+                init_a[q].append((k, adj if mode == "adjoint" else key))
+            for q, (key, _) in ones_b.items():
+                init_b[q].append((k, key))
+    col_a, col_b = _refine(*_relabel([tuple(s) for s in init_a], [tuple(s) for s in init_b]), nbr_a, nbr_b)
+    sol = PermSolution(list(pairs), modes, len(np.unique(col_a)))
+    if not _balanced(col_a, col_b):
+        return sol
+
+    found: list[np.ndarray] = []
+    nodes = 0
+
+    def search(col_a: np.ndarray, col_b: np.ndarray) -> None:
+        nonlocal nodes
+        nodes += 1
+        if len(found) >= max_candidates or nodes > max_nodes:
+            sol.complete = False
+            return
+        colours, counts = np.unique(col_a, return_counts=True)
+        if np.all(counts == 1):
+            perm = np.empty(n, dtype=np.int64)
+            perm[np.argsort(col_a)] = np.argsort(col_b)
+            found.append(perm)
+            return
+        cell = colours[np.argmin(np.where(counts > 1, counts, n + 1))]
+        x = int(np.flatnonzero(col_a == cell)[0])
+        fresh = int(max(col_a.max(), col_b.max())) + 1
+        for y in np.flatnonzero(col_b == cell).tolist():
+            ia, ib = col_a.copy(), col_b.copy()
+            ia[x], ib[y] = fresh, fresh
+            ra, rb = _refine(ia, ib, nbr_a, nbr_b)
+            if _balanced(ra, rb):
+                search(ra, rb)
+            if not sol.complete:
+                return
+
+    search(col_a, col_b)
+    for perm in found:
+        explained, frac = score_permutation(lc, pairs, perm, modes, decimals)
+        sol.candidates.append(PermCandidate(perm, explained, frac))
+    sol.candidates.sort(key=lambda c: (-c.explained, -c.edge_fraction))
+    return sol
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Recover a qubit permutation from mirrored layer pairs")
+    parser.add_argument("qasm")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--block", type=int, nargs=2, metavar=("START", "STOP"),
+                       help="Pair the layers flanking block [START, STOP) outwards")
+    group.add_argument("--pairs", nargs="+", help="Explicit layer pairs a:b")
+    parser.add_argument("--depth", type=int, default=None, help="Mirrored pairs to use with --block")
+    parser.add_argument("--params", choices=PARAM_MODES, default="auto")
+    parser.add_argument("--decimals", type=int, default=6, help="Gate-matrix quantization")
+    parser.add_argument("--max-candidates", type=int, default=16)
+    args = parser.parse_args()
+
+    lc = LayeredCircuit.from_qasm_file(args.qasm)
+    pairs = (mirror_pairs(lc, *args.block, depth=args.depth) if args.block
+             else [tuple(int(x) for x in p.split(":")) for p in args.pairs])
+    t0 = time.perf_counter()
+    sol = solve_permutation(lc, pairs, params=args.params, decimals=args.decimals,
+                            max_candidates=args.max_candidates)
+    print(f"{len(pairs)} layer pairs, {sol.cells} colour classes after refinement, "
+          f"{len(sol.candidates)} candidate(s){'' if sol.complete else ' (search truncated)'} "
+          f"in {time.perf_counter() - t0:.2f}s")
+    print(f"  parameter modes: {dict(Counter(sol.modes))}")
+    for c in sol.candidates[:5]:
+        print(f"  explains {c.explained}/{len(pairs)} pairs, {c.edge_fraction:.1%} of edges: {c.perm.tolist()}")
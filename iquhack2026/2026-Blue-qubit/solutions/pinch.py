@@ -0,0 +1,148 @@
+"""Entanglement-bound pinch points: time cuts where a circuit splits into two cheap halves.
+
+profile_bitcoin_layers.py looked for "low density zones" (runs of layers
+with at most two 2-qubit gates) and analyze_p9_layer_46.py inspected single
+layers by hand; neither says whether the state at a layer is actually cheap.
+Here it is bounded directly. Fix a qubit ordering along the chain
+(`mps.chain_order`) and a time cut c between ASAP layers c - 1 and c. The
+Schmidt rank of U[0:c]|0> across chain bond k (positions <= k | > k) is at
+most 2^b with
+
+    b = min(crossing bits of the layers < c, active qubits left of k, active qubits right of k)
+
+where every 2-qubit gate whose chain span straddles bond k adds log2 of its
+operator Schmidt rank (1 for CZ / CX, 2 otherwise), and a qubit is active
+once a 2-qubit gate has touched it (the others are still a product). The
+same bound over the layers >= c holds for U[c:]†|x> with any product output
+x, so
+
+    <x|U|0> = <U[c:]† x | U[0:c] 0>
+
+is the overlap of two MPSs whose bonds are bounded independently. A cut's
+cost is the width (log2 bond) of the harder half, ties broken by
+log2 sum_k (chi_f[k]^3 + chi_b[k]^3), the per-sweep work of both halves, so
+that among cuts that saturate the n / 2 cap the ones saturating fewer bonds
+come first. A cut is a pinch when it is narrower than the whole circuit in
+one forward pass (cut L). Every cut comes out of one (L, n - 1) crossing
+matrix and prefix sums, so a scan takes milliseconds.
+
+Usage:
+    python solutions/pinch.py challenge/P9_grand_summit.qasm --order spectral --top 5
+
+    from pinch import pinch_points
+    for c in pinch_points(lc, chain_order(lc.table, "spectral")):
+        c.cut, c.forward_width, c.backward_width
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from gate_table import TWO_QUBIT
+from layered import LayeredCircuit
+
+@dataclass
+class TimeCut:
+    cut: int               # between layers cut - 1 and cut
+    forward: np.ndarray    # log2 Schmidt-rank bound per chain bond of U[0:cut]|0>
+    backward: np.ndarray   # same for U[cut:]†|x>
+
+    @property
+    def forward_width(self) -> int:
+        return int(self.forward.max(initial=0))
+
+    @property
+    def backward_width(self) -> int:
+        return int(self.backward.max(initial=0))
+
+    @property
+    def width(self) -> int:
+        return max(self.forward_width, self.backward_width)
+
+    @property
+    def work(self) -> float:
+        """log2 of sum over bonds of chi^3 for both halves."""
+        bits = 3.0 * np.concatenate([self.forward, self.backward, [0]])
+        top = bits.max()
+        return float(top + np.log2(np.sum(np.exp2(bits - top))))
+
+    @property
+    def cost(self) -> tuple[int, float]:
+        return self.width, self.work
+
+    @property
+    def bottleneck(self) -> int:
+        """Chain bond where the harder half is widest."""
+        bound = self.forward if self.forward_width >= self.backward_width else self.backward
+        return int(np.argmax(bound)) if len(bound) else 0
+
+def _side_caps(active: np.ndarray) -> np.ndarray:
+    """min(active qubits left of bond k, right of bond k) for (cuts, n) chain-ordered flags."""
+    n = active.shape[1]
+    left = np.cumsum(active, axis=1)[:, :n - 1]
+    return np.minimum(left, active.sum(axis=1, keepdims=True) - left)
+
+def rank_bounds(lc: LayeredCircuit, order=None) -> tuple[np.ndarray, np.ndarray]:
+    """(forward, backward) log2 Schmidt-rank bounds, each (num_layers + 1, n - 1), row = cut."""
+    t = lc.table
+    n, L = lc.num_qubits, lc.num_layers
+    order = list(range(n)) if order is None else list(order)
+    pos = np.empty(n, dtype=np.int64)
+    pos[order] = np.arange(n)
+
+    two = np.flatnonzero(t.q1 >= 0)
+    a, b = pos[t.q0[two]], pos[t.q1[two]]
+    lo, hi = np.minimum(a, b), np.maximum(a, b)
+    bits = np.where(np.isin(t.op[two], TWO_QUBIT), 1, 2)
+    layer = lc.layer[two]
+    diff = np.zeros((L, n + 1), dtype=np.int64)
+    np.add.at(diff, (layer, lo), bits)
+    np.add.at(diff, (layer, hi), -bits)
+    crossings = np.cumsum(diff, axis=1)[:, :max(n - 1, 0)]      # (L, n - 1) per layer
+    forward = np.vstack([np.zeros((1, crossings.shape[1]), dtype=np.int64), np.cumsum(crossings, axis=0)])
+    backward = forward[-1] - forward
+
+    first = np.full(n, L, dtype=np.int64)
+    last = np.full(n, -1, dtype=np.int64)
+    for q in (t.q0[two], t.q1[two]):
+        np.minimum.at(first, q, layer)
+        np.maximum.at(last, q, layer)
+    cuts = np.arange(L + 1)[:, None]
+    forward = np.minimum(forward, _side_caps(first[order][None, :] < cuts))
+    backward = np.minimum(backward, _side_caps(last[order][None, :] >= cuts))
+    return forward, backward
+
+def scan_time_cuts(lc: LayeredCircuit, order=None) -> tuple[TimeCut, list[TimeCut]]:
+    """(whole circuit as cut L, interior cuts 1 .. L - 1 cheapest first, ties: earlier cut)."""
+    forward, backward = rank_bounds(lc, order)
+    L = lc.num_layers
+    cuts = [TimeCut(c, forward[c], backward[c]) for c in range(1, L)]
+    return TimeCut(L, forward[L], backward[L]), sorted(cuts, key=lambda c: (c.cost, c.cut))
+
+def pinch_points(lc: LayeredCircuit, order=None) -> list[TimeCut]:
+    """Interior cuts whose harder half is narrower than one forward pass, cheapest first."""
+    whole, cuts = scan_time_cuts(lc, order)
+    return [c for c in cuts if c.width < whole.width]
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from mps import ORDERINGS, chain_order
+    parser = argparse.ArgumentParser(description="Rank time cuts by a Schmidt-rank bound on both halves")
+    parser.add_argument("qasm")
+    parser.add_argument("--order", choices=ORDERINGS, default="natural", help="Qubit ordering along the chain")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    lc = LayeredCircuit.from_qasm_file(args.qasm)
+    order = chain_order(lc.table, args.order)
+    t0 = time.perf_counter()
+    whole, cuts = scan_time_cuts(lc, order)
+    dt = time.perf_counter() - t0
+    pinches = sum(c.width < whole.width for c in cuts)
+    print(f"{args.qasm}: {lc.num_layers} layers, {lc.num_qubits} qubits, "
+          f"{len(cuts)} cuts bounded in {dt * 1e3:.1f} ms ({args.order} order), {pinches} pinch point(s)")
+    print(f"  one forward pass: width {whole.width} (chi <= 2^{whole.width}), work 2^{whole.work:.1f}")
+    print(f"  {'cut':>4} {'width':>5} {'fwd':>4} {'bwd':>4} {'work':>6} {'bond':>5}")
+    for c in cuts[:args.top]:
+        print(f"  {c.cut:4d} {c.width:5d} {c.forward_width:4d} {c.backward_width:4d} {c.work:6.1f} {c.bottleneck:5d}")
@@ -0,0 +1,292 @@
+"""Cost-model planner: pick a simulation method for a (reduced) circuit.
+
+Estimates runtime and memory of every method we have an executor for and
+returns the cheapest one that is exact and fits in memory (falling back to a
+truncated MPS when nothing exact fits):
+
+    statevector  16 * 2^n bytes,         time ~ gates * 2^n
+    mps          cut-width bound on chi under the chain ordering,
+                 time ~ sum over 2q gates of routed span * chi^3
+    factored     independent qubit components, each with its cheaper of the above,
+                 run in parallel (time ~ slowest component)
+    stabilizer   only when every gate is Clifford; time ~ gates * n^2
+
+The per-method time coefficients (seconds per work unit) are defaults for a
+laptop-class CPU. `record()` appends predicted vs measured cost to
+`.cache/planner/log.jsonl`, and `python solutions/planner.py --calibrate`
+refits the coefficients from that log into `.cache/planner/coeffs.json`.
+
+Usage:
+    python solutions/planner.py challenge/P7_rolling_ridge.qasm --bond-dim 128
+"""
+import json
+import os
+import platform
+import time
+from dataclasses import asdict, dataclass, field
+
+import numpy as np
+
+from gate_table import OPCODES, GateTable
+from mps import chain_order
+from zx_cache import CACHE_DIR
+
+PLANNER_DIR = os.path.join(CACHE_DIR, "planner")
+LOG_PATH = os.path.join(PLANNER_DIR, "log.jsonl")
+COEFFS_PATH = os.path.join(PLANNER_DIR, "coeffs.json")
+
+METHODS = ("statevector", "mps", "factored", "stabilizer")
+DEFAULT_COEFFS = {
+    "statevector": 2e-9,   # s per (gate * amplitude)
+    "mps": 2e-9,           # s per (routed gate * chi^3)
+    "stabilizer": 1e-9,    # s per (gate * n^2)
+    "overhead": 0.05,      # fixed s per simulation call
+}
+
+@dataclass
+class Estimate:
+    method: str
+    seconds: float
+    memory_mb: float
+    exact: bool
+    feasible: bool
+    detail: dict = field(default_factory=dict)
+
+@dataclass
+class Plan:
+    method: str
+    estimates: list[Estimate]
+
+    @property
+    def chosen(self) -> Estimate:
+        return next(e for e in self.estimates if e.method == self.method)
+
+    def summary(self) -> str:
+        lines = []
+        for e in sorted(self.estimates, key=lambda e: e.seconds):
+            mark = "*" if e.method == self.method else " "
+            flags = ("exact" if e.exact else "approx") + ("" if e.feasible else ", infeasible")
+            lines.append(f"  {mark} {e.method:<12} {e.seconds:10.3g}s {e.memory_mb:12.1f} MB  ({flags}) {e.detail}")
+        return "\n".join(lines)
+
+def available_mb() -> float:
+    """Currently available physical memory (MB)."""
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_AVPHYS_PAGES") / 2**20
+    except (ValueError, OSError, AttributeError):
+        return 8192.0
+
+def load_coeffs() -> dict:
+    coeffs = dict(DEFAULT_COEFFS)
+    if os.path.exists(COEFFS_PATH):
+        with open(COEFFS_PATH) as f:
+            coeffs.update(json.load(f))
+    return coeffs
+
+def _as_table(circuit) -> GateTable:
+    return circuit if isinstance(circuit, GateTable) else GateTable.from_circuit(circuit)
+
+_PAULIS = np.array([[[0, 1], [1, 0]], [[0, -1j], [1j, 0]], [[1, 0], [0, -1]]])
+
+def is_clifford(table: GateTable, tol: float = 1e-8) -> bool:
+    """Every gate Clifford: each distinct u3/rz maps X and Z to +-Paulis."""
+    u3 = table.params[table.op == OPCODES["u3"]]
+    rz = table.params[table.op == OPCODES["rz"]][:, [1, 2, 0]] * [0, 0, 1]
+    params = np.unique(np.round(np.vstack([u3, rz]), 12), axis=0)
+    if not len(params):
+        return True
+    th, ph, la = params[:, 0] / 2, params[:, 1], params[:, 2]
+    U = np.empty((len(params), 2, 2), dtype=complex)
+    U[:, 0, 0] = np.cos(th)
+    U[:, 0, 1] = -np.exp(1j * la) * np.sin(th)
+    U[:, 1, 0] = np.exp(1j * ph) * np.sin(th)
+    U[:, 1, 1] = np.exp(1j * (ph + la)) * np.cos(th)
+    Ud = U.conj().transpose(0, 2, 1)
+    for P in _PAULIS[[0, 2]]:
+        image = U @ P @ Ud
+        overlap = np.abs(np.einsum("kij,pji->kp", image, _PAULIS)) / 2
+        if not np.all(np.abs(overlap.max(axis=1) - 1) < tol):
+            return False
+    return True
+
+def components(table: GateTable) -> list[np.ndarray]:
+    """Connected qubit components of the interaction graph (sorted qubit arrays)."""
+    parent = list(range(table.num_qubits))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for a, b in table.edges().tolist():
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[ra] = rb
+    roots = np.array([find(q) for q in range(table.num_qubits)])
+    return [np.flatnonzero(roots == r) for r in np.unique(roots)]
+
+def component_tables(table: GateTable) -> list[tuple[np.ndarray, GateTable]]:
+    """(qubits, sub-table on 0..k-1) for each component; gates never cross components."""
+    remap = np.full(table.num_qubits, -1, dtype=np.int32)
+    out = []
+    for comp in components(table):
+        remap[comp] = np.arange(len(comp))
+        sub = table.select(np.isin(table.q0, comp))
+        q1 = np.where(sub.q1 >= 0, remap[np.maximum(sub.q1, 0)], -1).astype(np.int32)
+        out.append((comp, GateTable(len(comp), sub.op, remap[sub.q0], q1, sub.params)))
+    return out
+
+def cut_profile(table: GateTable, order=None) -> tuple[np.ndarray, np.ndarray]:
+    """(crossings per bond, routed span per 2q gate) for a chain ordering."""
+    n = table.num_qubits
+    order = list(range(n)) if order is None else list(order)
+    pos = np.empty(n, dtype=np.int64)
+    pos[order] = np.arange(n)
+    e = table.edges()
+    lo = np.minimum(pos[e[:, 0]], pos[e[:, 1]])
+    hi = np.maximum(pos[e[:, 0]], pos[e[:, 1]])
+    diff = np.zeros(n + 1, dtype=np.int64)
+    np.add.at(diff, lo, 1)
+    np.add.at(diff, hi, -1)
+    return np.cumsum(diff)[: max(n - 1, 0)], hi - lo
+
+def estimate_statevector(table: GateTable, coeffs: dict, mem_mb: float) -> Estimate:
+    n = table.num_qubits
+    memory = 16 * 2.0**n / 2**20
+    seconds = coeffs["overhead"] + coeffs["statevector"] * len(table) * 2.0**n
+    return Estimate("statevector", seconds, memory, exact=True, feasible=memory <= mem_mb)
+
+def estimate_mps(table: GateTable, coeffs: dict, mem_mb: float, max_bond: int, order=None) -> Estimate:
+    n = table.num_qubits
+    crossings, span = cut_profile(table, order)
+    side = np.minimum(np.arange(1, n), np.arange(n - 1, 0, -1))
+    # CZ/CX have operator Schmidt rank 2, so each crossing gate at most doubles chi.
+    log_chi = np.minimum(side, crossings) if n > 1 else np.zeros(0)
+    needed = float(2.0 ** log_chi.max()) if len(log_chi) else 1.0
+    chi = min(needed, float(max_bond))
+    chis = np.minimum(2.0**log_chi, max_bond)
+    memory = (32 * float(np.sum(chis**2)) + 64 * chi**2 * 4) / 2**20
+    work = float(np.sum(2 * np.maximum(span, 1) - 1)) * chi**3 + (len(table) - len(span)) * chi**2
+    seconds = coeffs["overhead"] + coeffs["mps"] * work
+    return Estimate("mps", seconds, memory, exact=needed <= max_bond, feasible=memory <= mem_mb,
+                    detail={"chi_needed": needed, "chi": chi, "max_cut": int(crossings.max()) if len(crossings) else 0})
+
+def estimate_stabilizer(table: GateTable, coeffs: dict, mem_mb: float) -> Estimate:
+    n = table.num_qubits
+    clifford = is_clifford(table)
+    memory = 2 * n * (2 * n + 1) / 2**20
+    seconds = coeffs["overhead"] + coeffs["stabilizer"] * len(table) * n * n
+    return Estimate("stabilizer", seconds, memory, exact=clifford, feasible=clifford and memory <= mem_mb)
+
+def estimate_factored(table: GateTable, coeffs: dict, mem_mb: float, max_bond: int, qubit_order: str) -> Estimate:
+    parts = component_tables(table)
+    if len(parts) < 2:
+        return Estimate("factored", float("inf"), 0.0, exact=False, feasible=False, detail={"components": 1})
+    # Components run concurrently (factoring.py): wall time is bounded by the
+    # slowest one, memory by the sum of those in flight at once.
+    workers = os.cpu_count() or 1
+    times, mems, exact, sizes = [], [], True, []
+    for comp, sub in parts:
+        options = [estimate_statevector(sub, coeffs, mem_mb),
+                   estimate_mps(sub, coeffs, mem_mb, max_bond, chain_order(sub, qubit_order))]
+        best = min((e for e in options if e.feasible), key=lambda e: (not e.exact, e.seconds), default=options[-1])
+        times.append(best.seconds)
+        mems.append(best.memory_mb)
+        exact &= best.exact
+        sizes.append(len(comp))
+    seconds = max(max(times), sum(times) / workers)
+    memory = sum(sorted(mems, reverse=True)[:workers])
+    return Estimate("factored", seconds, memory, exact=exact, feasible=memory <= mem_mb,
+                    detail={"components": sizes})
+
+def plan_circuit(circuit, max_bond: int = 128, mem_mb: float | None = None, qubit_order: str = "natural",
+                 methods=METHODS) -> Plan:
+    """Estimate every method in `methods` and choose one.
+
+    Preference: cheapest exact & feasible method; otherwise the cheapest
+    feasible one (a truncated MPS); otherwise the smallest-memory method.
+    """
+    table = _as_table(circuit)
+    coeffs = load_coeffs()
+    mem_mb = available_mb() if mem_mb is None else mem_mb
+    builders = {
+        "statevector": lambda: estimate_statevector(table, coeffs, mem_mb),
+        "mps": lambda: estimate_mps(table, coeffs, mem_mb, max_bond, chain_order(table, qubit_order)),
+        "factored": lambda: estimate_factored(table, coeffs, mem_mb, max_bond, qubit_order),
+        "stabilizer": lambda: estimate_stabilizer(table, coeffs, mem_mb),
+    }
+    estimates = [builders[m]() for m in methods]
+    feasible = [e for e in estimates if e.feasible]
+    if feasible:
+        best = min(feasible, key=lambda e: (not e.exact, e.seconds))
+    else:
+        best = min(estimates, key=lambda e: e.memory_mb)
+    return Plan(best.method, estimates)
+
+def record(name: str, plan: Plan, method: str, seconds: float, memory_mb: float | None = None) -> None:
+    """Append predicted vs measured cost of one simulation to the calibration log."""
+    est = next((e for e in plan.estimates if e.method == method), None)
+    entry = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "host": platform.node(),
+        "circuit": name,
+        "method": method,
+        "predicted_s": est.seconds if est else None,
+        "actual_s": seconds,
+        "predicted_mb": est.memory_mb if est else None,
+        "peak_rss_mb": memory_mb,
+        "coeffs": load_coeffs(),
+        "detail": est.detail if est else {},
+    }
+    os.makedirs(PLANNER_DIR, exist_ok=True)
+    with open(LOG_PATH, "a") as f:
+        f.write(json.dumps(entry) + "\n")
+
+def calibrate(log_path: str = LOG_PATH) -> dict:
+    """Refit per-method coefficients as the median measured/predicted ratio."""
+    if not os.path.exists(log_path):
+        print(f"No calibration log at {log_path}")
+        return load_coeffs()
+    ratios: dict[str, list[float]] = {}
+    with open(log_path) as f:
+        for line in f:
+            e = json.loads(line)
+            m, used = e["method"], e.get("coeffs", {})
+            if m not in DEFAULT_COEFFS or not e.get("predicted_s"):
+                continue
+            overhead = used.get("overhead", DEFAULT_COEFFS["overhead"])
+            pred, actual = e["predicted_s"] - overhead, e["actual_s"] - overhead
+            if pred > 0 and actual > 0:
+                ratios.setdefault(m, []).append(used.get(m, DEFAULT_COEFFS[m]) * actual / pred)
+    coeffs = load_coeffs()
+    for m, vals in ratios.items():
+        coeffs[m] = float(np.median(vals))
+        print(f"  {m:<12} {coeffs[m]:.3g} s/unit (from {len(vals)} runs)")
+    os.makedirs(PLANNER_DIR, exist_ok=True)
+    with open(COEFFS_PATH, "w") as f:
+        json.dump(coeffs, f, indent=2)
+    return coeffs
+
+if __name__ == "__main__":
+    import argparse
+    from qiskit import QuantumCircuit
+    from mps import ORDERINGS
+    parser = argparse.ArgumentParser(description="Estimate simulation cost per method and pick one")
+    parser.add_argument("qasm", nargs="*")
+    parser.add_argument("--bond-dim", type=int, default=128)
+    parser.add_argument("--mem-mb", type=float, default=None, help="Memory budget (default: available RAM)")
+    parser.add_argument("--qubit-order", choices=ORDERINGS, default="natural")
+    parser.add_argument("--calibrate", action="store_true", help="Refit coefficients from the calibration log")
+    parser.add_argument("--json", action="store_true", help="Print plans as JSON")
+    args = parser.parse_args()
+    if args.calibrate:
+        calibrate()
+    for path in args.qasm:
+        qc = QuantumCircuit.from_qasm_file(path)
+        plan = plan_circuit(qc, max_bond=args.bond_dim, mem_mb=args.mem_mb, qubit_order=args.qubit_order)
+        if args.json:
+            print(json.dumps({"qasm": path, "method": plan.method, "estimates": [asdict(e) for e in plan.estimates]}))
+        else:
+            print(f"{path}: {qc.num_qubits} qubits -> {plan.method}")
+            print(plan.summary())
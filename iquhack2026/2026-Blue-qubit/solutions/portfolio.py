@@ -0,0 +1,130 @@
+"""Parallel strategy portfolio for a single circuit.
+
+Instead of re-running solve_circuit.py by hand with different --strategy /
+--approx-degree / --bond-dim / --skip-pyzx flags, launch the whole grid at
+once. Each pipeline runs in its own process (memory-capped, see
+job_runner.py), reports its top candidate and peak probability as soon as it
+finishes (printed and appended to results/portfolio_<name>.jsonl), and the
+remaining pipelines are killed once one of them clears `--confidence`.
+
+Pipelines are ordered cheapest first (lowest bond dimension, then ZX before
+no-ZX) so a confident answer usually arrives from the fast end of the grid.
+
+Usage:
+    python solutions/portfolio.py challenge/P9_grand_summit.qasm \
+        --strategies full_reduce clifford_simp none --approx-degrees 1.0 0.99 \
+        --bond-dims 32 128 --orders natural spectral --workers 4 --mem-mb 6000
+"""
+import itertools
+import json
+import os
+import time
+
+from job_runner import Job, run_jobs
+from mps import ORDERINGS
+from solve_circuit import solve
+from zx_cache import ZX_STRATEGIES
+
+def build_grid(strategies, approx_degrees, bond_dims, orders, beam_width: int) -> list[dict]:
+    """Cartesian product of pipeline settings, cheapest first."""
+    grid = []
+    for bond_dim, strategy, approx, order in itertools.product(
+        sorted(bond_dims), strategies, approx_degrees, orders
+    ):
+        if not beam_width and order != "natural":
+            continue  # Aer sampling has no chain-ordering knob
+        grid.append({
+            "strategy": strategy,
+            "approx_degree": None if approx >= 1.0 else approx,
+            "bond_dim": bond_dim,
+            "qubit_order": order,
+        })
+    return grid
+
+def pipeline_name(cfg: dict) -> str:
+    approx = cfg["approx_degree"] if cfg["approx_degree"] is not None else 1.0
+    return f"{cfg['strategy']}|approx={approx}|chi={cfg['bond_dim']}|{cfg['qubit_order']}"
+
+def run_pipeline(qasm_path: str, cfg: dict, shots: int, beam_width: int) -> dict:
+    skip = cfg["strategy"] == "none"
+    return solve(
+        qasm_path,
+        shots=shots,
+        bond_dim=cfg["bond_dim"],
+        strategy="clifford_simp" if skip else cfg["strategy"],
+        approx_degree=cfg["approx_degree"],
+        skip_pyzx=skip,
+        beam_width=beam_width,
+        qubit_order=cfg["qubit_order"],
+    )
+
+def run_portfolio(qasm_path: str, grid: list[dict], workers: int = 4, mem_mb: float | None = None,
+                  timeout: float | None = None, confidence: float = 0.05, shots: int = 2000,
+                  beam_width: int = 4, output_dir: str = "results") -> dict | None:
+    """Run every pipeline in `grid`; returns the best result seen (first confident one wins)."""
+    name = os.path.splitext(os.path.basename(qasm_path))[0]
+    os.makedirs(output_dir, exist_ok=True)
+    stream_path = os.path.join(output_dir, f"portfolio_{name}.jsonl")
+    jobs = [
+        Job(pipeline_name(cfg), run_pipeline,
+            dict(qasm_path=qasm_path, cfg=cfg, shots=shots, beam_width=beam_width),
+            mem_mb=mem_mb, timeout=timeout)
+        for cfg in grid
+    ]
+    print(f"\n>>> Portfolio on {name}: {len(jobs)} pipelines, {workers} workers, confidence >= {confidence}")
+    t0 = time.perf_counter()
+    best: dict | None = None
+
+    def on_result(res) -> bool:
+        nonlocal best
+        record = {"pipeline": res.job.name, "ok": res.ok, "elapsed": round(res.elapsed, 2),
+                  "wall": round(time.perf_counter() - t0, 2)}
+        if res.ok:
+            record.update(bitstring=res.value["bitstring"], probability=res.value["probability"])
+            print(f"  [{record['wall']:7.1f}s] {res.job.name:<48} {res.value['bitstring']}  p={res.value['probability']:.4f}")
+            if best is None or res.value["probability"] > best["probability"]:
+                best = dict(res.value, pipeline=res.job.name)
+        else:
+            record["error"] = res.error.strip().splitlines()[-1] if res.error else None
+            print(f"  [{record['wall']:7.1f}s] {res.job.name:<48} FAILED: {record['error']}")
+        with open(stream_path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+        if res.ok and res.value["probability"] >= confidence:
+            print(f"  Confident answer from {res.job.name}; cancelling remaining pipelines.")
+            return True
+        return False
+
+    run_jobs(jobs, workers=workers, on_result=on_result)
+    print(f"\nPortfolio finished in {time.perf_counter() - t0:.1f}s")
+    if best:
+        print(f"Best: {best['bitstring']} (p={best['probability']:.4f}) from {best['pipeline']}")
+    return best
+
+def main() -> None:
+    import argparse
+    parser = argparse.ArgumentParser(description="Run a grid of solve pipelines in parallel")
+    parser.add_argument("qasm", help="Path to QASM file")
+    parser.add_argument("--strategies", nargs="+", default=["full_reduce", "clifford_simp"],
+                        choices=list(ZX_STRATEGIES) + ["none"], help="PyZX strategies ('none' skips PyZX)")
+    parser.add_argument("--approx-degrees", nargs="+", type=float, default=[1.0, 0.99])
+    parser.add_argument("--bond-dims", nargs="+", type=int, default=[32, 128])
+    parser.add_argument("--orders", nargs="+", choices=ORDERINGS, default=["natural"])
+    parser.add_argument("--beam-width", type=int, default=4, help="Peak-decode width (0 = Aer sampling)")
+    parser.add_argument("--shots", type=int, default=2000, help="Shots when --beam-width 0")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--mem-mb", type=float, default=None, help="Per-worker address-space cap")
+    parser.add_argument("--timeout", type=float, default=None, help="Per-pipeline wall-clock limit (s)")
+    parser.add_argument("--confidence", type=float, default=0.05, help="Peak probability that stops the portfolio")
+    parser.add_argument("--output", help="Write the winning result as JSON")
+    args = parser.parse_args()
+
+    grid = build_grid(args.strategies, args.approx_degrees, args.bond_dims, args.orders, args.beam_width)
+    best = run_portfolio(args.qasm, grid, workers=args.workers, mem_mb=args.mem_mb, timeout=args.timeout,
+                         confidence=args.confidence, shots=args.shots, beam_width=args.beam_width)
+    if args.output and best:
+        with open(args.output, "w") as f:
+            json.dump(best, f, indent=2)
+        print(f"\nResults saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,13 @@
-
+import hashlib
 import json
+import os
 import time
 from pathlib import Path
+
+from gate_table import GateTable
+from job_runner import Job, run_jobs
 from solve_circuit import solve
+from telemetry import trace_path_for
 
 CIRCUITS = {
     "P1": "P1_little_peak.qasm",
@@ -17,40 +22,133 @@ CIRCUITS = {
     "P10": "P10_eternal_mountain.qasm",
 }
 
+# Per-circuit settings. Keys in BUDGET_KEYS set the worker's resource budget
+# (mem_mb: address-space cap, cpu_s: CPU seconds, timeout: wall-clock seconds);
+# everything else is passed to solve(), overriding the run_all defaults.
 CIRCUIT_OVERRIDES = {
     "P6": {"skip_pyzx": True, "approx_degree": 0.99},
+    "P9": {"timeout": 3600},
+    "P10": {"timeout": 3600},
 }
+BUDGET_KEYS = ("mem_mb", "cpu_s", "timeout")
+
+STATE_FILE = "run_all_state.json"
+
+def file_digest(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+def estimate_cost(path: Path) -> float:
+    """Rough relative cost used for longest-first scheduling: gates x qubits."""
+    gt = GateTable.from_qasm_file(str(path))
+    return float(len(gt) * gt.num_qubits)
+
+def split_overrides(overrides: dict) -> tuple[dict, dict]:
+    budget = {k: v for k, v in overrides.items() if k in BUDGET_KEYS}
+    kwargs = {k: v for k, v in overrides.items() if k not in BUDGET_KEYS}
+    return budget, kwargs
+
+def load_json(path: Path) -> dict:
+    if path.exists():
+        with open(path) as f:
+            return json.load(f)
+    return {}
+
+def write_json(path: Path, data: dict) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
 
-def run_all(qasm_dir: str = "challenge", output_dir: str = "results", shots: int = 1000, bond_dim: int = 16):
+def run_all(qasm_dir: str = "challenge", output_dir: str = "results", shots: int = 1000, bond_dim: int = 16,
+            workers: int | None = None, mem_mb: float | None = None, timeout: float | None = None,
+            resume: bool = True, only: list[str] | None = None):
+    """Solve every circuit in CIRCUITS concurrently, longest first.
+
+    Each finished circuit is written to `<name>_res.json` (stage telemetry in
+    `<name>_res.trace.json`) and merged into `p1_p10_final.json` immediately.
+    `run_all_state.json` records which circuits finished with which QASM
+    digest and settings, so a rerun after a crash only solves what is missing
+    (or changed) unless resume=False.
+    """
     qasm_dir_p = Path(qasm_dir)
     output_dir_p = Path(output_dir)
     output_dir_p.mkdir(exist_ok=True)
+    (output_dir_p / "logs").mkdir(exist_ok=True)
+    state_path = output_dir_p / STATE_FILE
+    final_path = output_dir_p / "p1_p10_final.json"
+    state = load_json(state_path)
+    results = load_json(final_path)
+    workers = workers or os.cpu_count() or 1
 
-    results = {}
     print("\n" + "=" * 70 + "\nSOLVING ALL CIRCUITS\n" + "=" * 70)
 
+    jobs = []
     for name, filename in CIRCUITS.items():
+        if only and name not in only:
+            continue
         qasm_file = qasm_dir_p / filename
         if not qasm_file.exists():
             print(f"Skipping {name}: {qasm_file} not found")
             continue
 
-        overrides = CIRCUIT_OVERRIDES.get(name, {})
-        try:
-            res = solve(str(qasm_file), shots=shots, bond_dim=bond_dim, **overrides)
-            results[name] = res["bitstring"]
-            # Save individual JSON
-            with open(output_dir_p / f"{name}_res.json", "w") as f:
-                json.dump(res, f, indent=2)
-        except Exception as e:
-            print(f"Error on {name}: {e}")
+        budget, overrides = split_overrides(CIRCUIT_OVERRIDES.get(name, {}))
+        kwargs = {"shots": shots, "bond_dim": bond_dim, **overrides}
+        config = {"digest": file_digest(qasm_file), "kwargs": kwargs}
+        done = state.get(name, {})
+        if resume and done.get("status") == "ok" and all(done.get(k) == v for k, v in config.items()):
+            print(f"Skipping {name}: already solved ({done['bitstring']})")
+            continue
 
-    print("\n" + "=" * 70 + "\nSUMMARY\n" + "=" * 70)
-    for name, bs in results.items():
-        print(f"{name:<5}: {bs}")
+        job = Job(
+            name, solve,
+            dict(qasm_path=str(qasm_file), trace_path=trace_path_for(str(output_dir_p / f"{name}_res.json")), **kwargs),
+            mem_mb=budget.get("mem_mb", mem_mb),
+            cpu_s=budget.get("cpu_s"),
+            timeout=budget.get("timeout", timeout),
+            log_path=str(output_dir_p / "logs" / f"{name}.log"),
+        )
+        jobs.append((estimate_cost(qasm_file), job, config))
 
-    with open(output_dir_p / "p1_p10_final.json", "w") as f:
-        json.dump(results, f, indent=2)
+    jobs.sort(key=lambda x: -x[0])
+    configs = {job.name: config for _, job, config in jobs}
+    print(f"Scheduling {len(jobs)} circuits on {workers} workers (longest first): "
+          f"{', '.join(job.name for _, job, _ in jobs)}")
+    t0 = time.perf_counter()
+
+    def on_result(res) -> None:
+        name = res.job.name
+        entry = dict(configs[name], status="ok" if res.ok else "failed", elapsed=round(res.elapsed, 2))
+        if res.ok:
+            entry["bitstring"] = res.value["bitstring"]
+            results[name] = res.value["bitstring"]
+            write_json(output_dir_p / f"{name}_res.json", res.value)
+            write_json(final_path, results)
+            print(f"  [{time.perf_counter() - t0:7.1f}s] {name:<4} {res.value['bitstring']} ({res.elapsed:.1f}s)")
+        else:
+            entry["error"] = res.error.strip().splitlines()[-1] if res.error else None
+            print(f"  [{time.perf_counter() - t0:7.1f}s] {name:<4} FAILED: {entry['error']} (log: {res.job.log_path})")
+        state[name] = entry
+        write_json(state_path, state)
+
+    run_jobs([job for _, job, _ in jobs], workers=workers, on_result=on_result)
+
+    print("\n" + "=" * 70 + "\nSUMMARY\n" + "=" * 70)
+    for name in CIRCUITS:
+        if name in results:
+            print(f"{name:<5}: {results[name]}")
 
 if __name__ == "__main__":
-    run_all()
+    import argparse
+    parser = argparse.ArgumentParser(description="Solve all challenge circuits concurrently")
+    parser.add_argument("--qasm-dir", default="challenge")
+    parser.add_argument("--output-dir", default="results")
+    parser.add_argument("--shots", type=int, default=1000)
+    parser.add_argument("--bond-dim", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=None, help="Concurrent circuits (default: CPU count)")
+    parser.add_argument("--mem-mb", type=float, default=None, help="Default per-circuit memory cap")
+    parser.add_argument("--timeout", type=float, default=None, help="Default per-circuit wall-clock limit (s)")
+    parser.add_argument("--no-resume", action="store_true", help="Re-solve circuits that already finished")
+    parser.add_argument("--only", nargs="+", help="Subset of circuits, e.g. --only P1 P4")
+    args = parser.parse_args()
+    run_all(args.qasm_dir, args.output_dir, shots=args.shots, bond_dim=args.bond_dim, workers=args.workers,
+            mem_mb=args.mem_mb, timeout=args.timeout, resume=not args.no_resume, only=args.only)
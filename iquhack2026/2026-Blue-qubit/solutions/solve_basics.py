@@ -2,6 +2,7 @@ import os
 from qiskit import QuantumCircuit, transpile
 from qiskit_aer import AerSimulator
 import csv
+from planner import plan_circuit
 
 # Problems to solve
 problems = [
@@ -17,16 +18,19 @@ results = []
 for p in problems:
     print(f"\n--- Solving {p['name']} ({p['qubits']} qubits) ---")
     
-    # Choose Simulator
-    if p['qubits'] <= 24:
-        sim = sim_sv
-        print("Method: Statevector (Exact)")
-    else:
-        sim = sim_mps
-        print("Method: MPS (Approximate/Factorized)")
-        
     try:
         qc = QuantumCircuit.from_qasm_file(p['file'])
+
+        # Choose Simulator from the cost model instead of a fixed qubit cutoff
+        plan = plan_circuit(qc, methods=("statevector", "mps"))
+        if plan.method == "statevector":
+            sim = sim_sv
+            print("Method: Statevector (Exact)")
+        else:
+            sim = sim_mps
+            print("Method: MPS (Approximate/Factorized)")
+        print(plan.summary())
+
         qc.measure_all()
         
         # Transpile
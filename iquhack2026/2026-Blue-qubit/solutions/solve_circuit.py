@@ -1,9 +1,15 @@
 
 import json
+import os
 import time
-import pyzx as zx
-from qiskit import QuantumCircuit, transpile, qasm2
+from qiskit import QuantumCircuit, qasm2
 from qiskit_aer import AerSimulator
+from zx_cache import reduce_qasm
+from transpile_cache import cached_transpile
+from mps import ORDERINGS, adaptive_simulate, chain_order, measured_bitstring, simulate
+from planner import METHODS, plan_circuit, record
+from telemetry import Telemetry, circuit_stats, maybe_stage, peak_rss_mb, trace_path_for
+from windows import simulate_windowed
 
 def load_qasm(path: str) -> str:
     """Load QASM file and remove barrier lines."""
@@ -15,36 +21,25 @@ def load_qasm(path: str) -> str:
     )
     return qasm_str
 
-def pyzx_simplify(qasm_str: str, strategy: str = "clifford_simp") -> str:
-    """Apply PyZX simplification."""
-    circuit = zx.Circuit.from_qasm(qasm_str)
-    print(f"  Original: {circuit.qubits} qubits, {len(circuit.gates)} gates")
-    g = circuit.to_graph()
-    if strategy == "clifford_simp":
-        zx.simplify.clifford_simp(g)
-    elif strategy == "spider_simp":
-        zx.simplify.spider_simp(g)
-    elif strategy == "full_reduce":
-        zx.full_reduce(g)
-    elif strategy == "teleport_reduce":
-        zx.teleport_reduce(g)
-    else:
-        raise ValueError(f"Unknown strategy: {strategy}")
-    circ_reduced = zx.extract_circuit(g)
-    print(f"  After {strategy}: {len(circ_reduced.gates)} gates")
-    return circ_reduced.to_qasm()
-
-def qiskit_optimize(qasm_str: str, optimization_level: int = 3, approximation_degree: float | None = None) -> QuantumCircuit:
-    """Apply Qiskit transpiler optimization."""
+def pyzx_simplify(qasm_str: str, strategy: str = "clifford_simp", use_cache: bool = True, tel: Telemetry | None = None) -> str:
+    """Apply PyZX simplification (results are cached on disk, see zx_cache.py)."""
+    return qasm2.dumps(reduce_qasm(qasm_str, strategy=strategy, use_cache=use_cache, tel=tel))
+
+def qiskit_optimize(qasm_str: str, optimization_level: int = 3, approximation_degree: float | None = None, use_cache: bool = True, tel: Telemetry | None = None) -> QuantumCircuit:
+    """Apply Qiskit transpiler optimization (cached on disk, see transpile_cache.py)."""
     qc = QuantumCircuit.from_qasm_str(qasm_str)
     print(f"  Before transpile: depth={qc.depth()}, size={qc.size()}")
     qc.measure_all()
-    optimized = transpile(
-        qc,
-        basis_gates=["u3", "cx"],
-        optimization_level=optimization_level,
-        approximation_degree=approximation_degree,
-    )
+    with maybe_stage(tel, "transpile", before=qc) as rec:
+        optimized = cached_transpile(
+            qc,
+            basis_gates=["u3", "cx"],
+            optimization_level=optimization_level,
+            approximation_degree=approximation_degree,
+            use_cache=use_cache,
+        )
+        rec.update(optimization_level=optimization_level, approximation_degree=approximation_degree,
+                   after=circuit_stats(optimized) if tel else {})
     approx_str = f", approx={approximation_degree}" if approximation_degree else ""
     print(f"  After transpile (level {optimization_level}{approx_str}): depth={optimized.depth()}, size={optimized.size()}")
     return optimized
@@ -61,6 +56,86 @@ def run_mps(qc: QuantumCircuit, shots: int = 2000, bond_dim: int = 128) -> dict[
     print(f"  Sample time: {dt:.2f}s")
     return counts
 
+def run_statevector(qc: QuantumCircuit, shots: int = 2000) -> dict[str, int]:
+    """Exact sampling with the Aer statevector backend."""
+    backend = AerSimulator(method="statevector")
+    t0 = time.perf_counter()
+    counts = backend.run(qc, shots=shots).result().get_counts()
+    print(f"  Sample time: {time.perf_counter() - t0:.2f}s")
+    return counts
+
+def run_stabilizer(qc: QuantumCircuit, shots: int = 2000) -> dict[str, int]:
+    """Sample a Clifford circuit from its stabilizer tableau (u3 on the pi/2 grid is accepted)."""
+    from qiskit.quantum_info import Clifford, StabilizerState
+    t0 = time.perf_counter()
+    state = StabilizerState(Clifford(qc.remove_final_measurements(inplace=False)))
+    counts = {}
+    for b, c in state.sample_counts(shots).items():
+        key = measured_bitstring(qc, str(b))
+        counts[key] = counts.get(key, 0) + int(c)
+    print(f"  Sample time: {time.perf_counter() - t0:.2f}s")
+    return counts
+
+def run_factored(qc: QuantumCircuit, shots: int = 2000, bond_dim: int = 128) -> dict[str, int]:
+    """Solve the independent qubit components in parallel and join their peaks (see factoring.py).
+
+    Returns a single-entry count dict whose count is shots times the product
+    of the component peak probabilities.
+    """
+    from factoring import solve_factored
+    t0 = time.perf_counter()
+    res = solve_factored(qc, shots=shots, bond_dim=bond_dim)
+    print(f"  Sample time: {time.perf_counter() - t0:.2f}s")
+    return {res.bitstring: max(1, round(res.probability * shots))}
+
+def run_method(qc: QuantumCircuit, method: str, shots: int = 2000, bond_dim: int = 128) -> dict[str, int]:
+    if method == "statevector":
+        return run_statevector(qc, shots)
+    if method == "stabilizer":
+        return run_stabilizer(qc, shots)
+    if method == "factored":
+        return run_factored(qc, shots, bond_dim)
+    return run_mps(qc, shots, bond_dim)
+
+def decode_mps_peaks(qc: QuantumCircuit, bond_dim: int = 128, beam_width: int = 8, qubit_order: str = "natural",
+                     adaptive: bool = False, chi_start: int = 16, window_cluster: int = 0,
+                     tel: Telemetry | None = None) -> tuple[list[tuple[str, float]], dict]:
+    """Sampling-free peak search: native MPS + conditional beam search (see mps.py).
+
+    With `adaptive`, chi is doubled from `chi_start` up to `bond_dim` only
+    while the candidates or marginals keep changing. With `window_cluster`,
+    the evolution goes block by block over small-cluster time windows
+    (windows.py) instead of gate by gate.
+    """
+    print(f"  Native MPS: bond_dim={bond_dim}, beam={beam_width}, order={qubit_order}"
+          + (f", adaptive from {chi_start}" if adaptive else "")
+          + (f", windows of <= {window_cluster} qubits" if window_cluster and not adaptive else ""))
+    t0 = time.perf_counter()
+    info = {}
+    with maybe_stage(tel, "simulate", before=qc) as rec:
+        order = chain_order(qc, qubit_order)
+        if adaptive:
+            esc = adaptive_simulate(qc, chi_start=chi_start, chi_max=bond_dim, top_k=beam_width, order=order)
+            mps = esc.mps
+            info = {"chi_converged": esc.chi if esc.converged else None, "bond_history": esc.history}
+            print(f"  {'Converged' if esc.converged else 'NOT converged'} at chi={esc.chi}")
+        elif window_cluster:
+            mps, st = simulate_windowed(qc, max_bond=bond_dim, max_cluster=window_cluster, order=order)
+            info["windows"] = st
+            print(f"  {st['gates']} gates in {st['windows']} windows -> {st['blocks']} blocks "
+                  f"({st['identity_blocks']} identity, skipped)")
+        else:
+            mps = simulate(qc, max_bond=bond_dim, order=order)
+        info["discarded"] = mps.discarded
+        rec.update(method="native_mps", bond_dim=bond_dim, max_bond=mps.max_bond_dim, discarded=mps.discarded)
+    t_evolve = time.perf_counter() - t0
+    with maybe_stage(tel, "postprocess") as rec:
+        candidates = [(measured_bitstring(qc, b), p) for b, p in mps.top_bitstrings(beam_width)]
+        rec["beam_width"] = beam_width
+    print(f"  Evolve time: {t_evolve:.2f}s, decode time: {time.perf_counter() - t0 - t_evolve:.3f}s "
+          f"(max bond {mps.max_bond_dim}, discarded {mps.discarded:.2e})")
+    return candidates, info
+
 def reconstruct_bitstring(measurement: str, n_qubits: int) -> str:
     """Normalize Aer count keys to a clean bitstring."""
     measurement = measurement.replace(" ", "")
@@ -68,50 +143,98 @@ def reconstruct_bitstring(measurement: str, n_qubits: int) -> str:
         measurement = measurement[:n_qubits]
     return measurement
 
-def solve(qasm_path: str, shots: int = 2000, bond_dim: int = 128, strategy: str = "clifford_simp", opt_level: int = 3, approx_degree: float | None = None, skip_pyzx: bool = False) -> dict:
-    """Solve a circuit to find its peak bitstring."""
+def solve(qasm_path: str, shots: int = 2000, bond_dim: int = 128, strategy: str = "clifford_simp", opt_level: int = 3, approx_degree: float | None = None, skip_pyzx: bool = False, zx_cache: bool = True, transpile_cache: bool = True, beam_width: int = 0, qubit_order: str = "natural", method: str = "mps", adaptive_bond: bool = False, chi_start: int = 16, window_cluster: int = 0, trace_path: str | None = None) -> dict:
+    """Solve a circuit to find its peak bitstring.
+
+    With `trace_path`, per-stage timing/memory telemetry is written there as
+    JSON (also when a stage fails).
+    """
     import traceback
     print(f"\n{'='*60}\nSolving: {qasm_path}\n{'='*60}")
     t_start = time.perf_counter()
+    tel = Telemetry(os.path.basename(qasm_path), strategy=None if skip_pyzx else strategy,
+                    bond_dim=bond_dim, opt_level=opt_level, approx_degree=approx_degree)
     try:
-        raw_qasm = load_qasm(qasm_path)
-        # Canonical re-dump to ensure PyZX compatibility
-        qc_orig = QuantumCircuit.from_qasm_file(qasm_path)
-        qasm_str = qasm2.dumps(qc_orig)
-        n_qubits = qc_orig.num_qubits
+        with tel.stage("load") as rec:
+            raw_qasm = load_qasm(qasm_path)
+            # Canonical re-dump to ensure PyZX compatibility
+            qc_orig = QuantumCircuit.from_qasm_file(qasm_path)
+            qasm_str = qasm2.dumps(qc_orig)
+            n_qubits = qc_orig.num_qubits
+            rec["after"] = circuit_stats(qc_orig)
         if skip_pyzx:
             print("\n[2] Skipping PyZX...")
             qasm_opt = qasm_str
         else:
             print(f"\n[2] PyZX Simplification ({strategy})...")
             try:
-                qasm_opt = pyzx_simplify(qasm_str, strategy=strategy)
+                qasm_opt = pyzx_simplify(qasm_str, strategy=strategy, use_cache=zx_cache, tel=tel)
             except Exception as e:
                 print(f"  PyZX failed: {e}")
                 traceback.print_exc()
                 print("  Falling back to original circuit...")
                 qasm_opt = qasm_str
         print(f"\n[3] Qiskit Transpile (level {opt_level})...")
-        qc = qiskit_optimize(qasm_opt, optimization_level=opt_level, approximation_degree=approx_degree)
-        print("\n[4] MPS Simulation...")
-        counts = run_mps(qc, shots=shots, bond_dim=bond_dim)
-        peak_raw = max(counts, key=counts.get)
-        peak_count = counts[peak_raw]
-        peak_bitstring = reconstruct_bitstring(peak_raw, n_qubits)
+        qc = qiskit_optimize(qasm_opt, optimization_level=opt_level, approximation_degree=approx_degree, use_cache=transpile_cache, tel=tel)
+        if beam_width:
+            print("\n[4] MPS Peak Decoding...")
+            candidates, info = decode_mps_peaks(qc, bond_dim=bond_dim, beam_width=beam_width, qubit_order=qubit_order,
+                                                adaptive=adaptive_bond, chi_start=chi_start,
+                                                window_cluster=window_cluster, tel=tel)
+            peak_bitstring, peak_prob = candidates[0]
+            dt_total = time.perf_counter() - t_start
+            print(f"Peak bitstring: {peak_bitstring} ({100*peak_prob:.1f}%)")
+            return {
+                "bitstring": peak_bitstring,
+                "probability": peak_prob,
+                "candidates": [{"bitstring": b, "probability": p} for b, p in candidates],
+                "time": dt_total,
+                "strategy": strategy,
+                "bond_dim": bond_dim,
+                "qubit_order": qubit_order,
+                "method": "mps_beam",
+                **info,
+            }
+        plan = None
+        if method == "auto":
+            with tel.stage("plan", before=qc) as rec:
+                plan = plan_circuit(qc, max_bond=bond_dim, qubit_order=qubit_order)
+                method = plan.method
+                rec.update(method=method, predicted_s=plan.chosen.seconds)
+            print(f"\n[4a] Planner picked {method}:\n{plan.summary()}")
+        print(f"\n[4] Simulation ({method})...")
+        t_sim = time.perf_counter()
+        with tel.stage("simulate", before=qc) as rec:
+            counts = run_method(qc, method, shots=shots, bond_dim=bond_dim)
+            rec.update(method=method, shots=shots, bond_dim=bond_dim, unique_outcomes=len(counts))
+        if plan is not None:
+            dt_sim = time.perf_counter() - t_sim
+            print(f"  Predicted {plan.chosen.seconds:.2f}s, actual {dt_sim:.2f}s")
+            record(os.path.basename(qasm_path), plan, method, dt_sim, peak_rss_mb())
+        with tel.stage("postprocess"):
+            peak_raw = max(counts, key=counts.get)
+            peak_count = counts[peak_raw]
+            peak_bitstring = reconstruct_bitstring(peak_raw, n_qubits)
         dt_total = time.perf_counter() - t_start
         print(f"Peak bitstring: {peak_bitstring} ({100*peak_count/shots:.1f}%)")
         return {
             "bitstring": peak_bitstring,
             "count": peak_count,
             "total_shots": shots,
+            "probability": peak_count / shots,
             "time": dt_total,
             "strategy": strategy,
-            "bond_dim": bond_dim
+            "bond_dim": bond_dim,
+            "method": method,
         }
     except Exception as e:
         print(f"\n[CRITICAL ERROR] Failed to solve {qasm_path}: {e}")
         traceback.print_exc()
         raise e
+    finally:
+        if trace_path:
+            tel.write(trace_path)
+            print(f"\nStage telemetry ({trace_path}):\n{tel.summary()}")
 
 def main() -> None:
     import argparse
@@ -133,8 +256,36 @@ def main() -> None:
         help="Qiskit approximation degree (0.0-1.0)",
     )
     parser.add_argument("--skip-pyzx", action="store_true", help="Skip PyZX simplification")
+    parser.add_argument("--no-zx-cache", action="store_true", help="Recompute PyZX reduction instead of using .cache/zx")
+    parser.add_argument("--no-transpile-cache", action="store_true", help="Re-run transpilation instead of using .cache/transpile")
+    parser.add_argument(
+        "--peak-decode",
+        type=int,
+        default=0,
+        metavar="K",
+        help="Skip sampling; beam-decode the K most probable bitstrings from a native MPS",
+    )
+    parser.add_argument("--qubit-order", choices=ORDERINGS, default="natural", help="MPS chain ordering for --peak-decode")
+    parser.add_argument("--adaptive-bond", action="store_true",
+                        help="With --peak-decode: double chi from --chi-start up to --bond-dim until the answer is stable")
+    parser.add_argument("--chi-start", type=int, default=16, help="First bond cap for --adaptive-bond")
+    parser.add_argument("--window-cluster", type=int, default=0, metavar="K",
+                        help="With --peak-decode: apply gates as one block per cluster of <= K qubits per time window")
+    parser.add_argument(
+        "--method",
+        choices=("auto",) + METHODS,
+        default="mps",
+        help="Simulation method ('auto' = cost-model planner, see planner.py)",
+    )
     parser.add_argument("--output", help="Output JSON file for results")
+    parser.add_argument("--trace", help="Stage telemetry JSON (default: next to --output as *.trace.json)")
     args = parser.parse_args()
+    if args.adaptive_bond and not args.peak_decode:
+        parser.error("--adaptive-bond needs --peak-decode K (the sampling path uses a fixed --bond-dim)")
+    if args.window_cluster and not args.peak_decode:
+        parser.error("--window-cluster needs --peak-decode K (the sampling path simulates gate by gate)")
+    if args.window_cluster and args.adaptive_bond:
+        parser.error("--window-cluster cannot be combined with --adaptive-bond")
 
     result = solve(
         args.qasm,
@@ -144,6 +295,15 @@ def main() -> None:
         opt_level=args.opt_level,
         approx_degree=args.approx_degree,
         skip_pyzx=args.skip_pyzx,
+        zx_cache=not args.no_zx_cache,
+        transpile_cache=not args.no_transpile_cache,
+        beam_width=args.peak_decode,
+        qubit_order=args.qubit_order,
+        method=args.method,
+        adaptive_bond=args.adaptive_bond,
+        chi_start=args.chi_start,
+        window_cluster=args.window_cluster,
+        trace_path=args.trace or (trace_path_for(args.output) if args.output else None),
     )
 
     if args.output:
@@ -0,0 +1,117 @@
+"""Stage-level timing and memory telemetry for the solve pipeline.
+
+A `Telemetry` object collects one record per pipeline stage (QASM load, ZX
+simplification, ZX extraction, transpile, simulation, post-processing):
+wall time, current and peak RSS, and gate count / 2-qubit count / depth of the
+circuit going in and coming out. `solve()` writes it as JSON next to the
+result file (`P9_res.json` -> `P9_res.trace.json`).
+
+Usage:
+    tel = Telemetry("P9")
+    with tel.stage("transpile", before=qc) as rec:
+        out = transpile(qc, ...)
+        rec["after"] = circuit_stats(out)
+    tel.write("results/P9_res.trace.json")
+
+Functions that only sometimes run under telemetry use
+`maybe_stage(tel, name)`, which is a no-op when `tel` is None.
+"""
+import json
+import os
+import platform
+import resource
+import time
+from contextlib import contextmanager
+
+TRACE_SUFFIX = ".trace.json"
+
+def current_rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return peak_rss_mb()
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def circuit_stats(circuit) -> dict:
+    """Size summary of a QuantumCircuit, pyzx Circuit/graph or GateTable."""
+    if hasattr(circuit, "num_nonlocal_gates"):  # QuantumCircuit
+        ops = circuit.count_ops()
+        gates = sum(v for k, v in ops.items() if k not in ("barrier", "measure"))
+        return {"qubits": circuit.num_qubits, "gates": gates,
+                "two_qubit": circuit.num_nonlocal_gates(), "depth": circuit.depth()}
+    if hasattr(circuit, "twoqubitcount"):  # pyzx Circuit
+        return {"qubits": circuit.qubits, "gates": len(circuit.gates),
+                "two_qubit": circuit.twoqubitcount(), "depth": circuit.depth()}
+    if hasattr(circuit, "num_vertices"):  # pyzx graph
+        return {"vertices": circuit.num_vertices(), "edges": circuit.num_edges()}
+    if hasattr(circuit, "interaction_matrix"):  # GateTable
+        return {"qubits": circuit.num_qubits, "gates": len(circuit), "two_qubit": int(circuit.two_qubit_mask.sum())}
+    return {}
+
+def trace_path_for(result_path: str) -> str:
+    """`results/P9_res.json` -> `results/P9_res.trace.json`."""
+    base = result_path[:-5] if result_path.endswith(".json") else result_path
+    return base + TRACE_SUFFIX
+
+class Telemetry:
+    def __init__(self, name: str, **meta):
+        self.name = name
+        self.meta = meta
+        self.stages: list[dict] = []
+        self.started = time.strftime("%Y-%m-%dT%H:%M:%S")
+        self._t0 = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str, before=None):
+        """Time a stage; the yielded dict can be filled with `after` stats or extra fields."""
+        rec = {"stage": name}
+        if before is not None:
+            rec["before"] = circuit_stats(before)
+        rss0, peak0 = current_rss_mb(), peak_rss_mb()
+        t0 = time.perf_counter()
+        try:
+            yield rec
+        except BaseException as e:
+            rec["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            rec["seconds"] = time.perf_counter() - t0
+            rec["rss_mb"] = current_rss_mb()
+            rec["rss_delta_mb"] = rec["rss_mb"] - rss0
+            rec["peak_rss_mb"] = peak_rss_mb()
+            rec["peak_rss_growth_mb"] = rec["peak_rss_mb"] - peak0
+            self.stages.append(rec)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "started": self.started,
+            "host": platform.node(),
+            "total_seconds": time.perf_counter() - self._t0,
+            "peak_rss_mb": peak_rss_mb(),
+            **self.meta,
+            "stages": self.stages,
+        }
+
+    def summary(self) -> str:
+        total = sum(s["seconds"] for s in self.stages) or 1.0
+        return "\n".join(
+            f"  {s['stage']:<14} {s['seconds']:9.2f}s ({100 * s['seconds'] / total:5.1f}%)  peak {s['peak_rss_mb']:8.1f} MB"
+            for s in self.stages
+        )
+
+    def write(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+@contextmanager
+def maybe_stage(tel: "Telemetry | None", name: str, before=None):
+    if tel is None:
+        yield {}
+    else:
+        with tel.stage(name, before=before) as rec:
+            yield rec
@@ -0,0 +1,137 @@
+"""Persistent cache of transpiled circuits.
+
+Level-3 transpilation of the reduced P6/P9/P10 circuits costs seconds to
+minutes and is repeated verbatim whenever only the downstream simulation
+settings change. `cached_transpile` is a drop-in for the
+`transpile(qc, basis_gates=..., optimization_level=..., approximation_degree=...)`
+calls used across the solvers. Entries live in `.cache/transpile/`, are keyed
+by the input-circuit fingerprint plus every pass option that affects the
+output, and are evicted least-recently-used once the directory exceeds
+`IQH_TRANSPILE_CACHE_MB` (default 512 MB).
+
+Note: with `seed_transpiler=None` the first transpilation result is the one
+that gets reused; pass an explicit seed when comparing runs.
+"""
+import hashlib
+import json
+import os
+
+import qiskit
+from qiskit import QuantumCircuit, qasm2, transpile
+
+from zx_cache import CACHE_DIR, dump_circuit, load_circuit, write_atomic
+
+TRANSPILE_DIR = os.path.join(CACHE_DIR, "transpile")
+MAX_CACHE_BYTES = int(float(os.environ.get("IQH_TRANSPILE_CACHE_MB", "512")) * 1024 * 1024)
+
+def circuit_fingerprint(qc: QuantumCircuit) -> str:
+    """Stable hash of a circuit's contents (QASM when expressible, QPY otherwise)."""
+    try:
+        payload = qasm2.dumps(qc).encode()
+    except Exception:
+        payload = dump_circuit(qc)
+    return hashlib.sha256(payload).hexdigest()
+
+def _coupling_edges(coupling_map) -> list | None:
+    if coupling_map is None:
+        return None
+    edges = coupling_map.get_edges() if hasattr(coupling_map, "get_edges") else coupling_map
+    return sorted([int(a), int(b)] for a, b in edges)
+
+def transpile_cache_key(qc: QuantumCircuit, basis_gates=None, optimization_level: int | None = None,
+                        approximation_degree: float | None = None, coupling_map=None,
+                        seed_transpiler: int | None = None) -> str:
+    """Key over input fingerprint, basis gates, level, approximation, coupling map and seed."""
+    config = {
+        "qiskit": qiskit.__version__,
+        "circuit": circuit_fingerprint(qc),
+        "basis_gates": sorted(basis_gates) if basis_gates is not None else None,
+        "optimization_level": optimization_level,
+        "approximation_degree": approximation_degree,
+        "coupling_map": _coupling_edges(coupling_map),
+        "seed_transpiler": seed_transpiler,
+    }
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()
+
+def _entries() -> list[tuple[float, int, str]]:
+    if not os.path.isdir(TRANSPILE_DIR):
+        return []
+    out = []
+    for name in os.listdir(TRANSPILE_DIR):
+        if not name.endswith(".qpy.z"):
+            continue
+        path = os.path.join(TRANSPILE_DIR, name)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue
+        out.append((st.st_mtime, st.st_size, path))
+    return out
+
+def evict(max_bytes: int = MAX_CACHE_BYTES) -> int:
+    """Drop least-recently-used entries until the cache fits in `max_bytes`."""
+    entries = sorted(_entries())
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    return removed
+
+def cached_transpile(qc: QuantumCircuit, basis_gates=None, optimization_level: int | None = None,
+                     approximation_degree: float | None = None, coupling_map=None,
+                     seed_transpiler: int | None = None, use_cache: bool = True) -> QuantumCircuit:
+    """`qiskit.transpile` with a persistent, size-capped LRU cache in front of it."""
+    options = dict(
+        basis_gates=basis_gates,
+        optimization_level=optimization_level,
+        approximation_degree=approximation_degree,
+        coupling_map=coupling_map,
+        seed_transpiler=seed_transpiler,
+    )
+    if not use_cache:
+        return transpile(qc, **options)
+
+    path = os.path.join(TRANSPILE_DIR, f"{transpile_cache_key(qc, **options)}.qpy.z")
+    if os.path.exists(path):
+        try:
+            with open(path, "rb") as f:
+                result = load_circuit(f.read())
+            os.utime(path)  # mtime doubles as LRU timestamp
+            print(f"  [transpile-cache] hit {os.path.basename(path)[:12]}")
+            return result
+        except Exception as e:
+            print(f"  [transpile-cache] dropping unreadable entry: {e}")
+            os.remove(path)
+
+    result = transpile(qc, **options)
+    write_atomic(path, dump_circuit(result))
+    evict()
+    return result
+
+def clear_cache() -> int:
+    """Delete all cached transpilations, returning how many entries were removed."""
+    entries = _entries()
+    for _, _, path in entries:
+        os.remove(path)
+    return len(entries)
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Inspect / prune the transpilation cache")
+    parser.add_argument("--clear", action="store_true", help="Remove all cached transpilations")
+    parser.add_argument("--max-mb", type=float, default=None, help="Evict LRU entries down to this size")
+    args = parser.parse_args()
+
+    if args.clear:
+        print(f"Removed {clear_cache()} cached transpilations")
+    if args.max_mb is not None:
+        print(f"Evicted {evict(int(args.max_mb * 1024 * 1024))} entries")
+    entries = _entries()
+    print(f"{TRANSPILE_DIR}: {len(entries)} entries, {sum(s for _, s, _ in entries) / 2**20:.1f} MB (cap {MAX_CACHE_BYTES / 2**20:.0f} MB)")
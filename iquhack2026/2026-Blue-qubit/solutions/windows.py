@@ -0,0 +1,179 @@
+"""Time-windowed dynamic factoring.
+
+`factoring.py` only helps when the interaction graph is disconnected over the
+whole circuit. The obfuscated circuits (P9, P10) are connected overall but,
+inside a stretch of consecutive ASAP layers, their 2-qubit gates often only
+couple small groups of qubits. `find_windows` cuts the layer sequence
+greedily into maximal windows in which every connected cluster has at most
+`max_cluster` qubits. Inside a window the clusters are independent, so each
+one's gates collapse into a single 2^k x 2^k unitary:
+
+    - blocks that multiply out to the identity (up to phase), which is what
+      the compiled-in identity padding looks like, are skipped outright;
+    - the others hit the MPS once (`MPS.apply_block`) instead of gate by
+      gate, with one truncation per bond instead of one per gate.
+
+Usage:
+    python solutions/windows.py challenge/P9_grand_summit.qasm --max-cluster 4
+    python solutions/windows.py challenge/P4_gentle_mound.qasm --simulate --bond-dim 64 --top-k 4
+"""
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from gate_table import GateTable
+from layered import asap_layers
+from mps import MPS, gate_matrix
+
+@dataclass
+class Window:
+    start_layer: int
+    stop_layer: int            # exclusive
+    gates: np.ndarray          # indices into the source table, in program order
+    clusters: list[np.ndarray]  # qubit groups touched in this window (ascending)
+
+    @property
+    def num_layers(self) -> int:
+        return self.stop_layer - self.start_layer
+
+def _find(parent: np.ndarray, x: int) -> int:
+    while parent[x] != x:
+        parent[x] = parent[parent[x]]
+        x = parent[x]
+    return x
+
+def _close(table: GateTable, gates: list[np.ndarray], parent: np.ndarray, t0: int, t1: int) -> Window:
+    idx = np.sort(np.concatenate(gates))
+    touched = np.unique(np.concatenate([table.q0[idx], table.q1[idx][table.q1[idx] >= 0]]))
+    roots = np.array([_find(parent, q) for q in touched.tolist()])
+    return Window(t0, t1, idx, [touched[roots == r] for r in np.unique(roots)])
+
+def _union_layer(parent: np.ndarray, size: np.ndarray, q0: list[int], q1: list[int], max_cluster: int) -> bool:
+    """Union one layer's 2-qubit gates in place; False if a cluster outgrew max_cluster."""
+    fits = True
+    for a, b in zip(q0, q1):
+        if b < 0:
+            continue
+        ra, rb = _find(parent, a), _find(parent, b)
+        if ra != rb:
+            parent[ra] = rb
+            size[rb] += size[ra]
+            fits &= bool(size[rb] <= max_cluster)
+    return fits
+
+def find_windows(table: GateTable, max_cluster: int = 4) -> list[Window]:
+    """Greedy maximal layer windows whose clusters have <= max_cluster qubits.
+
+    One layer never couples more than two qubits per cluster, so every window
+    holds at least one layer whenever max_cluster >= 2.
+    """
+    if max_cluster < 2:
+        raise ValueError("max_cluster must be at least 2")
+    n = table.num_qubits
+    if len(table) == 0:
+        return []
+    layer = asap_layers(table)
+    order = np.argsort(layer, kind="stable")
+    bounds = np.flatnonzero(np.diff(layer[order])) + 1
+    windows = []
+    parent, size = np.arange(n), np.ones(n, dtype=np.int64)
+    gates, t0 = [], 0
+    for chunk in np.split(order, bounds):
+        t = int(layer[chunk[0]])
+        q0, q1 = table.q0[chunk].tolist(), table.q1[chunk].tolist()
+        trial_parent, trial_size = parent.copy(), size.copy()
+        if not _union_layer(trial_parent, trial_size, q0, q1, max_cluster):
+            windows.append(_close(table, gates, parent, t0, t))
+            trial_parent, trial_size = np.arange(n), np.ones(n, dtype=np.int64)
+            _union_layer(trial_parent, trial_size, q0, q1, max_cluster)
+            gates, t0 = [], t
+        parent, size = trial_parent, trial_size
+        gates.append(chunk)
+    windows.append(_close(table, gates, parent, t0, int(layer.max()) + 1))
+    return windows
+
+def block_unitary(table: GateTable, gates: np.ndarray, qubits: np.ndarray) -> np.ndarray:
+    """Exact 2^k x 2^k product of `gates` on `qubits` (big-endian in `qubits` order)."""
+    k = len(qubits)
+    local = {q: i for i, q in enumerate(qubits.tolist())}
+    U = np.eye(2**k, dtype=complex).reshape((2,) * k + (2**k,))
+    for g in gates.tolist():
+        axes = [local[int(table.q0[g])]] + ([local[int(table.q1[g])]] if table.q1[g] >= 0 else [])
+        m = len(axes)
+        G = gate_matrix(int(table.op[g]), table.params[g]).reshape((2,) * (2 * m))
+        U = np.moveaxis(np.tensordot(G, U, axes=(list(range(m, 2 * m)), axes)), list(range(m)), axes)
+    return U.reshape(2**k, 2**k)
+
+def is_identity(U: np.ndarray, tol: float = 1e-10) -> bool:
+    """True if U equals the identity up to a global phase."""
+    return abs(abs(np.trace(U)) / len(U) - 1.0) < tol
+
+def window_stats(table: GateTable, windows: list[Window]) -> dict:
+    layers = np.array([w.num_layers for w in windows])
+    blocks = sum(len(w.clusters) for w in windows)
+    return {
+        "gates": len(table),
+        "windows": len(windows),
+        "blocks": blocks,
+        "gates_per_block": len(table) / max(blocks, 1),
+        "mean_layers": float(layers.mean()) if len(layers) else 0.0,
+        "max_layers": int(layers.max()) if len(layers) else 0,
+        "max_cluster": max((len(c) for w in windows for c in w.clusters), default=0),
+    }
+
+def simulate_windowed(circuit, max_bond: int = 64, max_cluster: int = 4, cutoff: float = 1e-12,
+                      order=None, tol: float = 1e-10) -> tuple[MPS, dict]:
+    """MPS evolution one (window, cluster) block at a time; identity blocks are skipped.
+
+    Returns the MPS and window/block statistics (see window_stats) plus the
+    number of skipped identity blocks.
+    """
+    table = circuit if isinstance(circuit, GateTable) else GateTable.from_circuit(circuit)
+    windows = find_windows(table, max_cluster)
+    mps = MPS(table.num_qubits, max_bond=max_bond, cutoff=cutoff, order=order)
+    skipped = 0
+    for w in windows:
+        owner = np.full(table.num_qubits, -1)
+        for c, qubits in enumerate(w.clusters):
+            owner[qubits] = c
+        gate_owner = owner[table.q0[w.gates]]
+        for c, qubits in enumerate(w.clusters):
+            U = block_unitary(table, w.gates[gate_owner == c], qubits)
+            if is_identity(U, tol):
+                skipped += 1
+                continue
+            mps.apply_block(U, qubits.tolist())
+    return mps, dict(window_stats(table, windows), identity_blocks=skipped)
+
+if __name__ == "__main__":
+    import argparse
+    from mps import simulate
+    parser = argparse.ArgumentParser(description="Find small-cluster time windows and simulate block by block")
+    parser.add_argument("qasm", nargs="+")
+    parser.add_argument("--max-cluster", type=int, default=4, help="Largest cluster collapsed into one block")
+    parser.add_argument("--simulate", action="store_true", help="Also run windowed vs gate-by-gate MPS and compare")
+    parser.add_argument("--bond-dim", type=int, default=64)
+    parser.add_argument("--top-k", type=int, default=4)
+    args = parser.parse_args()
+    for path in args.qasm:
+        gt = GateTable.from_qasm_file(path)
+        t0 = time.perf_counter()
+        windows = find_windows(gt, args.max_cluster)
+        st = window_stats(gt, windows)
+        print(f"{path}: {st['gates']} gates -> {st['windows']} windows, {st['blocks']} blocks "
+              f"({st['gates_per_block']:.1f} gates/block, {st['mean_layers']:.1f} layers/window, "
+              f"longest {st['max_layers']}) in {time.perf_counter() - t0:.2f}s")
+        if not args.simulate:
+            continue
+        t0 = time.perf_counter()
+        mps, st = simulate_windowed(gt, max_bond=args.bond_dim, max_cluster=args.max_cluster)
+        t_win = time.perf_counter() - t0
+        print(f"  windowed:     {t_win:8.2f}s  max bond {mps.max_bond_dim}, discarded {mps.discarded:.2e}, "
+              f"{st['identity_blocks']} identity blocks skipped")
+        t0 = time.perf_counter()
+        ref = simulate(gt, max_bond=args.bond_dim)
+        t_ref = time.perf_counter() - t0
+        print(f"  gate-by-gate: {t_ref:8.2f}s  max bond {ref.max_bond_dim}, discarded {ref.discarded:.2e}")
+        for (b, p), (rb, rp) in zip(mps.top_bitstrings(args.top_k), ref.top_bitstrings(args.top_k)):
+            print(f"    {b} {p:.4f}   {rb} {rp:.4f}")
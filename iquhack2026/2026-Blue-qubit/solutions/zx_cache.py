@@ -0,0 +1,151 @@
+"""Content-addressed on-disk cache for PyZX-reduced circuits.
+
+`zx.full_reduce` + `zx.extract_circuit` takes minutes on P9/P10 and every
+solver used to redo it from scratch. Reductions are stored under
+`.cache/zx/<sha256>.qpy.z`, keyed by the canonical QASM, the simplification
+strategy and the installed pyzx version, so a second run on the same input
+only has to inflate a small QPY blob.
+
+Usage:
+    from zx_cache import reduce_qasm_file
+    qc_zx = reduce_qasm_file("challenge/P9_grand_summit.qasm", strategy="full_reduce")
+"""
+import hashlib
+import io
+import os
+import zlib
+
+import pyzx as zx
+from qiskit import QuantumCircuit, qasm2, qpy
+
+from telemetry import circuit_stats, maybe_stage
+
+CACHE_DIR = os.environ.get(
+    "IQH_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache"),
+)
+
+ZX_STRATEGIES = ("clifford_simp", "full_reduce", "teleport_reduce", "spider_simp")
+
+def canonical_qasm(qasm_str: str) -> str:
+    """Normalize QASM text for hashing: strip whitespace, comments and barriers."""
+    lines = []
+    for line in qasm_str.splitlines():
+        line = line.split("//", 1)[0].strip()
+        if not line or line.startswith("barrier"):
+            continue
+        lines.append(" ".join(line.split()))
+    return "\n".join(lines)
+
+def zx_cache_key(qasm_str: str, strategy: str) -> str:
+    """Hash of canonical QASM + strategy + pyzx version."""
+    h = hashlib.sha256()
+    h.update(f"pyzx={zx.__version__}\nstrategy={strategy}\n".encode())
+    h.update(canonical_qasm(qasm_str).encode())
+    return h.hexdigest()
+
+def _cache_path(key: str) -> str:
+    return os.path.join(CACHE_DIR, "zx", f"{key}.qpy.z")
+
+def dump_circuit(qc: QuantumCircuit) -> bytes:
+    """Serialize a circuit as zlib-compressed QPY."""
+    buf = io.BytesIO()
+    qpy.dump(qc, buf)
+    return zlib.compress(buf.getvalue(), 6)
+
+def load_circuit(blob: bytes) -> QuantumCircuit:
+    """Inverse of `dump_circuit`."""
+    return qpy.load(io.BytesIO(zlib.decompress(blob)))[0]
+
+def write_atomic(path: str, blob: bytes) -> None:
+    """Write via a temp file so concurrent solvers never see a partial entry."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(blob)
+    os.replace(tmp, path)
+
+def run_zx_strategy(qasm_str: str, strategy: str, tel=None) -> "zx.Circuit":
+    """Uncached PyZX simplification + extraction."""
+    circuit = zx.Circuit.from_qasm(qasm_str)
+    print(f"  Original: {circuit.qubits} qubits, {len(circuit.gates)} gates")
+    with maybe_stage(tel, "zx_simplify", before=circuit) as rec:
+        g = circuit.to_graph()
+        if strategy == "clifford_simp":
+            zx.simplify.clifford_simp(g)
+        elif strategy == "spider_simp":
+            zx.simplify.spider_simp(g)
+        elif strategy == "full_reduce":
+            zx.full_reduce(g)
+        elif strategy == "teleport_reduce":
+            zx.teleport_reduce(g)
+        else:
+            raise ValueError(f"Unknown strategy: {strategy}")
+        rec.update(strategy=strategy, after=circuit_stats(g) if tel else {})
+    with maybe_stage(tel, "zx_extract", before=g) as rec:
+        out = zx.extract_circuit(g)
+        rec["after"] = circuit_stats(out) if tel else {}
+    return out
+
+def _load_entry(path: str, strategy: str) -> QuantumCircuit:
+    with open(path, "rb") as f:
+        qc = load_circuit(f.read())
+    print(f"  [zx-cache] hit {os.path.basename(path)[:12]} ({strategy}): {qc.size()} gates")
+    return qc
+
+def reduce_qasm(qasm_str: str, strategy: str = "full_reduce", use_cache: bool = True, tel=None) -> QuantumCircuit:
+    """PyZX-reduce a QASM string, loading the result from cache when available.
+
+    `tel` is an optional telemetry.Telemetry that gets the simplify/extract
+    (or cache-load) stages.
+    """
+    if strategy not in ZX_STRATEGIES:
+        raise ValueError(f"Unknown strategy: {strategy}")
+    path = _cache_path(zx_cache_key(qasm_str, strategy))
+    if use_cache and os.path.exists(path):
+        with maybe_stage(tel, "zx_cache_load") as rec:
+            qc = _load_entry(path, strategy)
+            rec["after"] = circuit_stats(qc) if tel else {}
+        return qc
+    circ_reduced = run_zx_strategy(qasm_str, strategy, tel=tel)
+    qc = QuantumCircuit.from_qasm_str(circ_reduced.to_qasm())
+    print(f"  After {strategy}: {len(circ_reduced.gates)} gates")
+    if use_cache:
+        write_atomic(path, dump_circuit(qc))
+    return qc
+
+def reduce_qasm_file(path: str, strategy: str = "full_reduce", use_cache: bool = True) -> QuantumCircuit:
+    """PyZX-reduce a QASM file.
+
+    The file is re-dumped through qiskit first (the form PyZX reliably
+    accepts) and keyed on that text, the same string `solve_circuit.solve`
+    hands to `reduce_qasm`, so scripts and the solver share cache entries.
+    """
+    return reduce_qasm(qasm2.dumps(QuantumCircuit.from_qasm_file(path)), strategy, use_cache=use_cache)
+
+def clear_cache() -> int:
+    """Delete all cached reductions, returning how many entries were removed."""
+    zx_dir = os.path.join(CACHE_DIR, "zx")
+    if not os.path.isdir(zx_dir):
+        return 0
+    removed = 0
+    for name in os.listdir(zx_dir):
+        os.remove(os.path.join(zx_dir, name))
+        removed += 1
+    return removed
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Populate / inspect the PyZX reduction cache")
+    parser.add_argument("qasm", nargs="*", help="QASM files to reduce")
+    parser.add_argument("--strategy", choices=ZX_STRATEGIES, default="full_reduce")
+    parser.add_argument("--clear", action="store_true", help="Remove all cached reductions")
+    args = parser.parse_args()
+
+    if args.clear:
+        print(f"Removed {clear_cache()} cached reductions from {CACHE_DIR}")
+    for path in args.qasm:
+        t0 = time.perf_counter()
+        qc = reduce_qasm_file(path, strategy=args.strategy)
+        print(f"{path}: {qc.num_qubits} qubits, {qc.size()} gates, depth {qc.depth()} ({time.perf_counter() - t0:.2f}s)")
@@ -0,0 +1,28 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "solutions"))
+from qiskit import QuantumCircuit
+
+from job_runner import Job, run_jobs
+from solve_circuit import run_method
+
+def _two_components(size: int = 11) -> QuantumCircuit:
+    """Two disconnected GHZ-like blocks, each above INLINE_QUBITS so they go to workers."""
+    qc = QuantumCircuit(2 * size)
+    for base in (0, size):
+        qc.x(base)
+        for q in range(base, base + size - 1):
+            qc.cx(q, q + 1)
+    qc.measure_all()
+    return qc
+
+def test_factored_inside_job_runner_worker():
+    # job_runner workers are daemonic and cannot fork; the factored path must
+    # fall back to solving its components in-process.
+    results = run_jobs([Job("factored", run_method, dict(qc=_two_components(), method="factored", shots=100))],
+                       workers=1, on_result=lambda res: None)
+    assert len(results) == 1
+    res = results[0]
+    assert res.ok, res.error
+    assert list(res.value) == ["1" * 22]
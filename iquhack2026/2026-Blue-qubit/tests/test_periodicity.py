@@ -0,0 +1,33 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "solutions"))
+import numpy as np
+from qiskit import QuantumCircuit
+
+from gate_table import GateTable
+from layered import LayeredCircuit
+from periodicity import detect_circuit
+
+def _brickwork(n: int = 12, rounds: int = 20) -> LayeredCircuit:
+    """Random u3 layer, then CZs on even / odd ring pairs alternately: edge period 4 in ASAP layers."""
+    rng = np.random.default_rng(0)
+    qc = QuantumCircuit(n)
+    for r in range(rounds):
+        for q in range(n):
+            qc.u(*rng.uniform(0, 2 * np.pi, 3), q)
+        for q in range(r % 2, n, 2):
+            qc.cz(q, (q + 1) % n)
+    return LayeredCircuit(GateTable.from_circuit(qc))
+
+def test_exact_edge_period_is_found():
+    # Every edge bucket is constant where it is non-zero; it must not be zeroed out.
+    period, score = detect_circuit(_brickwork(), ("edges",)).top_periods(1)[0]
+    assert period == 4
+    assert score > 0.95
+
+def test_constant_density_column_survives():
+    # n / 2 CZs in every CZ layer and n u3s in every u3 layer (as P9's 28 CZs).
+    det = detect_circuit(_brickwork(), ("density",))
+    assert det.top_periods(1)[0][0] % 2 == 0
+    assert det.top_periods(1)[0][1] > 0.9
@@ -0,0 +1,203 @@
+"""Offline benchmark of solver pipelines over the challenge circuits.
+
+Every (circuit, pipeline) pair runs `solve()` in its own process with local
+simulators only, caches disabled by default so timings are reproducible.
+For each run we keep runtime, peak RSS, the gate count after every stage
+(from the solve() stage telemetry) and whether the reference bitstring was
+recovered. Runs are appended to results/benchmarks/history.jsonl and compared
+against results/benchmarks/baseline.json; slower / heavier / no-longer-correct
+entries are flagged as regressions (exit code 1).
+
+Usage (from the project root):
+    python tools/benchmark.py --circuits P1 P2 P4 --pipelines zx_mps zx_beam
+    python tools/benchmark.py --quick --set-baseline
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "solutions"))
+from job_runner import Job, run_jobs
+from run_all import CIRCUIT_OVERRIDES, CIRCUITS, split_overrides
+from solve_circuit import solve
+
+PIPELINES = {
+    "zx_mps": {"strategy": "clifford_simp", "bond_dim": 64, "shots": 1000},
+    "zx_beam": {"strategy": "full_reduce", "bond_dim": 64, "beam_width": 4},
+    "auto": {"strategy": "clifford_simp", "bond_dim": 64, "shots": 1000, "method": "auto"},
+}
+QUICK = ["P1", "P2", "P4"]
+
+BENCH_DIR = "results/benchmarks"
+HISTORY = os.path.join(BENCH_DIR, "history.jsonl")
+BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+def load_reference(path: str) -> dict:
+    """Known bitstrings keyed by short name (accepts "P4" or "P4_gentle_mound" keys)."""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        data = json.load(f)
+    return {k.split("_")[0]: v for k, v in data.items()}
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def bench_one(qasm_path: str, trace_path: str, **kwargs) -> dict:
+    """Worker: solve and return the result plus its stage telemetry."""
+    res = solve(qasm_path, trace_path=trace_path, **kwargs)
+    with open(trace_path) as f:
+        res["trace"] = json.load(f)
+    return res
+
+def stage_gates(trace: dict) -> list[dict]:
+    out = []
+    for s in trace["stages"]:
+        before, after = s.get("before", {}), s.get("after", {})
+        if "gates" in before or "gates" in after:
+            out.append({"stage": s["stage"], "gates_before": before.get("gates"), "gates_after": after.get("gates"),
+                        "seconds": round(s["seconds"], 4)})
+    return out
+
+def hamming(a: str, b: str) -> int:
+    """Differing positions; extra or missing bits of a wrong-length string all count."""
+    return sum(x != y for x, y in zip(a, b)) + abs(len(a) - len(b))
+
+def summarize(circuit: str, pipeline: str, res, reference: dict) -> dict:
+    entry = {"circuit": circuit, "pipeline": pipeline, "ok": res.ok, "seconds": round(res.elapsed, 3)}
+    if not res.ok:
+        entry["error"] = res.error.strip().splitlines()[-1] if res.error else None
+        return entry
+    value = res.value
+    trace = value.pop("trace")
+    loaded = next((s for s in trace["stages"] if s["stage"] == "load"), {})
+    stages = stage_gates(trace)
+    known = reference.get(circuit)
+    entry.update(
+        bitstring=value["bitstring"],
+        probability=value.get("probability"),
+        peak_rss_mb=round(trace["peak_rss_mb"], 1),
+        gates_in=loaded.get("after", {}).get("gates"),
+        gates_out=next((s["gates_after"] for s in reversed(stages) if s["gates_after"] is not None), None),
+        stages=stages,
+        recovered=None if known is None else value["bitstring"] == known,
+        hamming=None if known is None else hamming(value["bitstring"], known),
+    )
+    return entry
+
+def compare(entries: list[dict], baseline: dict, time_tol: float, mem_tol: float, min_seconds: float) -> list[str]:
+    """Regression messages for entries that got slower, heavier or lost the answer."""
+    flags = []
+    for e in entries:
+        key = f"{e['circuit']}/{e['pipeline']}"
+        base = baseline.get(key)
+        if not base:
+            continue
+        if base.get("ok") and not e["ok"]:
+            flags.append(f"{key}: now fails ({e.get('error')})")
+            continue
+        if not e["ok"]:
+            continue
+        if e["seconds"] > base["seconds"] * (1 + time_tol) and e["seconds"] - base["seconds"] > min_seconds:
+            flags.append(f"{key}: time {base['seconds']:.2f}s -> {e['seconds']:.2f}s")
+        if base.get("peak_rss_mb") and e["peak_rss_mb"] > base["peak_rss_mb"] * (1 + mem_tol):
+            flags.append(f"{key}: peak RSS {base['peak_rss_mb']:.0f} -> {e['peak_rss_mb']:.0f} MB")
+        if base.get("recovered") and e.get("recovered") is False:
+            flags.append(f"{key}: reference bitstring no longer recovered")
+        if base.get("gates_out") is not None and e.get("gates_out") is not None and e["gates_out"] > base["gates_out"]:
+            flags.append(f"{key}: reduced circuit grew {base['gates_out']} -> {e['gates_out']} gates")
+    return flags
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark solver pipelines over the challenge circuits")
+    parser.add_argument("--circuits", nargs="+", default=list(CIRCUITS), help="Short names, e.g. P1 P4")
+    parser.add_argument("--quick", action="store_true", help=f"Only {' '.join(QUICK)}")
+    parser.add_argument("--pipelines", nargs="+", choices=list(PIPELINES), default=["zx_mps"])
+    parser.add_argument("--qasm-dir", default="challenge")
+    parser.add_argument("--reference", default="results/final_solutions.json", help="Known bitstrings")
+    parser.add_argument("--warm", action="store_true", help="Allow the ZX/transpile caches (default: cold)")
+    parser.add_argument("--workers", type=int, default=1, help="Parallel runs (1 keeps timings comparable)")
+    parser.add_argument("--timeout", type=float, default=1800, help="Per-run wall-clock limit (s)")
+    parser.add_argument("--mem-mb", type=float, default=None, help="Per-run memory cap")
+    parser.add_argument("--time-tol", type=float, default=0.25, help="Relative slowdown flagged as regression")
+    parser.add_argument("--mem-tol", type=float, default=0.25, help="Relative peak-RSS growth flagged as regression")
+    parser.add_argument("--min-seconds", type=float, default=0.5, help="Ignore slowdowns smaller than this")
+    parser.add_argument("--set-baseline", action="store_true", help="Store this run as the new baseline")
+    args = parser.parse_args()
+
+    circuits = QUICK if args.quick else args.circuits
+    reference = load_reference(args.reference)
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix="iqh_bench_")
+
+    jobs = []
+    for name in circuits:
+        path = os.path.join(args.qasm_dir, CIRCUITS[name])
+        _, overrides = split_overrides(CIRCUIT_OVERRIDES.get(name, {}))
+        for pipe in args.pipelines:
+            kwargs = {**PIPELINES[pipe], **overrides, "zx_cache": args.warm, "transpile_cache": args.warm}
+            jobs.append(Job(f"{name}/{pipe}", bench_one,
+                            dict(qasm_path=path, trace_path=os.path.join(tmp, f"{name}_{pipe}.json"), **kwargs),
+                            mem_mb=args.mem_mb, timeout=args.timeout))
+
+    print(f"Benchmarking {len(jobs)} runs ({'warm' if args.warm else 'cold'} caches)")
+    print(f"{'Run':<16} {'Time(s)':>9} {'PeakMB':>8} {'Gates':>14}  Recovered")
+    entries = []
+
+    def on_result(res) -> None:
+        circuit, pipe = res.job.name.split("/")
+        e = summarize(circuit, pipe, res, reference)
+        entries.append(e)
+        if e["ok"]:
+            gates = f"{e['gates_in']}->{e['gates_out']}"
+            rec = {True: "yes", False: f"NO (hamming {e['hamming']})", None: "n/a"}[e["recovered"]]
+            print(f"{res.job.name:<16} {e['seconds']:>9.2f} {e['peak_rss_mb']:>8.0f} {gates:>14}  {rec}")
+        else:
+            print(f"{res.job.name:<16} FAILED: {e['error']}")
+
+    try:
+        run_jobs(jobs, workers=args.workers, on_result=on_result)
+    finally:
+        # The per-run traces are folded into the entries above; don't leave them in /tmp.
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    run = {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "revision": git_revision(), "warm": args.warm,
+           "reference": args.reference, "entries": entries}
+    with open(HISTORY, "a") as f:
+        f.write(json.dumps(run) + "\n")
+    print(f"\nAppended to {HISTORY}")
+
+    status = 0
+    if os.path.exists(BASELINE) and not args.set_baseline:
+        with open(BASELINE) as f:
+            baseline = json.load(f)
+        flags = compare(entries, baseline["entries"], args.time_tol, args.mem_tol, args.min_seconds)
+        if flags:
+            print(f"\nREGRESSIONS vs baseline {baseline.get('revision')}:")
+            for msg in flags:
+                print(f"  - {msg}")
+            status = 1
+        else:
+            print(f"\nNo regressions vs baseline {baseline.get('revision')}")
+    if args.set_baseline:
+        base_entries = {}
+        if os.path.exists(BASELINE):
+            with open(BASELINE) as f:
+                base_entries = json.load(f)["entries"]
+        base_entries.update({f"{e['circuit']}/{e['pipeline']}": e for e in entries})
+        with open(BASELINE, "w") as f:
+            json.dump({"time": run["time"], "revision": run["revision"], "entries": base_entries}, f, indent=2)
+        print(f"Baseline saved to {BASELINE}")
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,12 @@
-import pyzx as zx
 from qiskit import QuantumCircuit, transpile
 from qiskit_aer import AerSimulator
 import json
 import argparse
 import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "solutions"))
+from zx_cache import reduce_qasm_file
 
 def verify_candidate(candidate_str, qasm_path, pps_path=None):
     print(f"\n=== Verifying Candidate for {qasm_path} ===")
@@ -40,9 +43,7 @@ def verify_candidate(candidate_str, qasm_path, pps_path=None):
         qc_orig = QuantumCircuit.from_qasm_file(qasm_path)
         # Simplify before inverting to handle large circuits
         print("  Simplifying with PyZX...")
-        g = zx.Circuit.from_qasm_file(qasm_path).to_graph()
-        zx.full_reduce(g)
-        qc_zx = QuantumCircuit.from_qasm_str(zx.extract_circuit(g).to_qasm())
+        qc_zx = reduce_qasm_file(qasm_path, strategy="full_reduce")
         
         qc_inverse = qc_zx.inverse()
         qc_verify = QuantumCircuit(n)